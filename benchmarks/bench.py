@@ -0,0 +1,398 @@
+"""
+bench.py
+
+Benchmarks for the per-tick hot paths.
+
+Run the suite and save the results::
+
+    python benchmarks/bench.py run --output benchmarks/results.json
+
+Compare against a saved baseline, exits 1 when anything is slower than
+the threshold::
+
+    python benchmarks/bench.py compare baseline.json results.json
+
+Each result is the fastest of several repeats, in nanoseconds per call,
+which is the most stable number on a busy Pi.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from loguru import logger  # noqa: E402
+
+from town_clock.clock import Clock, ClockTower, Time  # noqa: E402
+from town_clock.util import Mode  # noqa: E402
+from town_clock.util.utils import (  # noqa: E402
+    convert_position_string_to_number,
+)
+
+Setup = Callable[[], Callable[[], object]]
+BENCHMARKS: dict[str, Setup] = {}
+SYDNEY = (-33.8688, 151.2093, 58.0)
+
+
+class Skip(Exception):
+    """The benchmark cannot run here, for example no ephemeris file."""
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Register a setup function that returns the callable to time."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class MockRelay:
+    def pulse(self):
+        return self
+
+    def turn_on(self):
+        return self
+
+    def turn_off(self):
+        return self
+
+
+def _tower(faces: int = 2) -> ClockTower:
+    tm = Time(timezone="Australia/Sydney")
+    clocks = {
+        str(idx): Clock(
+            str(idx),
+            MockRelay(),
+            time_on_clock=0,
+            sleep_time=0.0,
+            pulse_width=0.0,
+        )
+        for idx in range(faces)
+    }
+    return ClockTower(
+        running=True,
+        time=tm,
+        mode=Mode.TEST,
+        led=MockRelay(),
+        clock=clocks,  # type: ignore[arg-type]
+        position={},
+        pulse_interval=0.0,
+    )
+
+
+@benchmark("time.call")
+def bench_time_call() -> Callable[[], object]:
+    tm = Time(timezone="Australia/Sydney")
+    return tm
+
+
+@benchmark("time.set_clock_time")
+def bench_set_clock_time() -> Callable[[], object]:
+    tm = Time(timezone="Australia/Sydney")
+    now = tm.now
+    return lambda: tm.set_clock_time(now)
+
+
+@benchmark("clock.compare")
+def bench_compare() -> Callable[[], object]:
+    clock = Clock("1", MockRelay(), time_on_clock=5)
+    # Differences of several turns hit the wrap around loops.
+    return lambda: clock.compare(5 + 720 * 20 + 359)
+
+
+@benchmark("tower.slow")
+def bench_slow() -> Callable[[], object]:
+    tower = _tower(faces=4)
+    return lambda: tower.slow
+
+
+@benchmark("tower.pulse_clocks")
+def bench_pulse_clocks() -> Callable[[], object]:
+    tower = _tower(faces=2)
+
+    def pulse() -> object:
+        for clock in tower.clock.values():
+            clock.slow = 10
+        return tower.pulse_clocks()
+
+    return pulse
+
+
+@benchmark("host.scheduler")
+def bench_scheduler() -> Callable[[], object]:
+    from town_clock.clock.time_source import VirtualTime
+    from town_clock.host import Scheduler
+
+    scheduler = Scheduler(VirtualTime())
+
+    def run() -> object:
+        # A minute of 100 towers: a timer each, due in a spread of slots.
+        base = scheduler.time_source.monotonic()
+        for idx in range(100):
+            scheduler.call_at(base + idx % 7 * 0.1, lambda late: None)
+        return scheduler.run()
+
+    return run
+
+
+@benchmark("utils.convert_position_string_to_number")
+def bench_convert_position() -> Callable[[], object]:
+    return lambda: convert_position_string_to_number("151.2093E")
+
+
+@benchmark("sun.table_lookup")
+def bench_sun_table() -> Callable[[], object]:
+    from town_clock.util.sun_table import SunTable, write_sun_table
+
+    folder = Path(tempfile.mkdtemp())
+    start = int(time.time()) - 86400
+    times = [start + 3600 * i for i in range(24 * 365 * 2)]
+    states = [i % 5 for i in range(len(times))]
+    path = write_sun_table(
+        folder / "sun.bin", times, states, 0, *SYDNEY, "Australia/Sydney"
+    )
+    table = SunTable(path)
+    now = time.time()
+    return lambda: table.is_dark_at(now)
+
+
+@benchmark("sun.compute_day")
+def bench_compute_day() -> Callable[[], object]:
+    from datetime import datetime, timedelta, timezone
+
+    from town_clock.util.sun_table import compute_transitions
+
+    if not Path("de421.bsp").exists():
+        raise Skip("de421.bsp not found in the working directory")
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(days=1)
+    return lambda: compute_transitions(*SYDNEY, start, end)
+
+
+@benchmark("sun.batch_year")
+def bench_batch_year() -> Callable[[], object]:
+    from datetime import datetime, timedelta, timezone
+
+    from town_clock.util.sun_batch import compute_transitions_batch
+
+    if not Path("de421.bsp").exists():
+        raise Skip("de421.bsp not found in the working directory")
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(days=365)
+    latitudes = [SYDNEY[0] + i * 0.5 for i in range(24)]
+    longitudes = [SYDNEY[1]] * 24
+    return lambda: compute_transitions_batch(latitudes, longitudes, start, end)
+
+
+@benchmark("lcd.flush_minute")
+def bench_lcd_flush() -> Callable[[], object]:
+    from town_clock.ui.lcd_screen import FakeI2CBus, LCDScreen
+
+    screen = LCDScreen(FakeI2CBus(), max_rate=1e9)
+    screen.set_line(0, "12:00 ONE 12:00").flush()
+    minutes = itertools.cycle(range(10))
+
+    def flush() -> object:
+        digit = str(next(minutes))
+        screen.write(0, 4, digit).write(0, 14, digit)
+        return screen.flush()
+
+    return flush
+
+
+def _import(module: str) -> Callable[[], object]:
+    code = (
+        f"import time; t = time.perf_counter(); import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+
+    def run() -> object:
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+        )
+
+    return run
+
+
+@benchmark("import.town_clock")
+def bench_import() -> Callable[[], object]:
+    return _import("town_clock")
+
+
+@benchmark("import.controller")
+def bench_import_controller() -> Callable[[], object]:
+    return _import("town_clock.controller")
+
+
+def measure(func: Callable[[], object], repeat: int, budget: float) -> dict:
+    """
+    Time func, calls per repeat are picked so one repeat takes about
+    budget seconds.
+
+    Returns:
+        dict: best, median and mean ns per call, calls and repeats.
+    """
+    timer = timeit.Timer(func)
+    calls, took = timer.autorange()
+    if took < budget:
+        calls = max(1, int(calls * budget / max(took, 1e-9)))
+    runs = [t / calls * 1e9 for t in timer.repeat(repeat, calls)]
+    return {
+        "best_ns": min(runs),
+        "median_ns": statistics.median(runs),
+        "mean_ns": statistics.fmean(runs),
+        "calls": calls,
+        "repeat": repeat,
+    }
+
+
+def run(
+    names: Sequence[str] | None = None, repeat: int = 5, budget: float = 0.2
+) -> dict:
+    """
+    Run the benchmarks.
+
+    Args:
+        names: Sequence[str] | None: Only these benchmarks, default is all.
+        repeat: int: Repeats of each benchmark, the best is kept.
+        budget: float: Rough seconds for each repeat.
+
+    Returns:
+        dict: Machine info and the results, ready for json.
+    """
+    # The tower logs every pulse, that is not what is being timed.
+    logger.remove()
+    results: dict[str, dict] = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        try:
+            func = setup()
+        except Skip as err:
+            results[name] = {"skipped": str(err)}
+            continue
+        results[name] = measure(func, repeat, budget)
+    return {
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "created": time.time(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> list:
+    """
+    Find benchmarks slower than the baseline.
+
+    Args:
+        baseline: dict: Saved results.
+        current: dict: New results.
+        threshold: float: Allowed slow down, 0.2 is 20% slower.
+
+    Returns:
+        list[tuple[str, float, float, float, bool]]: Name, baseline ns,
+            current ns, the ratio and whether it regressed, a ratio above
+            1 + threshold, for every benchmark in both.
+    """
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or "best_ns" not in old or "best_ns" not in new:
+            continue
+        ratio = new["best_ns"] / old["best_ns"]
+        rows.append(
+            (
+                name,
+                old["best_ns"],
+                new["best_ns"],
+                ratio,
+                ratio > 1 + threshold,
+            )
+        )
+    return rows
+
+
+def _format(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python benchmarks/bench.py",
+        description="Town clock benchmarks.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--output", type=Path, default=None)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--budget", type=float, default=0.2)
+    run_parser.add_argument("--only", nargs="*", default=None)
+    run_parser.add_argument(
+        "--baseline", type=Path, default=None, help="Compare when done."
+    )
+    run_parser.add_argument("--threshold", type=float, default=0.2)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Compare two result files."
+    )
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        current = run(args.only, args.repeat, args.budget)
+        for name, result in current["results"].items():
+            if "skipped" in result:
+                print(f"{name:45} skipped: {result['skipped']}")
+            else:
+                print(f"{name:45} {_format(result['best_ns']):>12}")
+        if args.output is not None:
+            args.output.write_text(json.dumps(current, indent=2))
+        if args.baseline is None:
+            return 0
+        baseline = json.loads(args.baseline.read_text())
+    else:
+        baseline = json.loads(args.baseline.read_text())
+        current = json.loads(args.current.read_text())
+
+    regressions = 0
+    rows = compare(baseline, current, args.threshold)
+    for name, old, new, ratio, regressed in rows:
+        flag = ""
+        if regressed:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{name:45} {_format(old):>12} -> {_format(new):>12} "
+            f"{ratio:6.2f}x{flag}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Test anchored_time.py
+"""
+from __future__ import annotations
+
+import pytest
+
+from town_clock import ClockTower
+from town_clock.clock.anchored_time import AnchoredTime, JumpKind, TimeJump
+from town_clock.clock.time_source import VirtualTime
+
+START = 1_700_000_000.0
+
+
+@pytest.fixture
+def source() -> VirtualTime:
+    return VirtualTime(START)
+
+
+def test_follows_the_source(source) -> None:
+    anchored = AnchoredTime(source)
+    assert anchored.time() == START
+    source.advance(90.25)
+    assert anchored.time() == START + 90.25
+    assert anchored.monotonic() == source.monotonic()
+    assert not anchored.jumps
+
+
+def test_small_forward_change_is_slewed(source) -> None:
+    anchored = AnchoredTime(source, max_rate=0.1)
+    anchored.time()
+    source.set_time(START + 30)
+    assert anchored.time() == START
+    assert anchored.correction == pytest.approx(30)
+    (jump,) = anchored.jumps
+    assert jump.kind is JumpKind.SLEW
+    assert jump.delta == pytest.approx(30)
+    source.advance(100)
+    assert anchored.time() == pytest.approx(START + 110)
+    source.advance(1000)
+    assert anchored.time() == pytest.approx(source.time())
+    assert anchored.correction == 0
+
+
+def test_small_backward_change_never_goes_back(source) -> None:
+    anchored = AnchoredTime(source, max_rate=0.1)
+    anchored.time()
+    source.set_time(START - 20)
+    readings = [anchored.time()]
+    for _ in range(300):
+        source.advance(1)
+        readings.append(anchored.time())
+    assert readings == sorted(readings)
+    assert readings[1] - readings[0] == pytest.approx(0.9)
+    assert readings[-1] == pytest.approx(source.time())
+
+
+@pytest.mark.parametrize(
+    "delta, kind",
+    [(3600.0, JumpKind.FORWARD), (-600.0, JumpKind.BACKWARD)],
+)
+def test_large_change_is_stepped(source, delta, kind) -> None:
+    seen: list[TimeJump] = []
+    anchored = AnchoredTime(source, on_jump=seen.append)
+    source.advance(10)
+    source.set_time(source.time() + delta)
+    assert anchored.time() == source.time()
+    assert anchored.correction == 0
+    assert seen == list(anchored.jumps)
+    assert seen[0].kind is kind
+    assert seen[0].before == START + 10
+    assert seen[0].after == START + 10 + delta
+
+
+def test_drift_is_not_recorded(source) -> None:
+    anchored = AnchoredTime(source, tolerance=0.5)
+    source.set_time(START + 0.2)
+    anchored.time()
+    assert not anchored.jumps
+    source.advance(10)
+    assert anchored.time() == pytest.approx(source.time())
+
+
+def test_history_and_callback_failure(source) -> None:
+    def broken(jump: TimeJump) -> None:
+        raise RuntimeError("A failing callback must not stop the clock")
+
+    anchored = AnchoredTime(source, history=3, on_jump=broken)
+    for _ in range(5):
+        source.set_time(source.time() + 3600)
+        anchored.time()
+    assert len(anchored.jumps) == 3
+
+
+def test_bad_parameters(source) -> None:
+    with pytest.raises(ValueError):
+        AnchoredTime(source, max_rate=1)
+    with pytest.raises(ValueError):
+        AnchoredTime(source, tolerance=60, step_at=60)
+
+
+def run_minutes(
+    tower: ClockTower, source: VirtualTime, anchored: AnchoredTime, n: int
+) -> None:
+    for _ in range(n):
+        edge = (anchored.time() // 60 + 1) * 60
+        while (gap := edge - anchored.time()) > 0:
+            source.advance(gap + 0.001)
+        tower.tick()
+        assert tower.slow.all_zero()
+
+
+def test_sub_minute_changes_give_no_extra_pulses(source, make_tower) -> None:
+    anchored = AnchoredTime(source)
+    tower = make_tower(anchored, {"ONE": 0}, pulse_interval=0.0)
+    tm, clocks = tower.time, tower.clock
+    relay = clocks["ONE"].relay
+    run_minutes(tower, source, anchored, 5)
+    source.set_time(source.time() + 45)
+    run_minutes(tower, source, anchored, 20)
+    source.set_time(source.time() - 50)
+    run_minutes(tower, source, anchored, 20)
+    assert relay.count == 45
+    assert [jump.kind for jump in anchored.jumps] == [JumpKind.SLEW] * 2
+    assert anchored.correction == pytest.approx(0)
+    assert clocks["ONE"].time_on_clock == tm.clock_time
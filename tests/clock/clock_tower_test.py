@@ -3,11 +3,15 @@ Test clock_tower.py
 """
 from __future__ import annotations
 
+import queue
+
 import pytest
 from icecream import ic
 
 from town_clock import Clock, ClockTower, Time
-from town_clock.util import CLOCK, Mode
+from town_clock.ui.buttons import ButtonEvent, ButtonKind
+from town_clock.util import CLOCK, FaceName, Mode
+from town_clock.util.position_store import PositionStore
 
 
 class MOCK_LEDRELAY:
@@ -26,6 +30,13 @@ class MOCK_ClockRelay:
         ic(self.count)
         return self
 
+    def turn_on(self):
+        return self
+
+    def turn_off(self):
+        self.count += 1
+        return self
+
 
 MOCK_TIME = Time()
 MOCK_POS: dict[str, float] = dict()
@@ -35,19 +46,21 @@ TWO = CLOCK.TWO
 
 
 @pytest.fixture
-def mock_clock_dict() -> dict[CLOCK, Clock]:
+def mock_clock_dict() -> dict[FaceName, Clock]:
     return {
         ONE: Clock(
             ONE,
             relay=MOCK_ClockRelay(),
             time_on_clock=0,
             sleep_time=0.01,
+            pulse_width=0.01,
         ),
         TWO: Clock(
             TWO,
             relay=MOCK_ClockRelay(),
             time_on_clock=0,
             sleep_time=0.01,
+            pulse_width=0.01,
         ),
     }
 
@@ -104,3 +117,78 @@ def test_clock_tower_pulse(
     relay_clock_1 = default_town_clock.clock[ONE].relay.count  # type: ignore
     relay_clock_2 = default_town_clock.clock[TWO].relay.count  # type: ignore
     assert [relay_clock_1, relay_clock_2] == expected
+
+
+def test_clock_tower_slow_is_reused(default_town_clock: ClockTower) -> None:
+    slow = default_town_clock.slow
+    default_town_clock.clock[ONE].slow = 3
+    assert default_town_clock.slow is slow
+    assert slow == [3, 0]
+
+
+def test_clock_tower_n_faces() -> None:
+    names = ["north", "east", "south", "west"]
+    clocks: dict[FaceName, Clock] = {
+        name: Clock(
+            name,
+            relay=MOCK_ClockRelay(),
+            time_on_clock=0,
+            sleep_time=0.0,
+            pulse_width=0.0,
+        )
+        for name in names
+    }
+    tower = ClockTower(
+        running=True,
+        time=MOCK_TIME,
+        mode=Mode.TEST,
+        led=MOCK_LEDRELAY(),  # type: ignore
+        clock=clocks,
+        position=MOCK_POS,
+        pulse_interval=0.0,
+    )
+    for slow, clock in zip((1, 0, 3, 2), clocks.values()):
+        clock.slow = slow
+    assert tower.faces == names
+    assert tower.slow == [1, 0, 3, 2]
+    tower.pulse_clocks()
+    assert tower.slow.all_zero()
+    counts = [clock.relay.count for clock in clocks.values()]  # type: ignore
+    assert counts == [1, 0, 3, 2]
+
+
+def test_clock_tower_saves_positions(default_town_clock: ClockTower, tmp_path):
+    default_town_clock.store = PositionStore(tmp_path / "journal", faces=2)
+    default_town_clock.clock[ONE].slow = 2
+    default_town_clock.clock[TWO].slow = 1
+    default_town_clock.pulse_clocks()
+    default_town_clock.store.close()
+    state = PositionStore(tmp_path / "journal", faces=2).recover()
+    assert state.positions == [2, 1]
+
+
+def test_clock_tower_reads_buttons() -> None:
+    events: queue.SimpleQueue[ButtonEvent] = queue.SimpleQueue()
+    clocks: dict[FaceName, Clock] = {
+        name: Clock(name, relay=MOCK_ClockRelay(), time_on_clock=0)
+        for name in ("ONE", "TWO")
+    }
+    tower = ClockTower(
+        running=True,
+        time=MOCK_TIME,
+        mode=Mode.TEST,
+        led=MOCK_LEDRELAY(),  # type: ignore
+        clock=clocks,
+        position=MOCK_POS,
+        buttons=events,
+    )
+    for name, kind in (
+        ("ONE", ButtonKind.PRESS),
+        ("TWO", ButtonKind.LONG_PRESS),
+        ("TWO", ButtonKind.REPEAT),
+        ("LAMP", ButtonKind.PRESS),
+    ):
+        events.put(ButtonEvent(name, kind, 0.0))
+    assert tower.read_buttons() == 4
+    assert tower.read_buttons() == 0
+    assert [clock.time_on_clock for clock in clocks.values()] == [719, 718]
@@ -0,0 +1,85 @@
+"""
+Test dst.py against the 2023 Sydney daylight saving changes.
+"""
+from __future__ import annotations
+
+import pendulum
+
+from town_clock.clock.dst import DstChange, DstScheduler
+from town_clock.clock.offset_table import OffsetTable
+from town_clock.clock.planner import Action, CatchUpPlan
+from town_clock.clock.time_source import VirtualTime
+
+SYDNEY = "Australia/Sydney"
+# 2023-04-02 03:00 AEDT -> 02:00 AEST
+FALL_BACK = pendulum.datetime(2023, 4, 1, 16, tz="UTC").int_timestamp
+# 2023-10-01 02:00 AEST -> 03:00 AEDT
+SPRING_FORWARD = pendulum.datetime(2023, 9, 30, 16, tz="UTC").int_timestamp
+
+
+def test_reads_2023_changes():
+    scheduler = DstScheduler(OffsetTable(SYDNEY), lookahead=200 * 86400)
+    found = scheduler.read_ahead(FALL_BACK - 86400)
+    assert DstChange(FALL_BACK, -3600) in found
+    assert scheduler.next_change(FALL_BACK + 1) == DstChange(
+        SPRING_FORWARD, 3600
+    )
+    assert scheduler.next_change(FALL_BACK).action is Action.HOLD
+    assert scheduler.next_change(FALL_BACK + 1).action is Action.ADVANCE
+
+
+def test_active_window():
+    scheduler = DstScheduler(OffsetTable(SYDNEY))
+    assert scheduler.active(FALL_BACK - 1) is None
+    assert scheduler.active(FALL_BACK) == DstChange(FALL_BACK, -3600)
+    assert scheduler.active(FALL_BACK + 3599) is not None
+    assert scheduler.active(FALL_BACK + 3600) is None
+
+
+def test_adjust_only_changes_fall_back():
+    scheduler = DstScheduler(OffsetTable(SYDNEY))
+    advance = CatchUpPlan("ONE", Action.ADVANCE, pulses=667)
+    held = scheduler.adjust(advance, 240, 180, FALL_BACK)
+    assert (held.action, held.hold) == (Action.HOLD, 60)
+    assert held.slow == -60
+    # Outside the change and more than an hour fast, unchanged.
+    assert scheduler.adjust(advance, 240, 180, FALL_BACK - 60) is advance
+    assert scheduler.adjust(advance, 300, 180, FALL_BACK) is advance
+    spring = CatchUpPlan("ONE", Action.ADVANCE, pulses=61)
+    assert scheduler.adjust(spring, 120, 180, SPRING_FORWARD) is spring
+
+
+def dst_tower(make_tower, source: VirtualTime, log: list):
+    tower = make_tower(source, log=log)
+    tower.dst = DstScheduler(tower.time.offsets)
+    return tower
+
+
+def test_fall_back_holds_for_an_hour(make_tower, simulate, in_sync) -> None:
+    source = VirtualTime(FALL_BACK - 3600)
+    log: list = []
+    tower = simulate(
+        dst_tower(make_tower, source, log), source, FALL_BACK + 3 * 3600
+    )
+    assert in_sync(tower)
+    # One pulse a minute, except for the repeated hour.
+    ends = [t for t, _, on in log if not on]
+    assert len(ends) == 2 * (4 * 60 - 60)
+    assert not [t for t in ends if FALL_BACK <= t < FALL_BACK + 3600]
+
+
+def test_spring_forward_pulses_from_the_change(
+    make_tower, simulate, in_sync
+) -> None:
+    source = VirtualTime(SPRING_FORWARD - 3600)
+    log: list = []
+    tower = simulate(
+        dst_tower(make_tower, source, log), source, SPRING_FORWARD + 3600
+    )
+    assert in_sync(tower)
+    ends = [t for t, _, on in log if not on]
+    burst = [t for t in ends if SPRING_FORWARD <= t < SPRING_FORWARD + 60]
+    # 61 pulses a face, rest 0.5s between pulses of 0.1s.
+    assert min(burst) == SPRING_FORWARD + 0.1
+    assert len(burst) >= 2 * 60
+    assert len(ends) == 2 * (2 * 60 + 60)
@@ -0,0 +1,195 @@
+"""
+Test gpio.py
+"""
+from __future__ import annotations
+
+import ctypes
+
+import pytest
+
+from town_clock.clock import Clock, ClockRelay
+from town_clock.clock import gpio
+from town_clock.clock.gpio import (
+    Edge,
+    FakeGpioBackend,
+    FakeGpioEdges,
+    GpioChardev,
+    GpioEdges,
+    GpioV2LineRequest,
+    GpioV2LineValues,
+)
+from town_clock.clock.pulse_engine import PulseEngine
+from town_clock.clock.time_source import VirtualTime
+from town_clock.util.clock_exceptions import ClockGroupError
+
+
+def test_uapi_layout():
+    assert ctypes.sizeof(GpioV2LineRequest) == 592
+    assert ctypes.sizeof(GpioV2LineValues) == 16
+    assert gpio.GPIO_V2_GET_LINE_IOCTL == 0xC250B407
+    assert gpio.GPIO_V2_LINE_SET_VALUES_IOCTL == 0xC010B40F
+
+
+def test_fake_batch_is_one_write():
+    backend = FakeGpioBackend([24, 25, 23])
+    with backend.batch():
+        backend.set_lines({24: True})
+        backend.set_lines({25: True})
+        with backend.batch():
+            backend.set_lines({23: True})
+        assert backend.writes == 0
+    assert backend.writes == 1
+    assert all(backend.lines.values())
+    assert len({when for when, _, _ in backend.history}) == 1
+
+
+def test_fake_unknown_pin():
+    backend = FakeGpioBackend([24])
+    with pytest.raises(KeyError):
+        backend.set_lines({25: True})
+    assert not backend.get_line(24)
+
+
+def _clocks(backend, source) -> list[Clock]:
+    return [
+        Clock(
+            name,
+            ClockRelay(23, name, pin=pin, name=name, backend=backend),
+            time_on_clock=0,
+            sleep_time=0.5,
+            pulse_width=0.1,
+            time_source=source,
+        )
+        for name, pin in (("ONE", 24), ("TWO", 25))
+    ]
+
+
+def test_engine_switches_faces_together():
+    source = VirtualTime()
+    backend = FakeGpioBackend([23, 24, 25], time_source=source)
+    clocks = _clocks(backend, source)
+    PulseEngine(clocks, time_source=source, backend=backend).run([3, 3])
+    # One write to turn both faces on and one to turn them off, per pulse.
+    assert backend.writes == 6
+    assert [c.time_on_clock for c in clocks] == [3, 3]
+    ons = [(when, pin) for when, pin, value in backend.history if value]
+    assert [when for when, _ in ons[::2]] == [when for when, _ in ons[1::2]]
+
+
+class BrokenBackend(FakeGpioBackend):
+    def _write(self, values):
+        raise OSError("ioctl failed")
+
+
+def test_engine_batch_failure_moves_nothing():
+    source = VirtualTime()
+    backend = BrokenBackend([23, 24, 25], time_source=source)
+    clocks = _clocks(backend, source)
+    with pytest.raises(ClockGroupError):
+        PulseEngine(clocks, time_source=source, backend=backend).run([2, 1])
+    assert [c.time_on_clock for c in clocks] == [0, 0]
+
+
+def test_chardev_request(monkeypatch, tmp_path):
+    calls: list = []
+
+    def ioctl(fd, request, arg, *args):
+        calls.append((fd, request, bytes(arg)))
+        if isinstance(arg, GpioV2LineRequest):
+            arg.fd = 99
+        return 0
+
+    monkeypatch.setattr(gpio.os, "open", lambda *args: 7)
+    monkeypatch.setattr(gpio.os, "close", lambda fd: None)
+    monkeypatch.setattr(gpio.fcntl, "ioctl", ioctl)
+
+    lines = GpioChardev([24, 25, 23, 22], chip=tmp_path / "gpiochip0")
+    request = GpioV2LineRequest.from_buffer_copy(calls[0][2])
+    assert calls[0][:2] == (7, gpio.GPIO_V2_GET_LINE_IOCTL)
+    assert list(request.offsets[:4]) == [24, 25, 23, 22]
+    assert request.num_lines == 4
+    assert request.consumer == b"town_clock"
+    assert request.config.flags == gpio.GPIO_V2_LINE_FLAG_OUTPUT
+
+    with lines.batch():
+        lines.set_lines({24: True, 25: True})
+        lines.set_lines({22: True})
+    assert len(calls) == 2
+    values = GpioV2LineValues.from_buffer_copy(calls[1][2])
+    assert calls[1][:2] == (99, gpio.GPIO_V2_LINE_SET_VALUES_IOCTL)
+    assert (values.bits, values.mask) == (0b1011, 0b1011)
+
+    lines.set_lines({25: False})
+    values = GpioV2LineValues.from_buffer_copy(calls[2][2])
+    assert (values.bits, values.mask) == (0b1001, 0b0010)
+    assert lines.get_line(24) and not lines.get_line(25)
+    lines.close()
+    with pytest.raises(ValueError):
+        lines.set_lines({24: False})
+
+
+def test_chardev_rejects_duplicate_pins():
+    with pytest.raises(ValueError):
+        GpioChardev([24, 24])
+
+
+def test_edges_request(monkeypatch, tmp_path):
+    calls: list = []
+
+    def ioctl(fd, request, arg, *args):
+        calls.append((fd, request, bytes(arg)))
+        arg.fd = 99
+        return 0
+
+    events = b"".join(
+        gpio.LINE_EVENT.pack(ns, kind, pin, seq, seq)
+        for ns, kind, pin, seq in (
+            (1_500_000_000, gpio.GPIO_V2_LINE_EVENT_FALLING_EDGE, 5, 1),
+            (1_520_000_000, gpio.GPIO_V2_LINE_EVENT_RISING_EDGE, 5, 2),
+        )
+    )
+    monkeypatch.setattr(gpio.os, "open", lambda *args: 7)
+    monkeypatch.setattr(gpio.os, "close", lambda fd: None)
+    monkeypatch.setattr(gpio.os, "set_blocking", lambda fd, on: None)
+    monkeypatch.setattr(gpio.os, "read", lambda fd, size: events)
+    monkeypatch.setattr(gpio.fcntl, "ioctl", ioctl)
+
+    edges = GpioEdges([5, 6], chip=tmp_path / "gpiochip0", buffer=16)
+    request = GpioV2LineRequest.from_buffer_copy(calls[0][2])
+    assert list(request.offsets[:2]) == [5, 6]
+    assert request.event_buffer_size == 16
+    assert request.config.flags == (
+        gpio.GPIO_V2_LINE_FLAG_INPUT
+        | gpio.GPIO_V2_LINE_FLAG_EDGE_RISING
+        | gpio.GPIO_V2_LINE_FLAG_EDGE_FALLING
+        | gpio.GPIO_V2_LINE_FLAG_BIAS_PULL_UP
+    )
+    assert edges.fileno() == 99
+    assert edges.read_edges() == [Edge(5, False, 1.5), Edge(5, True, 1.52)]
+    edges.close()
+    with pytest.raises(ValueError):
+        edges.fileno()
+
+
+def test_fake_edges():
+    source = VirtualTime()
+    edges = FakeGpioEdges([5], time_source=source)
+    assert edges.read_edges() == []
+    source.advance(2)
+    edges.set_line(5, False)
+    edges.set_line(5, True, timestamp=9.0)
+    assert edges.read_edges() == [
+        Edge(5, False, source.monotonic()),
+        Edge(5, True, 9.0),
+    ]
+    with pytest.raises(KeyError):
+        edges.set_line(6, True)
+    edges.close()
+
+
+def test_backend_must_write():
+    class NoWrite(gpio._Batching):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWrite()  # type: ignore[abstract]
@@ -0,0 +1,177 @@
+"""
+Test night.py
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from town_clock.clock.night import DAY_SECONDS, LightChange, NightSchedule
+from town_clock.clock.time_source import VirtualTime
+from town_clock.util.sun_table import (
+    CIVIL,
+    DARK,
+    DAY,
+    SunTable,
+    write_sun_table,
+)
+
+START = 1_700_000_000
+POSITION = {"latitude": -30.3402, "longitude": 152.7124, "altitude": 741}
+
+
+class FakeSun:
+    """Dawn at 6:00 and dusk at 18:00 past START, every day."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[float, float]] = []
+
+    def __call__(
+        self,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        start: datetime,
+        end: datetime,
+    ) -> tuple[list[int], list[int], int]:
+        self.calls.append((start.timestamp(), end.timestamp()))
+        times: list[int] = []
+        states: list[int] = []
+        day = START - DAY_SECONDS
+        while day < end.timestamp():
+            for offset, state in ((6 * 3600, DAY), (18 * 3600, DARK)):
+                if start.timestamp() <= day + offset < end.timestamp():
+                    times.append(day + offset)
+                    states.append(state)
+            day += DAY_SECONDS
+        phase = (start.timestamp() - START) % DAY_SECONDS
+        initial = DAY if 6 * 3600 <= phase < 18 * 3600 else DARK
+        return times, states, initial
+
+
+@pytest.fixture
+def table(tmp_path):
+    times = [START + t * 3600 for t in (-1, 5, 6, 17, 18, 100)]
+    states = [DARK, CIVIL, DAY, CIVIL, DARK, DARK]
+    path = write_sun_table(
+        tmp_path / "sun.bin",
+        times,
+        states,
+        initial_state=DARK,
+        timezone="Australia/Sydney",
+        **POSITION,
+    )
+    with SunTable(path) as sun_table:
+        yield sun_table
+
+
+def test_compile_from_table(table) -> None:
+    fake = FakeSun()
+    night = NightSchedule(POSITION, table, compute=fake)
+    assert night.load(START)
+    assert night.changes == [
+        LightChange(START + 6 * 3600, False),
+        LightChange(START + 17 * 3600, True),
+    ]
+    assert not fake.calls
+    # Civil twilight is night when the threshold is below it.
+    night = NightSchedule(POSITION, table, threshold=CIVIL, compute=fake)
+    night.load(START)
+    assert night.changes[0] == LightChange(START + 5 * 3600, False)
+
+
+def test_compute_when_table_runs_out(table) -> None:
+    fake = FakeSun()
+    night = NightSchedule(POSITION, table, compute=fake)
+    night.load(START + 99 * 3600)
+    assert fake.calls == [(START + 99 * 3600, START + 147 * 3600)]
+    assert [change.dark for change in night.changes] == [False, True] * 2
+
+
+def test_next_change(table) -> None:
+    night = NightSchedule(POSITION, table, compute=FakeSun())
+    night.load(START)
+    assert night.dark
+    change = night.next_change(START)
+    assert change == LightChange(START + 6 * 3600, False)
+    assert not night.apply(change)
+    # Civil twilight is already dark by the default threshold.
+    assert night.next_change(change.at) == LightChange(START + 17 * 3600, True)
+
+
+def test_next_change_checks_back_at_the_end() -> None:
+    def never(*args) -> tuple[list[int], list[int], int]:
+        return [], [], DAY
+
+    night = NightSchedule(POSITION, compute=never)
+    night.load(START, days=1)
+    # Less than a day left, the next day is compiled in the background.
+    change = night.next_change(START + 3600)
+    assert night._prefetch is not None
+    night._prefetch.join()
+    assert change == LightChange(START + DAY_SECONDS, False)
+    assert night.end == START + 2 * DAY_SECONDS
+
+
+def test_check_back_is_never_in_the_past() -> None:
+    def never(*args) -> tuple[list[int], list[int], int]:
+        return [], [], DAY
+
+    night = NightSchedule(POSITION, compute=never)
+    night.load(START + 0.7, days=1)
+    now = START + DAY_SECONDS + 0.4
+    change = night.next_change(now)
+    assert night._prefetch is not None
+    night._prefetch.join()
+    assert change.at > now
+    assert change == LightChange(START + DAY_SECONDS + 1, False)
+
+
+def test_next_change_reloads_when_stale() -> None:
+    fake = FakeSun()
+    night = NightSchedule(POSITION, compute=fake)
+    night.load(START)
+    later = START + 10 * DAY_SECONDS + 12 * 3600
+    change = night.next_change(later)
+    assert night.start == later
+    assert change == LightChange(START + 10 * DAY_SECONDS + 18 * 3600, True)
+
+
+def test_extend_and_prefetch() -> None:
+    fake = FakeSun()
+    night = NightSchedule(POSITION, compute=fake)
+    night.load(START, days=1)
+    night.prefetch().join()
+    assert night.end == START + 2 * DAY_SECONDS
+    assert len(night.changes) == 4
+    assert night.changes == sorted(night.changes, key=lambda c: c.at)
+
+
+def test_prefetch_failure_is_logged() -> None:
+    def broken(*args) -> tuple[list[int], list[int], int]:
+        raise RuntimeError("No ephemeris")
+
+    night = NightSchedule(POSITION, compute=FakeSun())
+    night.load(START, days=1)
+    night.compute = broken
+    night.prefetch().join()
+    assert night.end == START + DAY_SECONDS
+
+
+def test_tower_lights(table, make_tower) -> None:
+    source = VirtualTime(START)
+    tower = make_tower(source, {}, position=POSITION)
+    led = tower.led
+    assert not tower.is_night
+    tower.check_if_night()
+    assert not led.on
+
+    tower.night = NightSchedule(POSITION, table, compute=FakeSun())
+    tower.night.load(START)
+    tower.check_if_night()
+    assert tower.is_night and led.on
+    tower.light_change(tower.night.next_change(START))
+    assert not tower.is_night and not led.on
+    tower.light_change(LightChange(START + 18 * 3600, True))
+    assert tower.is_night and led.on
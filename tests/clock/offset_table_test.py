@@ -0,0 +1,123 @@
+"""
+Test offset_table.py and the Time fast path against pendulum.
+"""
+from __future__ import annotations
+
+import random
+
+import pendulum
+import pytest
+
+from town_clock.clock import Time
+from town_clock.clock.offset_table import (
+    OffsetTable,
+    offset_table,
+    split_timestamp,
+)
+from town_clock.clock.time_source import VirtualTime
+
+ZONES = [
+    "Australia/Sydney",
+    "Australia/Lord_Howe",
+    "Asia/Kathmandu",
+    "Europe/London",
+    "America/St_Johns",
+    "UTC",
+]
+# 2023-04-02 03:00 AEDT -> 02:00 AEST, 2023-10-01 02:00 AEST -> 03:00 AEDT
+SYDNEY_2023 = [(1680364800, 36000), (1696089600, 39600)]
+
+
+def slow_path(timestamp: float, zone: str) -> tuple[bool, int, int]:
+    """What Time.__call__ did with pendulum, on_minute and clock_time."""
+    now = pendulum.from_timestamp(timestamp, tz=zone)
+    clock_time = (now.hour % 12) * 60 + now.minute
+    return now.second == 0, clock_time, now.second
+
+
+def test_sydney_transitions():
+    table = OffsetTable("Australia/Sydney")
+    assert list(table.transitions(1672531200, 1704067200)) == SYDNEY_2023
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_offset_matches_pendulum(zone):
+    table = OffsetTable(zone)
+    rng = random.Random(zone)
+    stamps = [rng.randrange(1_500_000_000, 1_900_000_000) for _ in range(500)]
+    for start, _ in table.transitions(1_600_000_000, 1_800_000_000):
+        stamps += [start - 1, start, start + 1]
+    for stamp in stamps:
+        expected = pendulum.from_timestamp(stamp, tz=zone).offset
+        assert table.offset(stamp) == expected, stamp
+
+
+def test_table_grows_both_ways():
+    table = OffsetTable("Australia/Sydney", span=86400 * 30)
+    table.offset(1_700_000_000)
+    assert (
+        table.offset(1_800_000_000)
+        == pendulum.from_timestamp(1_800_000_000, tz="Australia/Sydney").offset
+    )
+    assert (
+        table.offset(1_600_000_000)
+        == pendulum.from_timestamp(1_600_000_000, tz="Australia/Sydney").offset
+    )
+
+
+def test_offset_table_is_shared():
+    assert offset_table("Australia/Sydney") is offset_table(
+        pendulum.timezone("Australia/Sydney")
+    )
+
+
+@pytest.mark.parametrize(
+    ("timestamp", "expected"),
+    (
+        (10.0, (10, 0)),
+        (10.25, (10, 250000)),
+        (10.9999999, (11, 0)),
+        (10.0000004, (10, 0)),
+    ),
+)
+def test_split_timestamp(timestamp, expected):
+    assert split_timestamp(timestamp) == expected
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_tick_matches_pendulum(zone):
+    source = VirtualTime(1_680_300_000.0)
+    tm = Time(timezone=zone, time_source=source)
+    rng = random.Random(zone)
+    edges = [
+        stamp
+        for stamp, _ in offset_table(zone).transitions(
+            1_600_000_000, 1_800_000_000
+        )
+    ]
+    stamps = [rng.uniform(1_600_000_000, 1_800_000_000) for _ in range(300)]
+    for edge in edges:
+        stamps += [edge - 60.0, edge - 0.5, edge, edge + 0.25, edge + 60.0]
+    stamps += [
+        (rng.randrange(1_600_000_000, 1_800_000_000) // 60) * 60
+        for _ in range(300)
+    ]
+    for stamp in stamps:
+        tm.clock_time = -1
+        on_minute, clock_time, second = slow_path(stamp, zone)
+        assert tm.tick(stamp) == on_minute, stamp
+        assert tm.clock_time == (clock_time if on_minute else -1), stamp
+        assert int(tm.second) == second
+        assert tm.now == pendulum.from_timestamp(stamp, tz=zone)
+
+
+def test_now_is_lazy():
+    source = VirtualTime(1_699_999_980.5)
+    tm = Time(timezone="Australia/Sydney", time_source=source)
+    source.advance(60)
+    assert tm()
+    assert tm._now is None
+    assert tm.second == 0.5
+    assert tm.minute_edge == 1_700_000_040
+    assert tm.now.int_timestamp == 1_700_000_040
+    assert tm._now is not None
@@ -0,0 +1,105 @@
+"""
+planner_test.py
+
+"""
+from __future__ import annotations
+
+import pytest
+
+from town_clock import Clock, ClockTower, Time
+from town_clock.clock.planner import (
+    Action,
+    CatchUpPlan,
+    plan_catch_up,
+    pulses_to_catch_up,
+)
+from town_clock.util import CLOCK, Mode
+
+
+@pytest.mark.parametrize(
+    "slow, period, second, expected",
+    (
+        (0, 0.6, 0, 0),
+        (10, 0.6, 0, 10),
+        (10, 0.6, 55, 11),
+        (600, 0.6, 0, 606),
+        (600, 0.0, 0, 600),
+        (100, 30, 0, 199),
+        (2, 59.9, 0, 601),
+    ),
+)
+def test_pulses_to_catch_up(slow, period, second, expected) -> None:
+    pulses = pulses_to_catch_up(slow, period, second)
+    assert pulses == expected
+    # Lands on the minute the real time has reached by then.
+    assert pulses == slow + int((second + pulses * period) // 60)
+
+
+def test_pulses_to_catch_up_too_slow() -> None:
+    with pytest.raises(ValueError):
+        pulses_to_catch_up(1, 60)
+
+
+@pytest.mark.parametrize(
+    "position, clock_time, expected",
+    (
+        (0, 0, CatchUpPlan(CLOCK.ONE, Action.NONE)),
+        (0, 5, CatchUpPlan(CLOCK.ONE, Action.ADVANCE, pulses=5, duration=3)),
+        (100, 90, CatchUpPlan(CLOCK.ONE, Action.HOLD, hold=10, duration=600)),
+        (
+            719,
+            0,
+            CatchUpPlan(CLOCK.ONE, Action.ADVANCE, pulses=1, duration=0.6),
+        ),
+    ),
+)
+def test_plan_catch_up(position, clock_time, expected) -> None:
+    plan = plan_catch_up(CLOCK.ONE, position, clock_time, max_rate=1 / 0.6)
+    assert plan.action is expected.action
+    assert plan.pulses == expected.pulses
+    assert plan.hold == expected.hold
+    assert plan.duration == pytest.approx(expected.duration)
+
+
+def test_plan_catch_up_wear() -> None:
+    # Ten minutes fast: advancing round the dial is quicker, but not once
+    # the wear of 700 odd pulses is counted.
+    fast = plan_catch_up(CLOCK.ONE, 100, 90, max_rate=1 / 0.6, wear=0)
+    assert fast.action is Action.ADVANCE
+    assert fast.duration < 600
+    assert plan_catch_up(CLOCK.ONE, 100, 90, 1 / 0.6).action is Action.HOLD
+
+
+def test_plan_catch_up_cannot_advance() -> None:
+    plan = plan_catch_up(CLOCK.ONE, 0, 10, max_rate=0)
+    assert plan.action is Action.HOLD
+    assert plan.slow == -710
+
+
+def test_clock_tower_sync(mock_relay) -> None:
+    time = Time()
+    time.clock_time = 30
+    clocks = {
+        name: Clock(
+            name,
+            mock_relay(),
+            time_on_clock=position,
+            sleep_time=0.0,
+            pulse_width=0.0,
+        )
+        for name, position in ((CLOCK.ONE, 25), (CLOCK.TWO, 40))
+    }
+    tower = ClockTower(
+        running=True,
+        time=time,
+        mode=Mode.TEST,
+        led=None,  # type: ignore
+        clock=clocks,  # type: ignore
+        position={},
+        pulse_interval=0.0,
+    )
+    plans = tower.sync()
+    assert [plan.action for plan in plans] == [Action.ADVANCE, Action.HOLD]
+    assert clocks[CLOCK.ONE].time_on_clock == 30
+    assert clocks[CLOCK.TWO].time_on_clock == 40
+    assert clocks[CLOCK.TWO].slow == -10
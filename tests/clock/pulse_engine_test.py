@@ -0,0 +1,87 @@
+"""
+pulse_engine_test.py
+
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from town_clock.clock import Clock
+from town_clock.clock.pulse_engine import PulseEngine
+from town_clock.util import CLOCK, FaceName
+from town_clock.util.clock_exceptions import ClockGroupError, PulseError
+
+
+@pytest.fixture
+def make_clock(mock_relay):
+    def make(log, name: CLOCK, fail_on: int = 0, width=0.02, rest=0.02):
+        return Clock(
+            name,
+            relay=mock_relay(name.name, log, fail_on=fail_on),
+            time_on_clock=0,
+            sleep_time=rest,
+            pulse_width=width,
+        )
+
+    return make
+
+
+def test_pulse_engine_counts_and_positions(make_clock) -> None:
+    log: list = []
+    clocks = [make_clock(log, CLOCK.ONE), make_clock(log, CLOCK.TWO)]
+    pulsed: list[tuple[FaceName, bool]] = []
+    engine = PulseEngine(
+        clocks, on_pulse=lambda c, ok: pulsed.append((c.name, ok))
+    )
+    progress = engine.run([3, 1])
+    assert progress == {CLOCK.ONE: (3, 3), CLOCK.TWO: (1, 1)}
+    assert [c.relay.count for c in clocks] == [3, 1]  # type: ignore
+    assert [c.time_on_clock for c in clocks] == [3, 1]
+    assert pulsed.count((CLOCK.ONE, True)) == 3
+
+
+def test_pulse_engine_faces_share_slots(make_clock) -> None:
+    log: list = []
+    clocks = [make_clock(log, CLOCK.ONE), make_clock(log, CLOCK.TWO)]
+    start = time.monotonic()
+    PulseEngine(clocks).run([5, 5])
+    elapsed = time.monotonic() - start
+    # Five pulses of 0.04 s each, in parallel rather than one after another.
+    assert elapsed < 0.35
+    first_on = [entry for entry in log if entry[2]][:2]
+    assert {name for _, name, _ in first_on} == {"ONE", "TWO"}
+    assert log.index(first_on[1]) == 1
+
+
+def test_pulse_engine_each_face_keeps_its_timing(make_clock) -> None:
+    log: list = []
+    clocks = [
+        make_clock(log, CLOCK.ONE, width=0.05, rest=0.0),
+        make_clock(log, CLOCK.TWO, width=0.01, rest=0.0),
+    ]
+    PulseEngine(clocks).run([1, 1])
+    times = {(name, on): t for t, name, on in log}
+    assert times[("ONE", False)] - times[("ONE", True)] >= 0.05
+    assert times[("TWO", False)] - times[("TWO", True)] < 0.05
+
+
+def test_pulse_engine_reports_failures(make_clock) -> None:
+    log: list = []
+    clocks = [
+        make_clock(log, CLOCK.ONE, fail_on=2),
+        make_clock(log, CLOCK.TWO),
+    ]
+    engine = PulseEngine(clocks)
+    with pytest.raises(ClockGroupError) as err:
+        engine.run([4, 4])
+    assert len(err.value.exceptions) == 1
+    assert isinstance(err.value.exceptions[0], PulseError)
+    assert engine.progress == {CLOCK.ONE: (1, 4), CLOCK.TWO: (4, 4)}
+    assert not clocks[0].relay.on  # type: ignore
+
+
+def test_pulse_engine_rejects_wrong_length() -> None:
+    with pytest.raises(ValueError):
+        PulseEngine([]).run([1])
@@ -12,7 +12,14 @@ from town_clock.clock import Pulses
 
 
 @pytest.mark.parametrize(
-    "pulses, expected", (((), (0, 0)), ((1, 1), (1, 1)), ((-10, -10), (0, 0)))
+    "pulses, expected",
+    (
+        ((), ()),
+        ((0, 0), (0, 0)),
+        ((1, 1), (1, 1)),
+        ((-10, -10), (0, 0)),
+        ((1, -2, 3, 4), (1, 0, 3, 4)),
+    ),
 )
 def test_Pulse_Class(pulses, expected):
     assert Pulses(*pulses) == expected
@@ -21,7 +28,7 @@ def test_Pulse_Class(pulses, expected):
 @pytest.mark.parametrize(
     "pulses, adder, expected",
     (
-        ((), 0, (0, 0)),
+        ((0, 0), 0, (0, 0)),
         ((1, 1), 0, (1, 1)),
         ((-10, -10), 5, (5, 5)),
         ((10, 10), -3, (7, 7)),
@@ -30,6 +37,33 @@ def test_Pulse_Class(pulses, expected):
 )
 def test_Pulse_Class_addition(pulses, adder, expected):
     pulses = Pulses(*pulses)
-    pulses.one += adder
-    pulses.two += adder
+    pulses[0] += adder
+    pulses[1] += adder
     assert pulses == expected
+
+
+@pytest.mark.parametrize(
+    "pulses, other, expected",
+    (
+        ((5, 5, 5), 2, (3, 3, 3)),
+        ((5, 1, 0), (1, 2, 3), (4, 0, 0)),
+        ((5, 1, 0), Pulses(5, 1, 0), (0, 0, 0)),
+    ),
+)
+def test_Pulse_Class_subtraction(pulses, other, expected):
+    assert Pulses(*pulses) - other == expected
+
+
+def test_Pulse_Class_all_zero():
+    assert Pulses().all_zero()
+    assert Pulses.zeros(4).all_zero()
+    assert Pulses(0, -3, 0).all_zero()
+    assert not Pulses(0, 0, 1).all_zero()
+
+
+def test_Pulse_Class_load_in_place():
+    pulses = Pulses.zeros(2)
+    assert pulses.load([3, -1, 2]) is pulses
+    assert pulses == [3, 0, 2]
+    assert len(pulses) == 3
+    assert repr(pulses) == "Pulses(3, 0, 2)"
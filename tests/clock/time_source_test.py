@@ -0,0 +1,113 @@
+"""
+Test time_source.py
+
+Runs the tower against VirtualTime, days of ticks in well under a second.
+"""
+from __future__ import annotations
+
+import time
+
+import pendulum
+import pytest
+
+from town_clock import Time
+from town_clock.clock.time_source import SYSTEM_TIME, VirtualTime
+
+SYDNEY = "Australia/Sydney"
+# 2023-10-01 02:00 AEST -> 03:00 AEDT
+SPRING_FORWARD = pendulum.datetime(2023, 9, 30, 16, tz="UTC").timestamp()
+# 2023-04-02 03:00 AEDT -> 02:00 AEST
+FALL_BACK = pendulum.datetime(2023, 4, 1, 16, tz="UTC").timestamp()
+
+
+def test_virtual_time_sleep_is_instant():
+    source = VirtualTime(1000.0)
+    start = time.monotonic()
+    source.sleep(3600)
+    assert time.monotonic() - start < 1
+    assert source.time() == 4600.0
+    assert source.monotonic() == 3600.0
+    assert source.slept == 3600
+
+
+def test_virtual_time_set_time_only_moves_wall():
+    source = VirtualTime(1000.0)
+    source.set_time(500.0)
+    assert source.time() == 500.0
+    assert source.monotonic() == 0.0
+    with pytest.raises(ValueError):
+        source.advance(-1)
+
+
+def test_system_time():
+    assert abs(SYSTEM_TIME.time() - time.time()) < 1
+    assert SYSTEM_TIME.monotonic() <= time.monotonic()
+
+
+def test_time_reads_from_source():
+    source = VirtualTime(SPRING_FORWARD)
+    tm = Time(timezone=SYDNEY, time_source=source)
+    assert (tm.now.hour, tm.now.minute) == (3, 0)
+    source.advance(90)
+    tm()
+    assert (tm.now.minute, tm.now.second) == (1, 30)
+
+
+def pulse_ends(log: list) -> list[float]:
+    return [at for at, _, on in log if not on]
+
+
+def test_spring_forward_pulses_the_lost_hour(
+    make_tower, simulate, in_sync
+) -> None:
+    source = VirtualTime(SPRING_FORWARD - 3600)
+    log: list = []
+    tower = simulate(
+        make_tower(source, log=log), source, SPRING_FORWARD + 3 * 3600
+    )
+    assert in_sync(tower)
+    # Every minute of the four hours, plus the hour that was skipped.
+    assert len(pulse_ends(log)) == 2 * (4 * 60 + 60)
+
+
+def test_fall_back_goes_round_the_dial(make_tower, simulate, in_sync) -> None:
+    source = VirtualTime(FALL_BACK - 3600)
+    log: list = []
+    tower = simulate(make_tower(source, log=log), source, FALL_BACK + 3 * 3600)
+    assert in_sync(tower)
+    # Eleven hours of pulses take minutes, quicker than holding an hour.
+    ends = pulse_ends(log)
+    assert len(ends) == 2 * (4 * 60 + 660)
+    burst = [t for t in ends if FALL_BACK <= t < FALL_BACK + 600]
+    assert len(burst) >= 2 * 660
+
+
+def test_outage_catches_up(make_tower, simulate, in_sync) -> None:
+    source = VirtualTime(SPRING_FORWARD + 86400)
+    tower = simulate(make_tower(source), source, source.time() + 600)
+    # Power cut for three hours, no ticks.
+    source.advance(3 * 3600)
+    tower.tick()
+    assert not in_sync(tower)
+    simulate(tower, source, source.time() + 600)
+    assert in_sync(tower)
+
+
+def test_week_of_ticks_is_deterministic(make_tower, simulate, in_sync) -> None:
+    def run() -> list:
+        source = VirtualTime(SPRING_FORWARD - 3 * 86400)
+        log: list = []
+        tower = simulate(
+            make_tower(source, log=log), source, SPRING_FORWARD + 4 * 86400
+        )
+        source.advance(5 * 3600 + 17)
+        simulate(tower, source, source.time() + 3600)
+        assert in_sync(tower)
+        return log
+
+    start = time.monotonic()
+    first = run()
+    assert first == run()
+    assert time.monotonic() - start < 30
+    # A pulse a minute for the week and the outage, plus the lost hour.
+    assert len(pulse_ends(first)) == 2 * (7 * 24 * 60 + 60 + 5 * 60 + 60)
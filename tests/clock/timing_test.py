@@ -0,0 +1,78 @@
+"""
+Test timing.py
+"""
+from __future__ import annotations
+
+import math
+import sys
+import time
+
+import pytest
+
+from town_clock.clock import ClockRelay, timing
+from town_clock.clock.time_source import SYSTEM_TIME, VirtualTime
+
+
+@pytest.fixture(autouse=True)
+def clear_histograms():
+    timing.HISTOGRAMS.clear()
+    yield
+    timing.HISTOGRAMS.clear()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux")
+def test_clock_nanosleep_loaded():
+    assert timing._clock_nanosleep is not None
+
+
+def test_sleep_until_ns_is_never_early():
+    for delay_ns in (0, 50_000, 1_000_000, 5_000_000):
+        deadline = time.monotonic_ns() + delay_ns
+        late = timing.sleep_until_ns(deadline)
+        assert time.monotonic_ns() >= deadline
+        assert 0 <= late < 50_000_000
+
+
+def test_sleep_until_seconds():
+    deadline = time.monotonic() + 0.002
+    assert SYSTEM_TIME.sleep_until(deadline) >= 0
+    assert time.monotonic() >= deadline
+
+
+def test_sleep_until_wall():
+    edge = time.time() + 0.003
+    assert timing.sleep_until_wall(edge) > -0.001
+    assert time.time() >= edge - 0.001
+
+
+def test_histogram():
+    hist = timing.histogram("test")
+    assert timing.histogram("test") is hist
+    for error_ns in (500, 1_500, 3_000, 150_000, -4_000):
+        hist.record(error_ns)
+    assert hist.count == 5
+    assert hist.early == 1
+    assert (hist.min_ns, hist.max_ns) == (-4_000, 150_000)
+    assert hist.counts[0] == 1
+    assert hist.percentile(0.5) == 5
+    assert hist.percentile(1.0) == 200
+    summary = hist.as_dict()
+    assert summary["buckets_us"]["5"] == 2
+    assert summary["mean_ns"] == pytest.approx(30_200)
+
+
+def test_empty_histogram():
+    hist = timing.JitterHistogram("empty")
+    assert hist.percentile(0.99) == 0.0
+    assert str(hist) == "empty: no samples"
+    hist.record(10**12)
+    assert hist.percentile(1.0) == math.inf
+
+
+def test_relay_pulse_records_width():
+    source = VirtualTime()
+    relay = ClockRelay(23, "ONE", pin=24, name="ONE", time_source=source)
+    assert relay.pulse(0.1)
+    assert source.monotonic() == pytest.approx(0.1)
+    assert timing.histogram("pulse_width").count == 1
+    assert "pulse_width: n=1" in timing.report()
@@ -0,0 +1,226 @@
+"""
+Test config.py
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from town_clock import config as config_module
+from town_clock.config import (
+    CONFIG_FILE,
+    Config,
+    load_config,
+    parse_config,
+    read_config,
+    snapshot_path,
+)
+from town_clock.controller import Controller
+from town_clock.util import Mode
+from town_clock.util.clock_exceptions import ConfigError
+from town_clock.util.sun_table import DARK, write_sun_table
+
+CONFIG: dict[str, Any] = {
+    "Clock_Location": {
+        "latitude": "30.3402S",
+        "longitude": "152.7124E",
+        "altitude": 741,
+        "timezone": "Australia/Sydney",
+    },
+    "Clock_Pins": {"clock_pins": [24, 25], "led_pin": 22, "common_pin": 23},
+    "Clock_Faces": {"names": ["EAST", "WEST"]},
+    "Clock_Mode": {"mode": "test"},
+    "Clock_Logging": {"folder": "logs"},
+    "Clock_State": {"file": "state/positions.journal"},
+}
+
+
+@pytest.fixture
+def toml(tmp_path) -> Path:
+    folder = tmp_path / "config"
+    folder.mkdir()
+    path = folder / "config.toml"
+    shutil.copy(CONFIG_FILE, path)
+    with open(path, "a") as file:
+        file.write('\n[Clock_Extra]\nnote = "x"\n')
+    return path
+
+
+def test_parse_config(tmp_path) -> None:
+    config = parse_config(CONFIG, tmp_path)
+    assert config.location.latitude == pytest.approx(-30.3402)
+    assert config.location.longitude == pytest.approx(152.7124)
+    assert config.location.timezone == "Australia/Sydney"
+    assert config.mode is Mode.TEST
+    assert config.face_pins == {"EAST": 24, "WEST": 25}
+    assert config.state_file == tmp_path / "state/positions.journal"
+    assert config.pulse_journal is None
+    assert Config.from_dict(config.as_dict()) == config
+
+
+def test_parse_config_reports_every_error(tmp_path) -> None:
+    data = {
+        **CONFIG,
+        "Clock_Location": {"latitude": "95N", "altitude": "high"},
+        "Clock_Pins": {"clock_pins": [24, 22], "led_pin": 22},
+        "Clock_Mode": {"mode": "fast"},
+    }
+    with pytest.raises(ConfigError) as err:
+        parse_config(data, tmp_path)
+    problems = err.value.args
+    assert "Clock_Location.latitude must be within +-90, not 95.0" in problems
+    assert "Clock_Location.longitude is missing" in problems
+    assert "Clock_Location.altitude must be int or float, not 'high'" in (
+        problems
+    )
+    assert "Clock_Pins.common_pin is missing" in problems
+    assert any("used more than once" in p for p in problems)
+    assert any(p.startswith("Clock_Mode.mode must be") for p in problems)
+
+
+def test_parse_config_finds_timezone(tmp_path) -> None:
+    location = {**CONFIG["Clock_Location"]}
+    del location["timezone"]
+    seen = []
+
+    def find(lat, long, table) -> str:
+        seen.append((lat, long, table))
+        return "Australia/Brisbane"
+
+    config = parse_config(
+        {**CONFIG, "Clock_Location": location}, tmp_path, find
+    )
+    assert config.location.timezone == "Australia/Brisbane"
+    assert len(seen) == 1
+
+
+def test_unknown_timezone(tmp_path) -> None:
+    location = {**CONFIG["Clock_Location"], "timezone": "Mars/Olympus"}
+    with pytest.raises(ConfigError):
+        parse_config({**CONFIG, "Clock_Location": location}, tmp_path)
+
+
+def test_shipped_config() -> None:
+    config = read_config(CONFIG_FILE)
+    assert config.pins.clock_pins == (24, 25)
+    assert config.face_names == ("ONE", "TWO")
+    assert config.location.timezone == "Australia/Sydney"
+
+
+def test_snapshot_is_reused(toml, monkeypatch) -> None:
+    reads = []
+    real_read = config_module.read_config
+
+    def counting_read(path):
+        reads.append(path)
+        return real_read(path)
+
+    monkeypatch.setattr(config_module, "read_config", counting_read)
+    first = load_config(toml)
+    assert snapshot_path(toml).exists()
+    assert load_config(toml) == first
+    assert len(reads) == 1
+
+    # Touched, same contents.
+    stat = toml.stat()
+    os.utime(toml, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_config(toml) == first
+    assert len(reads) == 1
+
+    toml.write_text(toml.read_text().replace("'dev'", "'test'"))
+    assert load_config(toml).mode is Mode.TEST
+    assert len(reads) == 2
+
+
+def test_corrupt_snapshot(toml) -> None:
+    config = load_config(toml)
+    snapshot_path(toml).write_text("{not json")
+    assert load_config(toml) == config
+
+
+def test_controller_from_config(tmp_path) -> None:
+    config = parse_config(CONFIG, tmp_path)
+    controller = Controller.from_config(config)
+    assert controller.timezone == "Australia/Sydney"
+    assert controller.face_names == ["EAST", "WEST"]
+    assert controller.thermal.path == config.thermal.path
+
+
+def test_buttons(tmp_path) -> None:
+    config = parse_config(CONFIG, tmp_path)
+    assert config.buttons.pins == ()
+    assert Controller.from_config(config).buttons is None
+
+    buttons = {"pins": {"EAST": 5, "WEST": 6}, "long_press": 2}
+    config = parse_config({**CONFIG, "Clock_Buttons": buttons}, tmp_path)
+    assert config.buttons.pins == (("EAST", 5), ("WEST", 6))
+    assert config.buttons.long_press == 2.0
+    assert config.buttons.debounce == 0.02
+    assert Config.from_dict(config.as_dict()) == config
+    controller = Controller.from_config(config)
+    assert controller.buttons is not None
+    assert controller.tower.buttons is controller.buttons.events
+    controller.buttons.source.close()
+
+
+def test_buttons_errors(tmp_path) -> None:
+    buttons = {
+        "pins": {"EAST": 24, "NORTH": 6, "WEST": "7"},
+        "debounce": 1.5,
+    }
+    with pytest.raises(ConfigError) as err:
+        parse_config({**CONFIG, "Clock_Buttons": buttons}, tmp_path)
+    problems = err.value.args
+    assert "Clock_Buttons.pins must all be int" in problems
+    assert any("are not all faces" in p for p in problems)
+    assert any("clash with other pins" in p for p in problems)
+    assert (
+        "Clock_Buttons needs 0 <= debounce < long_press and repeat > 0"
+        in problems
+    )
+
+
+def test_snapshot_follows_sun_table_timezone(tmp_path) -> None:
+    def table(timezone: str, times: list[int]) -> None:
+        write_sun_table(
+            tmp_path / "sun.bin",
+            times,
+            [DARK] * len(times),
+            initial_state=DARK,
+            latitude=-30.3402,
+            longitude=152.7124,
+            altitude=741,
+            timezone=timezone,
+        )
+
+    folder = tmp_path / "config"
+    folder.mkdir()
+    toml = folder / "config.toml"
+    toml.write_text(
+        "[Clock_Location]\n"
+        'latitude = "30.3402S"\n'
+        'longitude = "152.7124E"\n'
+        "altitude = 741\n"
+        'sun_table = "sun.bin"\n'
+        "[Clock_Pins]\n"
+        "clock_pins = [24, 25]\nled_pin = 22\ncommon_pin = 23\n"
+        "[Clock_Faces]\n"
+        'names = ["EAST", "WEST"]\n'
+        "[Clock_Mode]\n"
+        'mode = "test"\n'
+        "[Clock_Logging]\n"
+        'folder = "logs"\n'
+    )
+    table("Australia/Sydney", [100])
+    config = load_config(toml)
+    assert config.location.timezone_found
+    assert config.location.timezone == "Australia/Sydney"
+    assert load_config(toml) == config
+
+    # Regenerated for another site, the TOML is untouched.
+    table("Australia/Brisbane", [100, 200])
+    assert load_config(toml).location.timezone == "Australia/Brisbane"
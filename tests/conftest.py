@@ -9,10 +9,65 @@ Started: 10/02/2023
 """
 from __future__ import annotations
 
+from typing import Any, Callable, Mapping
+
 from _pytest.logging import LogCaptureFixture
 from loguru import logger
 from pytest import fixture
 
+from town_clock import Clock, ClockTower, Time
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util import FaceName, Mode
+
+SYDNEY = "Australia/Sydney"
+
+
+class MockRelay:
+    """
+    Stands in for a ClockRelay or LEDRelay.
+
+    Parameters:
+        name (str): Written to the log.
+        log (list | None): Gets (time, name, on) for every switch.
+        source (TimeSource): Timestamps the log.
+        fail_on (int): turn_on raises OSError for this pulse, 0 never.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        log: list | None = None,
+        source: TimeSource = SYSTEM_TIME,
+        fail_on: int = 0,
+    ) -> None:
+        self.name = name
+        self.log = log
+        self.source = source
+        self.fail_on = fail_on
+        self.on = False
+        self.count = 0
+
+    def pulse(self) -> MockRelay:
+        return self.turn_on().turn_off()
+
+    def turn_on(self) -> MockRelay:
+        if self.fail_on and self.count + 1 == self.fail_on:
+            raise OSError("relay stuck")
+        self.on = True
+        self._record()
+        return self
+
+    def turn_off(self) -> MockRelay:
+        if self.on:
+            self.count += 1
+        self.on = False
+        self._record()
+        return self
+
+    def _record(self) -> None:
+        if self.log is not None:
+            self.log.append((self.source.time(), self.name, self.on))
+
 
 @fixture
 def position():
@@ -24,3 +79,72 @@ def caplog(caplog: LogCaptureFixture):
     handler_id = logger.add(caplog.handler, format="{message}")
     yield caplog
     logger.remove(handler_id)
+
+
+@fixture
+def mock_relay() -> type[MockRelay]:
+    return MockRelay
+
+
+@fixture
+def make_tower() -> Callable[..., ClockTower]:
+    """
+    Builds a tower in Sydney with a MockRelay for each face and the LED.
+    Faces are given as minutes behind the time, extra keywords go to
+    ClockTower.
+    """
+
+    def make(
+        source: TimeSource,
+        behind: Mapping[FaceName, int] | None = None,
+        log: list | None = None,
+        **kwargs: Any,
+    ) -> ClockTower:
+        if behind is None:
+            behind = {"ONE": 0, "TWO": 0}
+        tm = Time(timezone=SYDNEY, time_source=source)
+        clocks: dict[FaceName, Clock] = {
+            name: Clock(
+                name,
+                MockRelay(str(name), log, source),
+                time_on_clock=(tm.clock_time - minutes) % 720,
+                time_source=source,
+            )
+            for name, minutes in behind.items()
+        }
+        settings: dict[str, Any] = {
+            "running": True,
+            "mode": Mode.TEST,
+            "led": MockRelay("LED"),
+            "position": {},
+        }
+        settings.update(kwargs)
+        return ClockTower(time=tm, clock=clocks, **settings)
+
+    return make
+
+
+@fixture
+def simulate() -> Callable[[ClockTower, Any, float], ClockTower]:
+    """Ticks a tower on every minute edge of a VirtualTime until a time."""
+
+    def run(tower: ClockTower, source: Any, until: float) -> ClockTower:
+        while (edge := (source.time() // 60 + 1) * 60) <= until:
+            source.advance_to(edge)
+            tower.tick()
+        return tower
+
+    return run
+
+
+@fixture
+def in_sync() -> Callable[[ClockTower], bool]:
+    """Do all the faces show the time?"""
+
+    def check(tower: ClockTower) -> bool:
+        return all(
+            clock.time_on_clock == tower.time.clock_time
+            for clock in tower.clock.values()
+        )
+
+    return check
@@ -0,0 +1,207 @@
+"""
+controller_test.py
+
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from town_clock import controller as controller_module
+from town_clock.clock.anchored_time import JumpKind, TimeJump
+from town_clock.controller import Controller, next_minute_edge
+from town_clock.util import Mode
+from town_clock.util.thermal import ThermalMonitor
+
+
+@pytest.fixture
+def controller() -> Controller:
+    return Controller(
+        clock_pins=(24, 25),
+        led_pin=22,
+        common_pin=23,
+        lat=-30.3402,
+        long=152.7124,
+        alt=741,
+        mode=Mode.TEST,
+    )
+
+
+@pytest.mark.parametrize(
+    "wall, monotonic, expected",
+    (
+        (0.0, 100.0, (60.0, 160.0)),
+        (59.5, 10.0, (60.0, 10.5)),
+        (60.0, 10.0, (120.0, 70.0)),
+        (1_700_000_030.25, 5.0, (1_700_000_040.0, 14.75)),
+    ),
+)
+def test_next_minute_edge(wall, monotonic, expected) -> None:
+    assert next_minute_edge(wall, monotonic) == pytest.approx(expected)
+
+
+def test_controller_builds_tower(controller: Controller) -> None:
+    assert len(controller.tower.clock) == 2
+    assert controller.tower.slow == [0, 0]
+    assert controller.tower.faces == ["1", "2"]
+
+
+def test_controller_face_names_match_pins() -> None:
+    with pytest.raises(ValueError):
+        Controller(
+            clock_pins=(24, 25, 26),
+            led_pin=22,
+            common_pin=23,
+            lat=0,
+            long=0,
+            alt=0,
+            face_names=["ONE", "TWO"],
+        )
+
+
+def test_controller_reads_anchored_time(controller: Controller) -> None:
+    assert controller.tower.time_source is controller.time_source
+    assert all(
+        clock.time_source is controller.time_source
+        for clock in controller.tower.clock.values()
+    )
+    controller.on_time_jump(
+        TimeJump(JumpKind.FORWARD, 3600.0, 0.0, 1_700_000_000.0, 0.0)
+    )
+    rendered = controller.metrics.registry.render()
+    assert 'town_clock_time_jumps_total{kind="forward"} 1' in rendered
+
+
+def test_controller_tick_pulses_slow_clock(controller: Controller) -> None:
+    for clock in controller.tower.clock.values():
+        clock.sleep_time = 0.0
+    controller.tower.pulse_interval = 0.0
+    clock_one = next(iter(controller.tower.clock.values()))
+    clock_one.time_on_clock -= 1
+    asyncio.run(controller.tick())
+    assert clock_one.slow == 0
+
+
+def test_controller_main_runs_ticks(controller: Controller, monkeypatch):
+    ticks: list[None] = []
+
+    async def tick() -> None:
+        ticks.append(None)
+
+    monkeypatch.setattr(
+        controller_module,
+        "next_minute_edge",
+        lambda wall, monotonic: (wall, monotonic),
+    )
+    monkeypatch.setattr(controller, "tick", tick)
+    asyncio.run(controller.main(ticks=3))
+    assert len(ticks) == 3
+    assert not controller.tower.running
+
+
+@pytest.fixture
+def restartable(tmp_path, monkeypatch) -> tuple[Controller, list[str]]:
+    controller = Controller(
+        clock_pins=(24, 25),
+        led_pin=22,
+        common_pin=23,
+        lat=-30.3402,
+        long=152.7124,
+        alt=741,
+        mode=Mode.TEST,
+        face_names=["ONE", "TWO"],
+        state_file=tmp_path / "state" / "positions",
+        restart_file=tmp_path / "state" / "restart.json",
+    )
+    calls: list[str] = []
+    monkeypatch.setattr(
+        controller_module, "reexec", lambda: calls.append("exec")
+    )
+    monkeypatch.setattr(
+        controller_module.os, "system", lambda command: calls.append(command)
+    )
+    return controller, calls
+
+
+def test_restart_only_at_two(restartable) -> None:
+    controller, calls = restartable
+    controller.restart(time.struct_time((2026, 1, 1, 3, 0, 0, 0, 1, 0)))
+    assert calls == []
+
+
+def test_healthy_restart_is_warm(restartable) -> None:
+    controller, calls = restartable
+    controller.restart(time.struct_time((2026, 1, 1, 2, 0, 0, 0, 1, 0)))
+    assert calls == ["exec"]
+    assert controller.restart_file is not None
+    assert controller.restart_file.exists()
+
+    handoff = asyncio.run(controller.resume())
+    assert handoff is not None
+    assert handoff.reason == "nightly"
+    assert set(handoff.positions) == {"ONE", "TWO"}
+    assert not controller.restart_file.exists()
+    assert "town_clock_restart_seconds 0." in (
+        controller.metrics.registry.render()
+    )
+
+
+def test_unhealthy_restart_reboots(restartable) -> None:
+    controller, calls = restartable
+    controller.last_lag = 5.0
+    assert controller.health_check()
+    controller.restart(time.localtime(), force=True)
+    assert calls == ["sudo init 6"]
+
+
+def test_hot_tower_defers_compaction(restartable, tmp_path) -> None:
+    controller, _ = restartable
+    store = controller.store
+    assert store is not None and store.defer_compaction is not None
+    sysfs = tmp_path / "temp"
+    sysfs.write_text("90000\n")
+    controller.tower.thermal = ThermalMonitor(sysfs, alpha=1)
+    controller.tower.thermal.sample()
+    assert store.defer_compaction()
+    controller.tower.thermal.close()
+
+
+def test_warm_restart_without_store_keeps_positions(
+    tmp_path, monkeypatch
+) -> None:
+    def build() -> Controller:
+        return Controller(
+            clock_pins=(24, 25),
+            led_pin=22,
+            common_pin=23,
+            lat=-30.3402,
+            long=152.7124,
+            alt=741,
+            mode=Mode.TEST,
+            face_names=["ONE", "TWO"],
+            restart_file=tmp_path / "restart.json",
+        )
+
+    monkeypatch.setattr(controller_module, "reexec", lambda: None)
+    old = build()
+    clocks = old.tower.clock
+    clocks["ONE"].time_on_clock = (old.tower.time.clock_time - 30) % 720
+    clocks["ONE"].slow = 30
+    old.warm_restart("nightly")
+
+    new = build()
+    seen: list[tuple[int, int]] = []
+
+    async def pulse_task() -> None:
+        seen.extend(
+            (clock.time_on_clock, clock.slow)
+            for clock in new.tower.clock.values()
+        )
+
+    monkeypatch.setattr(new, "pulse_task", pulse_task)
+    assert asyncio.run(new.resume()) is not None
+    assert seen == [
+        (clock.time_on_clock, clock.slow) for clock in clocks.values()
+    ]
@@ -0,0 +1,117 @@
+"""
+Test host.py
+"""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from town_clock.clock.time_source import VirtualTime
+from town_clock.host import Scheduler, TowerHost
+from town_clock.util.sun_table import DARK, DAY, SunTable, write_sun_table
+
+START = 1_700_000_030.0
+
+
+def test_scheduler_order_and_cancel() -> None:
+    source = VirtualTime(START)
+    scheduler = Scheduler(source)
+    fired: list[str] = []
+    scheduler.call_at(2.0, lambda late: fired.append("b"))
+    scheduler.call_at(1.0, lambda late: fired.append("a"))
+    scheduler.call_at(2.0, lambda late: fired.append("c"))
+    scheduler.call_at(1.5, lambda late: fired.append("x")).cancel()
+    scheduler.call_at_wall(START + 3, lambda late: fired.append("wall"))
+
+    def broken(late: float) -> None:
+        raise RuntimeError("A failing timer must not stop the others")
+
+    scheduler.call_at(2.5, broken)
+    scheduler.run()
+    assert fired == ["a", "b", "c", "wall"]
+    assert source.time() == START + 3
+    assert scheduler.next_deadline() is None
+
+
+def test_scheduler_run_until() -> None:
+    source = VirtualTime(START)
+    scheduler = Scheduler(source)
+    fired: list[float] = []
+    scheduler.call_at(5.0, fired.append)
+    scheduler.run(until=3.0)
+    assert fired == [] and source.monotonic() == 3.0
+    scheduler.run(until=10.0)
+    assert fired == [0.0] and source.monotonic() == 10.0
+
+
+def test_host_catches_towers_up_together(make_tower) -> None:
+    source = VirtualTime(START)
+    host = TowerHost(source)
+    towers = [
+        make_tower(source, {"ONE": 3, "TWO": 1}, running=False),
+        make_tower(source, {"ONE": 5}, running=False),
+        make_tower(source, {"ONE": 0, "TWO": 2}, running=False),
+    ]
+    for idx, tower in enumerate(towers):
+        host.add(f"tower{idx}", tower)
+    with pytest.raises(ValueError):
+        host.add("tower0", towers[0])
+    threads = threading.active_count()
+    # The minute edge is 10s in, every tower plans then.
+    host.run(until=10.0)
+    slow = [clock.slow for t in towers for clock in t.clock.values()]
+    assert sum(slow) > max(slow) > 0
+    # Stepped together, the slowest face sets the time taken.
+    host.run(until=10.0 + max(slow) * 0.6 + 0.01)
+    assert threading.active_count() == threads
+    for tower in towers:
+        assert tower.running
+        for clock in tower.clock.values():
+            assert clock.time_on_clock == tower.time.clock_time
+            assert clock.slow == 0
+
+
+def test_host_tower_needs_shared_time(make_tower) -> None:
+    host = TowerHost(VirtualTime(START))
+    with pytest.raises(ValueError):
+        host.add(
+            "other", make_tower(VirtualTime(START), {"ONE": 0}, running=False)
+        )
+
+
+def test_host_remove(make_tower) -> None:
+    source = VirtualTime(START)
+    host = TowerHost(source)
+    tower = make_tower(source, {"ONE": 2}, running=False)
+    host.add("one", tower)
+    host.remove("one")
+    assert not tower.running
+    host.run(until=120.0)
+    assert tower.clock["ONE"].slow == 0
+    assert tower.clock["ONE"].time_on_clock != tower.time.clock_time
+
+
+def test_host_switches_led(tmp_path, make_tower) -> None:
+    source = VirtualTime(START)
+    path = write_sun_table(
+        tmp_path / "sun.bin",
+        # From before START to past the two days the schedule compiles.
+        [int(START) + t for t in (-100, 100, 200, 5 * 86_400)],
+        [DARK, DAY, DARK, DARK],
+        initial_state=DARK,
+        latitude=-30.3402,
+        longitude=152.7124,
+        altitude=741,
+        timezone="Australia/Sydney",
+    )
+    host = TowerHost(source)
+    tower = make_tower(source, {"ONE": 0}, running=False)
+    with SunTable(path) as table:
+        host.add("one", tower, sun_table=table)
+        led = tower.led
+        assert led.on  # type: ignore[attr-defined]
+        host.run(until=150.0)
+        assert not led.on  # type: ignore[attr-defined]
+        host.run(until=250.0)
+        assert led.on  # type: ignore[attr-defined]
@@ -0,0 +1,71 @@
+"""
+import_time_test.py
+
+Importing the package must stay cheap, a cold start after a power cut
+waits on it. Each case runs in a fresh interpreter.
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ("numpy", "skyfield", "pytz", "timezonefinder")
+
+CODE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+took = time.perf_counter() - start
+print(json.dumps([took, sorted(sys.modules)]))
+"""
+
+
+def import_in_subprocess(statement: str) -> tuple[float, set[str]]:
+    result = subprocess.run(
+        [sys.executable, "-c", CODE.format(statement=statement)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    took, modules = json.loads(result.stdout.splitlines()[-1])
+    return took, {name.partition(".")[0] for name in modules}
+
+
+def test_plain_import_is_cheap() -> None:
+    took, modules = import_in_subprocess("import town_clock")
+    assert took < 0.25
+    for name in (*HEAVY, "pendulum", "loguru"):
+        assert name not in modules
+
+
+@pytest.mark.parametrize(
+    "statement",
+    (
+        "from town_clock import ClockTower, Time",
+        "import town_clock.controller",
+        "from town_clock.util import Mode, FaceName",
+    ),
+)
+def test_tower_does_not_load_sun_code(statement: str) -> None:
+    took, modules = import_in_subprocess(statement)
+    assert took < 2.0
+    for name in HEAVY:
+        assert name not in modules
+
+
+def test_lazy_names_resolve() -> None:
+    import town_clock
+    from town_clock import clock, util
+
+    assert town_clock.ClockTower is clock.clock_tower.ClockTower
+    assert "SunTable" in dir(util)
+    assert util.SunTable.__module__ == "town_clock.util.sun_table"
+    with pytest.raises(AttributeError):
+        town_clock.Missing
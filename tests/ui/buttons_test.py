@@ -0,0 +1,127 @@
+"""
+Test buttons.py
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from town_clock.clock.gpio import Edge, FakeGpioEdges
+from town_clock.ui.buttons import (
+    ButtonDecoder,
+    ButtonEvent,
+    ButtonInput,
+    ButtonKind,
+)
+
+PIN = 5
+
+
+def decode(decoder: ButtonDecoder, *edges: tuple[bool, float]) -> list:
+    """Feed (rising, at) edges on PIN, give (kind, at) of the events."""
+    events: list[ButtonEvent] = []
+    for rising, at in edges:
+        events += decoder.edge(Edge(PIN, rising, at))
+    return [(event.kind, event.at) for event in events]
+
+
+@pytest.fixture
+def decoder() -> ButtonDecoder:
+    return ButtonDecoder(
+        {PIN: "ONE"}, debounce=0.02, long_press=1.0, repeat=0.25
+    )
+
+
+def test_press(decoder) -> None:
+    assert decode(decoder, (False, 10.0)) == []
+    assert decoder.next_deadline() == 11.0
+    assert decode(decoder, (True, 10.2)) == [(ButtonKind.PRESS, 10.2)]
+    assert decoder.next_deadline() is None
+
+
+def test_bounce_is_ignored(decoder) -> None:
+    bounces = [(False, 10.0), (True, 10.002), (False, 10.005)]
+    assert decode(decoder, *bounces) == []
+    assert decoder.poll(10.05) == []
+    releases = [(True, 10.3), (False, 10.301), (True, 10.304)]
+    assert decode(decoder, *releases) == [(ButtonKind.PRESS, 10.3)]
+    assert decoder.poll(10.4) == []
+
+
+def test_settled_level_is_checked(decoder) -> None:
+    # A tap shorter than debounce, the release is only seen by the settle
+    # check.
+    assert decode(decoder, (False, 10.0), (True, 10.01)) == []
+    assert decoder.next_deadline() == pytest.approx(10.02)
+    events = decoder.poll(10.05)
+    assert [(e.kind, e.at) for e in events] == [
+        (ButtonKind.PRESS, pytest.approx(10.02))
+    ]
+    # A press hidden in the bounce of a release starts the hold timer.
+    decode(decoder, (False, 11.0), (True, 11.5), (False, 11.505))
+    assert decoder.next_deadline() == pytest.approx(11.52)
+    assert decoder.poll(11.6) == []
+    assert decoder.next_deadline() == pytest.approx(12.52)
+
+
+def test_long_press_and_repeat(decoder) -> None:
+    decode(decoder, (False, 10.0))
+    assert decoder.poll(10.9) == []
+    kinds = [e.kind for now in (11.0, 11.25, 11.5) for e in decoder.poll(now)]
+    assert kinds == [
+        ButtonKind.LONG_PRESS,
+        ButtonKind.REPEAT,
+        ButtonKind.REPEAT,
+    ]
+    # Held, so letting go is not a press as well.
+    assert decode(decoder, (True, 11.6)) == []
+    assert decoder.next_deadline() is None
+
+
+def test_late_poll_gives_one_event(decoder) -> None:
+    decode(decoder, (False, 10.0))
+    assert len(decoder.poll(11.0)) == 1
+    assert len(decoder.poll(15.0)) == 1
+    assert decoder.next_deadline() == 15.25
+
+
+def test_active_high_and_unknown_pins() -> None:
+    decoder = ButtonDecoder({PIN: "ONE"}, active_low=False)
+    assert decoder.edge(Edge(6, True, 10.0)) == []
+    assert decode(decoder, (True, 10.0), (False, 10.1)) == [
+        (ButtonKind.PRESS, 10.1)
+    ]
+    with pytest.raises(ValueError):
+        ButtonDecoder({PIN: "ONE"}, debounce=2.0, long_press=1.0)
+
+
+def test_input_on_event_loop() -> None:
+    async def run() -> list[ButtonEvent]:
+        loop = asyncio.get_running_loop()
+        source = FakeGpioEdges([PIN, 6])
+        decoder = ButtonDecoder(
+            {PIN: "ONE", 6: "TWO"}, debounce=0.0, long_press=0.05, repeat=0.02
+        )
+        buttons = ButtonInput(source, decoder)
+        buttons.start()
+        now = loop.time()
+        source.set_line(6, False, now)
+        source.set_line(6, True, now + 0.01)
+        source.set_line(PIN, False, now)
+        await asyncio.sleep(0.1)
+        source.set_line(PIN, True)
+        await asyncio.sleep(0.01)
+        buttons.stop()
+        source.close()
+        events = []
+        while not buttons.events.empty():
+            events.append(buttons.events.get())
+        return events
+
+    events = asyncio.run(run())
+    assert events[0] == ButtonEvent("TWO", ButtonKind.PRESS, events[0].at)
+    assert [event.name for event in events[1:]] == ["ONE"] * (len(events) - 1)
+    assert events[1].kind is ButtonKind.LONG_PRESS
+    assert {event.kind for event in events[2:]} == {ButtonKind.REPEAT}
+    assert len(events) >= 3
@@ -1,9 +1,157 @@
 """
-lcd_screen.py
-
-Module for controlling
-
-Author: Zack Hankin
-Started: 27/01/2023
+Test lcd_screen.py
 """
 from __future__ import annotations
+
+import pytest
+
+from town_clock.clock.time_source import VirtualTime
+from town_clock.ui.lcd_screen import EN, RS, FakeI2CBus, LCDScreen
+
+
+class HD44780:
+    """Reads the backpack bytes back into what the LCD would show."""
+
+    def __init__(self, rows: int = 2, columns: int = 16) -> None:
+        self.ddram = bytearray(b" " * 128)
+        self.address = 0
+        self.four_bit = False
+        self.high: int | None = None
+        self.offsets = (0x00, 0x40, columns, 0x40 + columns)[:rows]
+        self.columns = columns
+
+    def feed(self, data: bytes) -> None:
+        strobed = False
+        for byte in data:
+            if byte & EN:
+                strobed = True
+            elif strobed:
+                strobed = False
+                self.nibble(byte & 0xF0, bool(byte & RS))
+
+    def nibble(self, nibble: int, rs: bool) -> None:
+        if not self.four_bit:
+            self.four_bit = nibble == 0x20
+            return
+        if self.high is None:
+            self.high = nibble
+            return
+        value, self.high = self.high | nibble >> 4, None
+        if rs:
+            self.ddram[self.address] = value
+            self.address = (self.address + 1) % 128
+        elif value & 0x80:
+            self.address = value & 0x7F
+        elif value == 0x01:
+            self.ddram[:] = b" " * 128
+            self.address = 0
+
+    @property
+    def lines(self) -> list[str]:
+        return [
+            self.ddram[offset:][: self.columns].decode()
+            for offset in self.offsets
+        ]
+
+
+@pytest.fixture
+def source() -> VirtualTime:
+    return VirtualTime(1_700_000_000.0)
+
+
+def show(bus: FakeI2CBus, rows: int = 2, columns: int = 16) -> HD44780:
+    lcd = HD44780(rows, columns)
+    for _, data in bus.history:
+        lcd.feed(data)
+    return lcd
+
+
+def test_first_flush_paints(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, time_source=source)
+    screen.set_line(0, "12:00 ONE 12:00")
+    screen.set_line(1, "Dark")
+    assert screen.dirty
+    assert screen.flush() == 19
+    assert not screen.dirty
+    assert show(bus).lines == ["12:00 ONE 12:00 ", "Dark            "]
+    assert {address for address, _ in bus.history} == {0x27}
+
+
+def test_only_changed_cells_are_sent(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, time_source=source)
+    screen.set_line(0, "12:00 ONE 12:00").flush()
+    before = bus.transactions, bus.bytes_written
+    source.advance(1)
+    screen.write(0, 4, "1")
+    screen.write(0, 14, "1")
+    assert screen.flush() == 2
+    # One write: two cursor moves and two characters, 4 bus bytes each.
+    assert bus.transactions == before[0] + 1
+    assert bus.bytes_written == before[1] + 16
+    assert show(bus).lines[0] == "12:01 ONE 12:01 "
+
+    source.advance(1)
+    assert screen.flush() == 0
+    assert bus.transactions == before[0] + 1
+
+
+def test_short_gaps_are_bridged(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, time_source=source).init()
+    sent = bus.bytes_written
+    screen.write(0, 0, "A B")
+    assert screen.flush() == 3
+    # One cursor move saved for one rewritten space.
+    assert bus.bytes_written - sent == 12
+    assert show(bus).lines[0].startswith("A B ")
+
+
+def test_rate_cap_coalesces(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, max_rate=2, time_source=source)
+    screen.set_line(0, "one").flush()
+    flushes = bus.transactions
+    for text in ("two", "six", "ten"):
+        source.advance(0.1)
+        screen.set_line(0, text)
+        assert screen.flush() == 0
+    assert bus.transactions == flushes
+    assert screen.dirty
+    source.advance(0.2)
+    assert screen.flush() == 3
+    assert bus.transactions == flushes + 1
+    assert show(bus).lines[0].startswith("ten ")
+    screen.set_line(1, "now")
+    assert screen.flush(force=True) == 3
+
+
+def test_four_rows(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, rows=4, columns=20, time_source=source)
+    for row in range(4):
+        screen.set_line(row, f"row {row}")
+    screen.flush()
+    assert [line.rstrip() for line in show(bus, 4, 20).lines] == [
+        f"row {row}" for row in range(4)
+    ]
+
+
+def test_write_clips_and_replaces(source) -> None:
+    screen = LCDScreen(FakeI2CBus(), time_source=source)
+    screen.write(1, 14, "°C and more")
+    assert screen.frame[1][14:] == b"?C"
+    with pytest.raises(IndexError):
+        screen.write(2, 0, "x")
+    with pytest.raises(ValueError):
+        LCDScreen(FakeI2CBus(), rows=4, columns=40)
+
+
+def test_backlight(source) -> None:
+    bus = FakeI2CBus()
+    screen = LCDScreen(bus, time_source=source)
+    screen.set_backlight(False)
+    assert bus.history[-1][1] == b"\x00"
+    screen.set_line(0, "x").flush()
+    assert not any(byte & 0x08 for byte in bus.history[-1][1])
@@ -1,4 +1,94 @@
 """
-Todo: Check out loguru
+Test clock_logging.py
 """
 from __future__ import annotations
+
+import logging
+import time
+
+from loguru import logger
+
+from town_clock.util import clock_logging
+from town_clock.util.clock_logging import BufferedSink, setup_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.batches.append(record.getMessage())
+
+
+def test_buffered_sink_batches() -> None:
+    handler = ListHandler()
+    sink = BufferedSink(handler, flush_interval=60)
+    for idx in range(5):
+        sink.write(f"message {idx} 100%\n")
+    assert sink.depth == 5
+    assert handler.batches == []
+    assert sink.drain() == 5
+    assert handler.batches == [
+        "".join(f"message {i} 100%\n" for i in range(5))
+    ]
+    assert sink.depth == 0
+    sink.stop()
+
+
+def test_buffered_sink_memory_cap() -> None:
+    handler = ListHandler()
+    sink = BufferedSink(
+        handler, max_bytes=30, flush_bytes=1000, flush_interval=60
+    )
+    for idx in range(10):
+        sink.write(f"message {idx}\n")  # 10 bytes each.
+    assert sink.size <= 30
+    assert sink.depth == 3
+    assert sink.dropped == 7
+    sink.drain()
+    assert handler.batches[0].startswith("... 7 log messages dropped ...\n")
+    assert handler.batches[0].endswith("message 9\n")
+    sink.stop()
+
+
+def test_buffered_sink_worker_flushes_on_size() -> None:
+    handler = ListHandler()
+    sink = BufferedSink(handler, flush_bytes=20, flush_interval=60)
+    sink.write("x" * 25 + "\n")
+    deadline = time.monotonic() + 5
+    while not handler.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert handler.batches == ["x" * 25 + "\n"]
+    sink.stop()
+
+
+def test_buffered_sink_stop_writes_remaining() -> None:
+    handler = ListHandler()
+    sink = BufferedSink(handler, flush_interval=60)
+    handler_id = logger.add(sink, format="{message}")
+    logger.info("last words")
+    logger.remove(handler_id)
+    assert handler.batches == ["last words\n"]
+
+
+def test_setup_logging(tmp_path, monkeypatch) -> None:
+    added: list[int] = []
+    add = logger.add
+
+    def recording_add(*args, **kwargs) -> int:
+        added.append(add(*args, **kwargs))
+        return added[-1]
+
+    monkeypatch.setattr(clock_logging.logger, "add", recording_add)
+    sinks = setup_logging(tmp_path)
+    logger.log("Pulse", "pulsed ONE")
+    logger.info("not a pulse")
+    for handler_id in added:
+        logger.remove(handler_id)
+    # Removing the handlers stopped the sinks.
+    for sink in sinks:
+        clock_logging.SINKS.remove(sink)
+    assert "pulsed ONE" in (tmp_path / "pulse.log").read_text()
+    assert "not a pulse" not in (tmp_path / "pulse.log").read_text()
+    assert "not a pulse" in (tmp_path / "clock.log").read_text()
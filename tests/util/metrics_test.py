@@ -0,0 +1,152 @@
+"""
+Test metrics.py
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+
+import pytest
+
+from town_clock.clock.time_source import VirtualTime
+from town_clock.util.metrics import (
+    Metric,
+    Registry,
+    TowerMetrics,
+    process_rss,
+    serve_metrics,
+)
+
+
+def test_counter_render():
+    registry = Registry()
+    pulses = registry.counter("pulses", "Pulses sent.", ("face",))
+    pulses.labels("ONE").inc()
+    pulses.labels("ONE").inc(2)
+    pulses.labels('T"W\\O').inc()
+    assert registry.render() == (
+        "# HELP pulses Pulses sent.\n"
+        "# TYPE pulses counter\n"
+        'pulses_total{face="ONE"} 3\n'
+        'pulses_total{face="T\\"W\\\\O"} 1\n'
+    )
+    with pytest.raises(ValueError):
+        pulses.labels("ONE").inc(-1)
+    with pytest.raises(ValueError):
+        pulses.labels("ONE", "extra")
+
+
+def test_gauge_render():
+    registry = Registry()
+    gauge = registry.gauge("temp", "Temperature.")
+    gauge.set(41.5)
+    assert "temp 41.5\n" in registry.render()
+    gauge.set_function(lambda: 50)
+    assert "temp 50\n" in registry.render()
+
+    def broken() -> float:
+        raise OSError("no sensor")
+
+    gauge.set_function(broken)
+    assert "temp NaN\n" in registry.render()
+
+
+def test_histogram_render():
+    registry = Registry()
+    hist = registry.histogram("lag", "Lag.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        hist.observe(value)
+    text = registry.render()
+    assert 'lag_bucket{le="0.1"} 1\n' in text
+    assert 'lag_bucket{le="1"} 3\n' in text
+    assert 'lag_bucket{le="+Inf"} 4\n' in text
+    assert "lag_sum 6.05\n" in text
+    assert "lag_count 4\n" in text
+
+
+def test_duplicate_metric():
+    registry = Registry()
+    registry.gauge("x", "x")
+    with pytest.raises(ValueError):
+        registry.counter("x", "x")
+
+
+def test_process_rss(monkeypatch):
+    assert process_rss() > 0
+
+    def no_proc(*args, **kwargs):
+        raise FileNotFoundError("/proc/self/statm")
+
+    monkeypatch.setattr("builtins.open", no_proc)
+    assert math.isnan(process_rss())
+
+
+def test_metric_must_implement_samples():
+    class Untyped(Metric[float]):
+        def _new_child(self) -> float:
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Untyped("x", "x")  # type: ignore[abstract]
+
+
+def test_tower_metrics(make_tower):
+    source = VirtualTime(1_700_000_040.0)
+    metrics = TowerMetrics.create()
+    tower = make_tower(source, {"ONE": 3, "TWO": 1}, metrics=metrics)
+    tower.sync()
+    text = metrics.registry.render()
+    assert 'town_clock_slow_minutes{face="ONE"} 3\n' in text
+    assert 'town_clock_pulses_total{face="ONE",outcome="ok"} 3\n' in text
+    assert 'town_clock_pulses_total{face="TWO",outcome="ok"} 1\n' in text
+    assert "town_clock_catch_up_seconds_count 1\n" in text
+
+
+async def _get(open_connection, path: str = "/metrics") -> bytes:
+    reader, writer = await open_connection()
+    writer.write(f"GET {path} HTTP/1.0\r\nHost: x\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_serve_tcp():
+    registry = Registry()
+    registry.counter("hits", "Hits.").inc()
+
+    async def run() -> tuple[bytes, bytes]:
+        server = await serve_metrics(registry, "127.0.0.1:0")
+        port = server.sockets[0].getsockname()[1]
+        try:
+            found = await _get(
+                lambda: asyncio.open_connection("127.0.0.1", port)
+            )
+            missing = await _get(
+                lambda: asyncio.open_connection("127.0.0.1", port), "/"
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
+        return found, missing
+
+    found, missing = asyncio.run(run())
+    assert found.startswith(b"HTTP/1.0 200 OK\r\n")
+    assert found.endswith(b"hits_total 1\n")
+    assert missing.startswith(b"HTTP/1.0 404")
+
+
+def test_serve_unix(tmp_path):
+    registry = Registry()
+    registry.gauge("up", "Up.").set(1)
+    path = str(tmp_path / "metrics.sock")
+
+    async def run() -> bytes:
+        server = await serve_metrics(registry, path)
+        try:
+            return await _get(lambda: asyncio.open_unix_connection(path))
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(run()).endswith(b"up 1\n")
@@ -0,0 +1,98 @@
+"""
+position_store_test.py
+
+"""
+from __future__ import annotations
+
+import pytest
+
+from town_clock.clock import Time
+from town_clock.util.clock_exceptions import NoValidTimeFromFileError
+from town_clock.util.position_store import (
+    HEADER,
+    RECORD_SIZE,
+    PositionStore,
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "state" / "positions.journal"
+
+
+def test_position_store_empty(path) -> None:
+    store = PositionStore(path, faces=2)
+    with pytest.raises(NoValidTimeFromFileError):
+        store.recover()
+    assert path.exists()
+    store.close()
+
+
+def test_position_store_round_trip(path) -> None:
+    store = PositionStore(path, faces=3, sync_interval=0)
+    store.record(0, 10, timestamp=1000)
+    store.record(1, 20, timestamp=1001)
+    store.record(0, 11, timestamp=1002)
+    store.close()
+
+    state = PositionStore(path, faces=3).recover()
+    assert state.positions == [11, 20, None]
+    assert state.timestamp == 1002
+
+
+def test_position_store_drops_torn_record(path) -> None:
+    store = PositionStore(path, faces=2)
+    store.record(0, 10, timestamp=1000)
+    store.record(1, 20, timestamp=1001)
+    store.close()
+    size = path.stat().st_size
+    with open(path, "ab") as file:
+        file.write(b"\x01\x02\x03")  # Power cut mid write.
+
+    store = PositionStore(path, faces=2)
+    assert store.recover().positions == [10, 20]
+    assert path.stat().st_size == size
+    store.record(0, 11, timestamp=1002)
+    store.close()
+    assert PositionStore(path, faces=2).recover().positions == [11, 20]
+
+
+def test_position_store_stops_at_bad_checksum(path) -> None:
+    store = PositionStore(path, faces=1)
+    for position in range(5):
+        store.record(0, position, timestamp=1000 + position)
+    store.close()
+    data = bytearray(path.read_bytes())
+    data[-RECORD_SIZE * 2] ^= 0xFF  # Corrupt the fourth record.
+    path.write_bytes(bytes(data))
+    state = PositionStore(path, faces=1).recover()
+    assert state.positions == [2]
+    assert state.timestamp == 1002
+
+
+def test_position_store_compacts(path) -> None:
+    store = PositionStore(path, faces=2, compact_every=10)
+    for position in range(25):
+        store.record(position % 2, position, timestamp=1000 + position)
+    store.close()
+    header_size = HEADER.size + 2 * 2 + 4
+    assert path.stat().st_size <= header_size + 10 * RECORD_SIZE
+    state = PositionStore(path, faces=2).recover()
+    assert state.positions == [24, 23]
+    assert state.timestamp == 1024
+
+
+def test_position_store_corrupt_header(path) -> None:
+    path.parent.mkdir()
+    path.write_bytes(b"garbage" * 10)
+    with pytest.raises(NoValidTimeFromFileError):
+        PositionStore(path, faces=2).recover()
+
+
+def test_time_get_time_from_file(path) -> None:
+    store = PositionStore(path, faces=1)
+    with pytest.raises(NoValidTimeFromFileError):
+        Time(store=store).get_time_from_file()
+    store.record(0, 5, timestamp=1_700_000_000)
+    store.close()
+    assert Time(store=store).now.int_timestamp == 1_700_000_000
@@ -0,0 +1,134 @@
+"""
+pulse_journal_test.py
+
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from town_clock.util import pulse_journal
+from town_clock.util.pulse_journal import (
+    BLOCK,
+    RECORD,
+    Outcome,
+    PulseJournal,
+    PulseRecord,
+)
+
+DAY_ONE = int(datetime(2026, 10, 13, tzinfo=timezone.utc).timestamp())
+DAY_TWO = DAY_ONE + 86400
+
+
+@pytest.fixture
+def journal(tmp_path) -> PulseJournal:
+    journal = PulseJournal(tmp_path / "pulses")
+    for minute in range(2 * 24 * 60):
+        timestamp = DAY_ONE + minute * 60
+        journal.append(0, timestamp=timestamp)
+        outcome = Outcome.FAILED if minute % 100 == 0 else Outcome.OK
+        journal.append(1, outcome, timestamp=timestamp)
+    journal.flush()
+    return journal
+
+
+def test_pulse_journal_rotates_by_day(journal: PulseJournal) -> None:
+    first = journal.data_path(date(2026, 10, 13))
+    second = journal.data_path(date(2026, 10, 14))
+    assert first.stat().st_size == 2 * 24 * 60 * RECORD.size
+    assert second.exists()
+    # The first day was indexed when the second began.
+    index = journal.index_path(date(2026, 10, 13))
+    assert index.stat().st_size == -(-2 * 24 * 60 // BLOCK) * 8
+    assert not journal.index_path(date(2026, 10, 14)).exists()
+
+
+def test_pulse_journal_query_range(journal: PulseJournal) -> None:
+    start = DAY_ONE + 100 * 60
+    records = list(journal.query(start, start + 2 * 3600, face=1))
+    assert len(records) == 120
+    assert records[0] == PulseRecord(start, 1, Outcome.FAILED)
+    assert all(record.face == 1 for record in records)
+
+
+def test_pulse_journal_query_spans_days(journal: PulseJournal) -> None:
+    records = list(journal.query(DAY_TWO - 60, DAY_TWO + 60))
+    assert [record.timestamp for record in records] == [
+        DAY_TWO - 60,
+        DAY_TWO - 60,
+        DAY_TWO,
+        DAY_TWO,
+    ]
+
+
+def test_pulse_journal_uses_index(journal: PulseJournal, monkeypatch) -> None:
+    reads: list[int] = []
+    real_open = open
+
+    class CountingFile:
+        def __init__(self, file) -> None:
+            self.file = file
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args) -> None:
+            self.file.close()
+
+        def seek(self, offset: int) -> None:
+            self.file.seek(offset)
+
+        def read(self, size: int) -> bytes:
+            reads.append(size)
+            return self.file.read(size)
+
+    def counting_open(path, mode="r", *args, **kwargs):
+        return CountingFile(real_open(path, mode, *args, **kwargs))
+
+    monkeypatch.setattr(pulse_journal, "open", counting_open, raising=False)
+    records = list(journal.query(DAY_ONE + 60, DAY_ONE + 120))
+    assert len(records) == 2
+    assert len(reads) == 1
+
+
+def test_pulse_journal_torn_record(tmp_path) -> None:
+    journal = PulseJournal(tmp_path)
+    journal.append(0, timestamp=DAY_ONE)
+    journal.close()
+    with open(journal.data_path(date(2026, 10, 13)), "ab") as file:
+        file.write(b"\x00\x01")
+    journal.append(1, timestamp=DAY_ONE + 60)
+    assert list(journal.query(DAY_ONE, DAY_TWO)) == [
+        PulseRecord(DAY_ONE, 0, Outcome.OK),
+        PulseRecord(DAY_ONE + 60, 1, Outcome.OK),
+    ]
+
+
+def test_pulse_journal_seal_missing(tmp_path) -> None:
+    journal = PulseJournal(tmp_path)
+    journal.append(0, timestamp=DAY_ONE)
+    journal.close()
+    assert journal.seal_missing(today=date(2026, 10, 14)) == [
+        journal.index_path(date(2026, 10, 13))
+    ]
+
+
+def test_pulse_journal_cli(journal: PulseJournal, capsys) -> None:
+    pulse_journal.main(
+        [
+            str(journal.folder),
+            "--start",
+            "2026-10-13T00:00+00:00",
+            "--end",
+            "2026-10-13T00:02+00:00",
+            "--face",
+            "1",
+        ]
+    )
+    out = capsys.readouterr()
+    assert out.out.splitlines() == [
+        "2026-10-13T00:00:00+00:00 face=1 FAILED",
+        "2026-10-13T00:01:00+00:00 face=1 OK",
+    ]
+    assert out.err == "2 pulses\n"
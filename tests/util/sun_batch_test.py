@@ -0,0 +1,160 @@
+"""
+Test sun_batch.py
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from town_clock.config import LocationConfig
+from town_clock.util.sun_batch import (
+    LEVELS,
+    TRANSITION_DTYPE,
+    _utc,
+    compute_transitions_batch,
+    generate_sun_tables,
+    site_transitions,
+)
+from town_clock.util.sun_table import (
+    ASTRONOMICAL,
+    CIVIL,
+    DARK,
+    DAY,
+    NAUTICAL,
+    SunTable,
+)
+
+# Midnight UTC, the sun is over longitude 180.
+START = datetime(2026, 3, 20, tzinfo=timezone.utc)
+
+
+class EquinoxSun:
+    """The sun on the equator all year, noon at Greenwich at 12:00 UTC."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, seconds):
+        self.calls += 1
+        seconds = np.asarray(seconds, dtype=np.float64)
+        noon = START.timestamp() + 43_200
+        hour_angle = 2 * np.pi * (seconds - noon) / 86_400
+        return np.zeros_like(seconds), hour_angle
+
+
+def crossing(latitude: float, longitude: float, level: float) -> float:
+    """Seconds after START the rising sun reaches level, by hand."""
+    cos_h = math.sin(math.radians(level)) / math.cos(math.radians(latitude))
+    hour_angle = math.degrees(math.acos(cos_h))
+    return 43_200 - (hour_angle + longitude) * 240
+
+
+def test_one_site_matches_the_formula() -> None:
+    sun = EquinoxSun()
+    transitions, initial = compute_transitions_batch(
+        [0.0], [0.0], START, START + timedelta(days=1), refine=4, sun=sun
+    )
+    assert sun.calls == 5
+    assert transitions.dtype == TRANSITION_DTYPE
+    assert initial.tolist() == [DARK]
+    assert transitions["state"].tolist() == [
+        ASTRONOMICAL,
+        NAUTICAL,
+        CIVIL,
+        DAY,
+        CIVIL,
+        NAUTICAL,
+        ASTRONOMICAL,
+        DARK,
+    ]
+    rising = transitions["time"][:4] - START.timestamp()
+    expected = [crossing(0, 0, level) for level in LEVELS]
+    assert rising == pytest.approx(expected, abs=1)
+    # Symmetric about noon.
+    setting = transitions["time"][4:][::-1] - START.timestamp()
+    assert setting == pytest.approx([86_400 - t for t in expected], abs=1)
+    assert (transitions["date"] == np.datetime64("2026-03-20")).all()
+
+
+def test_many_sites_in_one_pass() -> None:
+    latitudes = [0.0, 60.0, -33.9]
+    longitudes = [0.0, 90.0, 151.2]
+    end = START + timedelta(days=3)
+    sun = EquinoxSun()
+    transitions, initial = compute_transitions_batch(
+        latitudes, longitudes, START, end, sun=sun
+    )
+    assert sun.calls == 5
+    assert len(initial) == 3
+    order = np.lexsort((transitions["time"], transitions["site"]))
+    assert (order == np.arange(len(transitions))).all()
+
+    sunrise = site_transitions(transitions, 1)
+    sunrise = sunrise[sunrise["state"] == DAY]
+    assert len(sunrise) == 3
+    # The first sunrise there was just before START.
+    assert sunrise["time"][0] - START.timestamp() == pytest.approx(
+        crossing(60, 90, LEVELS[-1]) + 86_400, abs=1
+    )
+
+    for site, (lat, lon) in enumerate(zip(latitudes, longitudes)):
+        alone, first = compute_transitions_batch(
+            [lat], [lon], START, end, sun=EquinoxSun()
+        )
+        rows = site_transitions(transitions, site)
+        assert first[0] == initial[site]
+        assert rows["time"].tolist() == alone["time"].tolist()
+        assert rows["state"].tolist() == alone["state"].tolist()
+
+
+def test_dates_follow_utc() -> None:
+    transitions, _ = compute_transitions_batch(
+        [0.0], [0.0], START, START + timedelta(days=2), sun=EquinoxSun()
+    )
+    assert np.unique(transitions["date"]).tolist() == [
+        START.date(),
+        (START + timedelta(days=1)).date(),
+    ]
+
+
+def test_epoch_seconds_match_skyfield_datetimes() -> None:
+    from skyfield.api import load
+
+    ts = load.timescale()
+    seconds = np.array([0.0, 1_790_000_000.5, START.timestamp()])
+    t = _utc(ts, seconds)
+    expected = ts.from_datetimes(
+        [datetime.fromtimestamp(s, timezone.utc) for s in seconds]
+    )
+    assert np.abs(t.tt - expected.tt).max() * 86400 < 1e-3
+
+
+def test_bad_sites() -> None:
+    with pytest.raises(ValueError):
+        compute_transitions_batch(
+            [0.0, 1.0], [0.0], START, START + timedelta(days=1)
+        )
+
+
+def test_generate_sun_tables(tmp_path) -> None:
+    sites = {
+        "equator": LocationConfig(0.0, 0.0, 10.0, "Africa/Accra"),
+        "dorrigo": LocationConfig(
+            -30.3402, 152.7124, 741.0, "Australia/Sydney"
+        ),
+    }
+    paths = generate_sun_tables(
+        tmp_path / "tables", sites, years=1, start=START, sun=EquinoxSun()
+    )
+    assert set(paths) == set(sites)
+    with SunTable(paths["dorrigo"]) as table:
+        assert table.timezone == "Australia/Sydney"
+        assert table.altitude == 741.0
+        # Four transitions a day, each way.
+        assert len(table) == 8 * 365
+        midday = START.timestamp() + 43_200 - 152.7124 * 240
+        assert not table.is_dark_at(midday)
+        assert table.is_dark_at(midday + 43_200)
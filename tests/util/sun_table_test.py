@@ -0,0 +1,172 @@
+"""
+sun_table_test.py
+
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from town_clock.util import location_sunrise_sunset, sun_table
+from town_clock.util.location_sunrise_sunset import find_sunrise_sunset_times
+from town_clock.util.sun_table import (
+    CIVIL,
+    DARK,
+    DAY,
+    NAUTICAL,
+    SunTable,
+    SunTableError,
+    write_sun_table,
+)
+
+TIMES = [1000, 2000, 3000, 4000, 5000]
+STATES = [NAUTICAL, CIVIL, DAY, CIVIL, DARK]
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = write_sun_table(
+        tmp_path / "sun.bin",
+        TIMES,
+        STATES,
+        initial_state=DARK,
+        latitude=-30.3402,
+        longitude=152.7124,
+        altitude=741,
+        timezone="Australia/Sydney",
+    )
+    with SunTable(path) as sun_table:
+        yield sun_table
+
+
+def test_sun_table_header(table: SunTable) -> None:
+    assert len(table) == 5
+    assert table.timezone == "Australia/Sydney"
+    assert table.latitude == -30.3402
+    assert (table.start, table.end) == (1000, 5000)
+
+
+@pytest.mark.parametrize(
+    "t, expected",
+    (
+        (0, DARK),
+        (999, DARK),
+        (1000, NAUTICAL),
+        (2500, CIVIL),
+        (3000, DAY),
+        (4999, CIVIL),
+        (9999, DARK),
+    ),
+)
+def test_sun_table_state_at(table: SunTable, t, expected) -> None:
+    assert table.state_at(t) == expected
+
+
+@pytest.mark.parametrize(
+    "t, threshold, expected",
+    (
+        (3500, DAY, False),
+        (4500, DAY, True),
+        (2500, CIVIL, False),
+        (1500, CIVIL, True),
+    ),
+)
+def test_sun_table_is_dark_at(table: SunTable, t, threshold, expected) -> None:
+    assert table.is_dark_at(t, threshold) == expected
+
+
+def test_sun_table_next_transition(table: SunTable) -> None:
+    assert table.next_transition(0) == (1000, NAUTICAL)
+    assert table.next_transition(1000) == (2000, CIVIL)
+    assert table.next_transition(5000) is None
+
+
+def test_sun_table_transitions(table: SunTable) -> None:
+    assert list(table.transitions(2000, 4000)) == [(2000, CIVIL), (3000, DAY)]
+    assert table.covers(1000, 5000)
+    assert not table.covers(0, 5000)
+
+
+def test_sun_table_rejects_bad_files(tmp_path) -> None:
+    path = tmp_path / "bad.bin"
+    path.write_bytes(b"not a sun table at all" * 10)
+    with pytest.raises(SunTableError):
+        SunTable(path)
+    with pytest.raises(ValueError):
+        write_sun_table(path, [2, 1], [0, 0], 0, 0, 0, 0, "UTC")
+
+
+def test_sun_table_is_for(table: SunTable) -> None:
+    assert table.is_for(-30.3402, 152.7124)
+    assert table.is_for(-30.345, 152.71)
+    assert not table.is_for(-27.4698, 153.0251)
+
+
+def _today_table(tmp_path, latitude: float, longitude: float) -> SunTable:
+    now = int(time.time())
+    times = [now + t for t in range(-2 * 86400, 3 * 86400, 3600)]
+    return SunTable(
+        write_sun_table(
+            tmp_path / "today.bin",
+            times,
+            [(CIVIL, DAY)[i % 2] for i in range(len(times))],
+            initial_state=DARK,
+            latitude=latitude,
+            longitude=longitude,
+            altitude=741,
+            timezone="Australia/Sydney",
+        )
+    )
+
+
+class SkyfieldUsed(Exception):
+    ...
+
+
+def _no_skyfield(*args, **kwargs):
+    raise SkyfieldUsed
+
+
+def test_find_sunrise_sunset_uses_table_for_its_site(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        "town_clock.util.location_sunrise_sunset.load.timescale", _no_skyfield
+    )
+    with _today_table(tmp_path, -30.3402, 152.7124) as table:
+        times = find_sunrise_sunset_times(-30.3402, 152.7124, 741, table)
+    assert times and list(times) == list(range(1, len(times) + 1))
+
+
+def test_find_sunrise_sunset_ignores_other_sites_table(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        "town_clock.util.location_sunrise_sunset.load.timescale", _no_skyfield
+    )
+    with _today_table(tmp_path, -27.4698, 153.0251) as table:
+        with pytest.raises(SkyfieldUsed):
+            find_sunrise_sunset_times(-30.3402, 152.7124, 741, table)
+
+
+def test_generate_uses_given_timezone(tmp_path, monkeypatch) -> None:
+    starts: list[datetime] = []
+
+    def compute(latitude, longitude, altitude, start, end):
+        starts.append(start)
+        return [int(start.timestamp()) + 3600], [DAY], DARK
+
+    monkeypatch.setattr(sun_table, "compute_transitions", compute)
+    monkeypatch.setattr(
+        location_sunrise_sunset, "timezone_finder", _no_skyfield
+    )
+    path = sun_table.generate_sun_table(
+        tmp_path / "sun.bin", 51.48, 0.0, 10, years=1, timezone="Asia/Tokyo"
+    )
+    (start,) = starts
+    assert start.utcoffset() == timedelta(hours=9)
+    assert (start.hour, start.minute) == (0, 0)
+    with SunTable(path) as table:
+        assert table.timezone == "Asia/Tokyo"
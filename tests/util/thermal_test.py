@@ -0,0 +1,127 @@
+"""
+Test thermal.py
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from town_clock.clock.time_source import VirtualTime
+from town_clock.util.position_store import PositionStore
+from town_clock.util.thermal import ThermalMonitor
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    path = tmp_path / "temp"
+    path.write_text("45000\n")
+    return path
+
+
+def set_temp(path, celsius: float) -> None:
+    # sysfs rewrites in place, keep the file and so the open fd.
+    with open(path, "r+") as file:
+        file.write(f"{int(celsius * 1000)}\n".ljust(8))
+
+
+def test_read(sysfs) -> None:
+    monitor = ThermalMonitor(sysfs)
+    assert monitor.read() == 45.0
+    fd = monitor._fd
+    set_temp(sysfs, 52.5)
+    assert monitor.read() == 52.5
+    assert monitor._fd == fd
+    monitor.close()
+
+
+def test_missing_file(tmp_path) -> None:
+    monitor = ThermalMonitor(tmp_path / "missing")
+    assert monitor.read() is None
+    assert monitor.sample() is None
+    assert not monitor.throttling
+    assert monitor.rate_factor == 1.0
+
+
+def test_smoothing_and_thresholds(sysfs) -> None:
+    monitor = ThermalMonitor(sysfs, alpha=0.5, throttle_at=70, defer_at=75)
+    assert monitor.sample() == 45.0
+    set_temp(sysfs, 85)
+    assert monitor.sample() == 65.0
+    assert not monitor.throttling
+    assert monitor.sample() == 75.0
+    assert monitor.throttling and monitor.deferring
+    assert monitor.rate_factor == 0.5
+    set_temp(sysfs, 73)
+    assert monitor.sample() == 74.0
+    # Within the hysteresis of defer_at, still deferring.
+    assert monitor.deferring
+    set_temp(sysfs, 65)
+    assert monitor.sample() == 69.5
+    assert monitor.throttling and not monitor.deferring
+
+
+def test_background_sampling(sysfs) -> None:
+    monitor = ThermalMonitor(sysfs, interval=0.01).start()
+    try:
+        deadline = time.monotonic() + 2
+        while monitor.temperature is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert monitor.temperature == 45.0
+    finally:
+        monitor.stop()
+    assert monitor._fd is None
+
+
+def test_bad_parameters(sysfs) -> None:
+    with pytest.raises(ValueError):
+        ThermalMonitor(sysfs, alpha=0)
+    with pytest.raises(ValueError):
+        ThermalMonitor(sysfs, throttle_factor=2)
+
+
+def test_tower_throttles_when_hot(sysfs, make_tower) -> None:
+    source = VirtualTime(1_700_000_040.0)
+    thermal = ThermalMonitor(sysfs, alpha=1, throttle_factor=0.25)
+    tower = make_tower(source, {"ONE": 10}, thermal=thermal)
+    tm, clocks = tower.time, tower.clock
+    thermal.sample()
+    cool_rate = tower.max_rate(clocks["ONE"])
+    start = source.monotonic()
+    tower.sync()
+    cool = source.monotonic() - start
+
+    clocks["ONE"].time_on_clock = (tm.clock_time - 10) % 720
+    set_temp(sysfs, 90)
+    thermal.sample()
+    assert tower.min_rest == pytest.approx(tower.pulse_interval * 4)
+    assert tower.max_rate(clocks["ONE"]) < cool_rate
+    assert tower.defer_work
+    start = source.monotonic()
+    tower.sync()
+    assert source.monotonic() - start > 2 * cool
+    assert clocks["ONE"].time_on_clock == tm.clock_time
+    thermal.close()
+
+
+def test_store_defers_compaction(tmp_path) -> None:
+    hot = True
+    store = PositionStore(
+        tmp_path / "positions",
+        faces=1,
+        compact_every=10,
+        defer_compaction=lambda: hot,
+    )
+    for position in range(15):
+        store.record(0, position, timestamp=1000 + position)
+    assert store.records == 15
+    for position in range(15, 25):
+        store.record(0, position, timestamp=1000 + position)
+    # Never more than twice compact_every, however hot.
+    assert store.records < 20
+    hot = False
+    store.record(0, 25, timestamp=1025)
+    store.record(0, 26, timestamp=1026)
+    assert store.records < 10
+    store.close()
+    assert PositionStore(tmp_path / "positions", faces=1).recover().positions
@@ -0,0 +1,73 @@
+"""
+Test warm_restart.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+from town_clock.util import warm_restart
+from town_clock.util.warm_restart import Handoff
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def test_handoff_round_trip(tmp_path) -> None:
+    path = tmp_path / "state" / "restart.json"
+    handoff = Handoff("nightly", positions={"ONE": 5}, pending={"ONE": 2})
+    handoff.save(path)
+    taken = Handoff.take(path)
+    assert taken == handoff
+    assert not path.exists()
+    assert Handoff.take(path) is None
+
+
+def test_handoff_latency(monkeypatch) -> None:
+    handoff = Handoff("test", monotonic_ns=time.monotonic_ns() - 250_000_000)
+    latency = handoff.latency()
+    assert latency is not None and 0.25 <= latency < 5
+    monkeypatch.setattr(warm_restart, "boot_id", lambda: "another boot")
+    assert handoff.latency() is None
+
+
+def test_bad_handoff(tmp_path) -> None:
+    path = tmp_path / "restart.json"
+    path.write_text("{half")
+    assert Handoff.take(path) is None
+    assert not path.exists()
+    path.write_text(json.dumps({"unexpected": 1}))
+    assert Handoff.take(path) is None
+
+
+def test_reexec_resumes_quickly(tmp_path) -> None:
+    path = tmp_path / "restart.json"
+    script = tmp_path / "child.py"
+    script.write_text(
+        textwrap.dedent(
+            f"""
+            import sys
+            from pathlib import Path
+            from town_clock.util.warm_restart import Handoff, reexec
+
+            path = Path({str(path)!r})
+            if len(sys.argv) == 1:
+                Handoff("test").save(path)
+                reexec([sys.executable, *sys.orig_argv[1:], "resumed"])
+            print(Handoff.take(path).latency())
+            """
+        )
+    )
+    result = subprocess.run(
+        [sys.executable, str(script)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    latency = float(result.stdout.strip())
+    assert 0 < latency < 1
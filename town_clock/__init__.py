@@ -4,16 +4,26 @@ town_clock
 Author: Zack Hankin
 email: zthankin@gmail.com
 Version: 1.0.2
+
+Nothing is imported until it is used, ``import town_clock`` is cheap and
+the clock classes load on first access, see town_clock.util.lazy.
 """
-from town_clock.clock import (
-    Clock,
-    ClockRelay,
-    ClockTower,
-    LEDRelay,
-    Pulses,
-    Time,
-)
-from town_clock.util import CLOCK, Mode
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from town_clock.util.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from town_clock.clock import (
+        Clock,
+        ClockRelay,
+        ClockTower,
+        LEDRelay,
+        Pulses,
+        Time,
+    )
+    from town_clock.util import CLOCK, Mode
 
 __all__: list[str] = [
     "Time",
@@ -25,3 +35,17 @@ __all__: list[str] = [
     "Mode",
     "CLOCK",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Time": "town_clock.clock",
+        "Clock": "town_clock.clock",
+        "ClockTower": "town_clock.clock",
+        "ClockRelay": "town_clock.clock",
+        "LEDRelay": "town_clock.clock",
+        "Pulses": "town_clock.clock",
+        "Mode": "town_clock.util",
+        "CLOCK": "town_clock.util",
+    },
+)
@@ -5,48 +5,30 @@ Author: Zack Hankin
 Email: zthankin@gmail.com
 Version: 1.0.2
 """
+from __future__ import annotations
+
+import argparse
 import sys
 from pathlib import Path
+from typing import Sequence
 
-import tomli
-
+from town_clock.config import CONFIG_FILE, load_config
 from town_clock.controller import Controller
-from town_clock.util import convert_position_string_to_number, Mode
-
-file = Path(__file__, "../../config/config.toml").resolve()
-
-with open(file, "rb") as f:
-    config = tomli.load(f)
-CONFIG_LOCATION = config["Location"]
-
-latitude = CONFIG_LOCATION["latitude"]
-longitude = CONFIG_LOCATION["longitude"]
-altitude = CONFIG_LOCATION["altitude"]
-
-latitude = convert_position_string_to_number(latitude)
-longitude = convert_position_string_to_number(longitude)
-
-clock_pins = config["Pins"]["clock_pins"]
-led_pin = config["Pins"]["led_pin"]
-common_pin = config["Pins"]["common_pin"]
-mode = Mode(config["Mode"]["mode"])
-
-CONTROLLER = Controller(
-    clock_pins=clock_pins,
-    led_pin=led_pin,
-    common_pin=common_pin,
-    lat=latitude,
-    long=longitude,
-    alt=altitude,
-    mode=mode,
-)
+from town_clock.util.clock_logging import setup_logging
 
 
-def main():
+def main(argv: Sequence[str] | None = None) -> int:
     """
     Function to run project.
     """
-    CONTROLLER.run()
+    parser = argparse.ArgumentParser(prog="python -m town_clock")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE)
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    setup_logging(config.log_folder)
+    Controller.from_config(config).run()
+    return 0
 
 
 if __name__ == "__main__":
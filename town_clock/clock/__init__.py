@@ -3,14 +3,24 @@ Clock
 
 Clock subpackage for controlling time and pulses.
 
+The classes are imported on first access, so importing one submodule does
+not load pendulum and the rest of the package with it.
+
 Author: Zack Hankin
 Started: 27/01/2023
 """
-from ._time import Time
-from .clock import Clock
-from .clock_tower import ClockTower
-from .relay import ClockRelay, LEDRelay
-from .pulses import Pulses
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from town_clock.util.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from ._time import Time
+    from .clock import Clock
+    from .clock_tower import ClockTower
+    from .relay import ClockRelay, LEDRelay
+    from .pulses import Pulses
 
 __all__: list[str] = [
     "Time",
@@ -20,3 +30,15 @@ __all__: list[str] = [
     "LEDRelay",
     "Pulses",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Time": "._time",
+        "Clock": ".clock",
+        "ClockTower": ".clock_tower",
+        "ClockRelay": ".relay",
+        "LEDRelay": ".relay",
+        "Pulses": ".pulses",
+    },
+)
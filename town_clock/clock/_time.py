@@ -14,41 +14,129 @@ from typing import Optional
 import pendulum
 from loguru import logger
 from pendulum import DateTime
+from pendulum.tz import local_timezone
 from pendulum.tz.timezone import Timezone
 
+from town_clock.clock.offset_table import (
+    OffsetTable,
+    offset_table,
+    split_timestamp,
+)
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util.clock_exceptions import NoValidTimeFromFileError
+from town_clock.util.position_store import PositionStore
+
+EPOCH = pendulum.from_timestamp(0)
+
+
+class _LazyNow:
+    """
+    Time.now. Ticks only keep the epoch seconds, the DateTime is built the
+    first time it is read, for logging or display.
+    """
+
+    def __get__(self, obj: Optional[Time], objtype=None) -> DateTime:
+        if obj is None:
+            return EPOCH
+        if obj._now is None:
+            obj._now = pendulum.from_timestamp(
+                obj._timestamp, tz=obj.timezone or local_timezone()
+            )
+        return obj._now
+
+    def __set__(self, obj: Time, value: DateTime) -> None:
+        obj._now = value
+        obj._second = value.second + value.microsecond / 1_000_000
+        obj._edge = value.int_timestamp - value.second
+
 
 @dataclass
 class Time:
     """
-    now: pendulum.DateTime:
+    now: pendulum.DateTime: Built on first use after a tick.
     clock_time: int: minutes from 12 AM/PM
     timezone: Timezone | str: Timezone of the clock.
     Default is "Australia/Sydney".
+    store: PositionStore | None: Where the clock positions are saved.
+    time_source: TimeSource: Where now comes from. Default is SYSTEM_TIME.
     """
 
-    now: DateTime = field(default=pendulum.from_timestamp(0))
+    _now: Optional[DateTime] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _timestamp: float = field(
+        default=0.0, init=False, repr=False, compare=False
+    )
+    _second: float = field(default=0.0, init=False, repr=False, compare=False)
+    _edge: int = field(default=0, init=False, repr=False, compare=False)
+    now: _LazyNow = _LazyNow()
     clock_time: int = field(default=-1)
     timezone: Optional[Timezone | str] = "Australia/Sydney"
+    store: Optional[PositionStore] = field(
+        default=None, repr=False, compare=False
+    )
+    time_source: TimeSource = field(
+        default=SYSTEM_TIME, repr=False, compare=False
+    )
 
     def __post_init__(self):
         """
-        todo: Get time from file here or in Clock
-
-        Returns:
-
+        When no time is given the time is read from the store, falling
+        back to now.
         """
-        if self.now == pendulum.from_timestamp(0):
-            self.now = self.get_time_from_file()
-        else:
-            self.set_clock_time(self.now)
+        if self.now == EPOCH:
+            self.now = self.current()
+            if self.store is not None:
+                try:
+                    self.now = self.get_time_from_file()
+                except NoValidTimeFromFileError:
+                    logger.warning("No saved time, using now.")
+        self.set_clock_time(self.now)
         logger.info("Time Object initialised.")
         logger.debug(f"Timezone: {self.timezone}")
 
+    @property
+    def offsets(self) -> OffsetTable:
+        """UTC offsets of the clock's timezone."""
+        return offset_table(self.timezone)
+
+    @property
+    def second(self) -> float:
+        """Seconds past the minute of now."""
+        return self._second
+
+    @property
+    def minute_edge(self) -> int:
+        """Epoch seconds of the start of the minute of now."""
+        return self._edge
+
+    def current(self) -> DateTime:
+        """The time now from time_source, in the clock's timezone."""
+        return pendulum.from_timestamp(
+            self.time_source.time(),
+            tz=self.timezone or local_timezone(),
+        )
+
     def __iter__(self):
         return NotImplemented
 
     def get_time_from_file(self) -> DateTime:
-        return NotImplemented
+        """
+        When the clock positions were last saved.
+
+        Raises:
+            NoValidTimeFromFileError: When there is no store or it holds no
+                                      valid positions.
+
+        Returns:
+            DateTime: Time of the newest record in the store.
+        """
+        if self.store is None:
+            raise NoValidTimeFromFileError("No position store.")
+        state = self.store.recover()
+        return pendulum.from_timestamp(
+            state.timestamp, tz=self.timezone or "UTC"
+        )
 
     def set_clock_time(self, tm: int | DateTime) -> Time:
         """
@@ -86,21 +174,45 @@ class Time:
         """
         Sets now and sets clock_time if on the minute.
 
+        Without a time, now comes from time_source through the integer
+        fast path.
+
         Returns:
             Returns True if on the minute.
         """
         if time is None:
-            self.now = pendulum.now(self.timezone)
-        elif isinstance(time, DateTime):
+            return self.tick(self.time_source.time())
+        if isinstance(time, DateTime):
             self.now = time
         else:
             raise TypeError(f"Unexpected type for time: {type(time).__name__}")
-        if changed_time := self.is_on_minute(self.now):
-            self.set_clock_time(self.now)
-        elif time is not None:
-            self.set_clock_time(self.now)
+        changed_time = self.is_on_minute(self.now)
+        self.set_clock_time(self.now)
         return changed_time
 
+    def tick(self, timestamp: float) -> bool:
+        """
+        Reads the time from epoch seconds with integer maths and the
+        OffsetTable, no DateTime is made. Like a call with no time,
+        clock_time is only set on the minute.
+
+        Args:
+            timestamp: float: Seconds since epoch.
+
+        Returns:
+            bool: True if on the minute.
+        """
+        whole, micro = split_timestamp(timestamp)
+        local = whole + self.offsets.offset(whole)
+        into_minute = local % 60
+        self._now = None
+        self._timestamp = timestamp
+        self._second = into_minute + micro / 1_000_000
+        self._edge = whole - into_minute
+        if on_minute := into_minute == 0:
+            self.clock_time = local // 60 % 720
+        return on_minute
+
     def is_on_minute(self, time: DateTime) -> bool:
         """
         Is the time on the minute?
@@ -117,9 +229,5 @@ class Time:
         self(self.now.add(minutes=minute))
         return self
 
-    def is_night(self) -> bool:
-        """Is it nighttime?"""
-        raise NotImplementedError
-
     def log_time(self) -> str:
         raise NotImplementedError
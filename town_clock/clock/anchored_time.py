@@ -0,0 +1,180 @@
+"""
+anchored_time.py
+
+A wall clock anchored to CLOCK_MONOTONIC, which rides out time jumps.
+
+The Pi has no RTC. It boots with the time it shut down at, then NTP steps
+it, and anyone can run `date -s`. Read directly, every step reaches the
+faces at once: a few seconds either side of a minute edge is an extra
+pulse or a held minute, a big step is hundreds of pulses.
+
+AnchoredTime reads the wall clock as CLOCK_MONOTONIC plus an offset. Each
+read compares that offset with what the system clock now says and sorts
+any change:
+
+    * under tolerance, ordinary drift, slewed silently.
+    * under step_at, a SLEW. Corrected at no more than max_rate seconds
+      per second, so the time never stops or goes back and no minute is
+      ever skipped or repeated. A sub-minute correction gives no extra
+      pulses, only a few minutes slightly shorter or longer.
+    * step_at or more, a FORWARD or BACKWARD jump. The time is wrong by
+      minutes or more, so it is stepped at once and the tower catches up
+      or holds as it would after an outage.
+
+Every slew and jump is recorded in jumps, logged and passed to on_jump.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+from loguru import logger
+
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+
+
+class JumpKind(Enum):
+    """
+    How a change of the system clock is handled.
+    SLEW = 'slew'
+    FORWARD = 'forward'
+    BACKWARD = 'backward'
+    """
+
+    SLEW = "slew"
+    FORWARD = "forward"
+    BACKWARD = "backward"
+
+
+@dataclass(frozen=True, slots=True)
+class TimeJump:
+    """
+    A change of the system clock.
+
+    Parameters:
+        kind (JumpKind): Slewed or stepped.
+        delta (float): Seconds the system clock moved, forward positive.
+        monotonic (float): When it was seen, TimeSource.monotonic().
+        before (float): The anchored time just before, epoch seconds.
+        after (float): The system time, epoch seconds.
+    """
+
+    kind: JumpKind
+    delta: float
+    monotonic: float
+    before: float
+    after: float
+
+
+class AnchoredTime:
+    """
+    A TimeSource whose wall clock is monotonic plus a corrected offset.
+
+    Parameters:
+        source (TimeSource): The clocks to anchor. Default is SYSTEM_TIME.
+        step_at (float): Changes this big are stepped, smaller ones are
+                         slewed. Default is 60 seconds.
+        tolerance (float): Smaller changes are drift and are not recorded.
+                           Default is 0.5 seconds.
+        max_rate (float): Most seconds corrected per second while slewing,
+                          below 1. Default is 0.1.
+        history (int): How many jumps are kept. Default is 64.
+        on_jump (Callable[[TimeJump], None] | None): Called for each jump.
+    """
+
+    def __init__(
+        self,
+        source: TimeSource = SYSTEM_TIME,
+        step_at: float = 60.0,
+        tolerance: float = 0.5,
+        max_rate: float = 0.1,
+        history: int = 64,
+        on_jump: Callable[[TimeJump], None] | None = None,
+    ) -> None:
+        if not 0 < max_rate < 1:
+            raise ValueError("max_rate must be between 0 and 1")
+        if not 0 <= tolerance < step_at:
+            raise ValueError("tolerance must be below step_at")
+        self.source = source
+        self.step_at = step_at
+        self.tolerance = tolerance
+        self.max_rate = max_rate
+        self.on_jump = on_jump
+        self.jumps: deque[TimeJump] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        monotonic = source.monotonic()
+        self._target: float = source.time() - monotonic
+        self._offset: float = self._target
+        self._last: float = monotonic
+
+    @property
+    def correction(self) -> float:
+        """Seconds still to slew, positive when behind the system clock."""
+        with self._lock:
+            return self._target - self._offset
+
+    def time(self) -> float:
+        """The anchored wall clock, seconds since epoch."""
+        with self._lock:
+            now, jump = self._update()
+        if jump is not None:
+            self._report(jump)
+        return now
+
+    def monotonic(self) -> float:
+        return self.source.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        self.source.sleep(seconds)
+
+    def sleep_until(self, deadline: float) -> float:
+        return self.source.sleep_until(deadline)
+
+    def _update(self) -> tuple[float, TimeJump | None]:
+        monotonic = self.source.monotonic()
+        target = self.source.time() - monotonic
+        # Slew towards the old target for the time since the last read.
+        allowed = self.max_rate * max(0.0, monotonic - self._last)
+        error = self._target - self._offset
+        self._offset += max(-allowed, min(allowed, error))
+        self._last = monotonic
+
+        delta = target - self._target
+        self._target = target
+        jump = None
+        if abs(delta) >= self.tolerance:
+            kind = JumpKind.SLEW
+            if delta >= self.step_at:
+                kind = JumpKind.FORWARD
+            elif delta <= -self.step_at:
+                kind = JumpKind.BACKWARD
+            jump = TimeJump(
+                kind,
+                delta,
+                monotonic,
+                monotonic + self._offset,
+                monotonic + target,
+            )
+            if kind is not JumpKind.SLEW:
+                self._offset = target
+            self.jumps.append(jump)
+        return monotonic + self._offset, jump
+
+    def _report(self, jump: TimeJump) -> None:
+        if jump.kind is JumpKind.SLEW:
+            logger.info(f"System time moved {jump.delta:+.3f}s, slewing.")
+        else:
+            logger.warning(
+                f"System time jumped {jump.kind.value} {jump.delta:+.1f}s, "
+                "stepped."
+            )
+        if self.on_jump is not None:
+            try:
+                self.on_jump(jump)
+            except Exception as err:
+                logger.exception(f"Time jump callback failed: {err}")
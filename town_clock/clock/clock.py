@@ -4,13 +4,13 @@ clock.py
 """
 from __future__ import annotations
 
-import time
 from dataclasses import dataclass, field
 from typing import Protocol
 
 from loguru import logger
 
-from town_clock.util import CLOCK
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util import CLOCK, FaceName
 
 
 class ClockRelay(Protocol):
@@ -20,6 +20,14 @@ class ClockRelay(Protocol):
         """pulse method"""
         ...
 
+    def turn_on(self):
+        """Close the relay, start of a pulse."""
+        ...
+
+    def turn_off(self):
+        """Open the relay, end of a pulse."""
+        ...
+
 
 @dataclass
 class Clock:
@@ -27,20 +35,43 @@ class Clock:
     Class Clock
 
     Parameters:
-        name (CLOCK): The name of the clock in enum form.
+        name (FaceName): The name of the clock face, a CLOCK member or
+                         a name from the config.
         relay (ClockRelay): The relay that this Clock controls.
         time_on_clock (int): minutes past 12 AM/PM (0-719)
         slow (int): Minutes slow, fast is negative.
         cutoff (int): Value is used to work out how long the
                       clock will sleep for. Default is 30.
+        sleep_time (float): Rest between pulses. Default is 0.5.
+        pulse_width (float): How long the relay is held on for each
+                             pulse. Default is 0.1.
+        time_source (TimeSource): Used to rest between pulses.
+                                  Default is SYSTEM_TIME.
     """
 
-    name: CLOCK
+    name: FaceName
     relay: ClockRelay
     time_on_clock: int
     slow: int = field(default=0)
     cutoff: int = field(default=30)
     sleep_time: float = field(default=0.5)
+    pulse_width: float = field(default=0.1)
+    time_source: TimeSource = field(
+        default=SYSTEM_TIME, repr=False, compare=False
+    )
+
+    @property
+    def label(self) -> str:
+        """Name of the clock for logging."""
+        if isinstance(self.name, CLOCK):
+            return self.name.name
+        return self.name
+
+    def advance(self) -> Clock:
+        """Record that the hands have moved forward one minute."""
+        self.slow -= 1
+        self.time_on_clock = (self.time_on_clock + 1) % 720
+        return self
 
     def compare(self, clock_time: int) -> Clock:
         """
@@ -60,10 +91,10 @@ class Clock:
         difference: int = clock_time - self.time_on_clock
 
         while difference >= 720:
-            logger.error(f"Clock {self.name.name} Difference: {difference}")
+            logger.error(f"Clock {self.label} Difference: {difference}")
             difference -= 720
         while difference <= -720:
-            logger.error(f"Clock {self.name.name} Difference: {difference}")
+            logger.error(f"Clock {self.label} Difference: {difference}")
             difference += 720
 
         if difference < 0:  # Difference is negative.
@@ -87,7 +118,7 @@ class Clock:
             )
         for _ in range(int(num_pulses)):
             self.relay.pulse()
-            self.slow -= 1
+            self.advance()
             if num_pulses > 1:
-                time.sleep(self.sleep_time)
+                self.time_source.sleep(self.sleep_time)
         return self
@@ -3,18 +3,27 @@ ClockTower module.
 """
 from __future__ import annotations
 
+import queue
 from dataclasses import dataclass, field
-from time import sleep
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 from loguru import logger
 
 from town_clock.clock import Clock, Time
-from town_clock.util import CLOCK, Mode
-from town_clock.util.clock_exceptions import PulseError
+from town_clock.util import FaceName, Mode
+from town_clock.util.metrics import TowerMetrics
+from town_clock.util.position_store import PositionStore
+from town_clock.util.pulse_journal import Outcome, PulseJournal
+from town_clock.util.thermal import ThermalMonitor
+from town_clock.clock.dst import DstScheduler
+from town_clock.clock.gpio import GpioBackend
+from town_clock.clock.night import LightChange, NightSchedule
+from town_clock.clock.planner import CatchUpPlan, plan_catch_up
+from town_clock.clock.pulse_engine import PulseEngine
 from town_clock.clock.pulses import Pulses
+from town_clock.clock.time_source import TimeSource
 
-ONE = CLOCK.ONE
-TWO = CLOCK.TWO
+if TYPE_CHECKING:
+    from town_clock.ui.buttons import ButtonEvent
 
 
 class LEDRelay(Protocol):
@@ -40,9 +49,24 @@ class ClockTower:
         time (Time):
         mode (Mode):
         led (LEDRelay):
-        clock (dict[CLOCK, Clock]):
+        clock (dict[FaceName, Clock]): One Clock per face, any number of
+                                       faces. The order sets the order of
+                                       the slow Pulses.
         position (dict[str, float]):
         pulse_interval (float): Default is 0.5.
+        store (PositionStore | None): Records the position of each face
+                                      after every pulse.
+        journal (PulseJournal | None): Records every pulse and its outcome.
+        dst (DstScheduler | None): Holds the faces through the end of
+                                   daylight saving.
+        gpio (GpioBackend | None): The relays' backend, faces due together
+                                   are switched in one write.
+        metrics (TowerMetrics | None): Pulse, slow and catch-up metrics.
+        thermal (ThermalMonitor | None): Slows the catch-up and defers
+                                         work while the CPU is hot.
+        night (NightSchedule | None): When the LED goes on and off.
+        buttons (queue.SimpleQueue[ButtonEvent] | None): Button events,
+                                                         read each tick.
 
     """
 
@@ -50,9 +74,28 @@ class ClockTower:
     time: Time
     mode: Mode
     led: LEDRelay
-    clock: dict[CLOCK, Clock]
+    clock: dict[FaceName, Clock]
     position: dict[str, float]
     pulse_interval: float = field(default=0.5)
+    store: PositionStore | None = field(default=None)
+    journal: PulseJournal | None = field(default=None)
+    dst: DstScheduler | None = field(default=None)
+    gpio: GpioBackend | None = field(default=None)
+    metrics: TowerMetrics | None = field(default=None)
+    thermal: ThermalMonitor | None = field(default=None)
+    night: NightSchedule | None = field(default=None)
+    buttons: queue.SimpleQueue[ButtonEvent] | None = field(default=None)
+    _slow: Pulses = field(default_factory=Pulses, init=False, repr=False)
+
+    @property
+    def faces(self) -> list[FaceName]:
+        """Names of the clock faces, in order."""
+        return list(self.clock)
+
+    @property
+    def time_source(self) -> TimeSource:
+        """Where the tower gets the time from, shared with self.time."""
+        return self.time.time_source
 
     @property
     def slow(self) -> Pulses:
@@ -60,55 +103,215 @@ class ClockTower:
         How many minutes slow is the clock? If the clock is fast that clock
         will return 0.
 
+        The same Pulses object is refreshed in place on every access.
+
         Returns:
             Pulses: How many pulses required to bring the clock back to
                     current time.
         """
-        return Pulses(*(clock.slow for clock in self.clock.values()))
+        return self._slow.load(clock.slow for clock in self.clock.values())
 
     @property
     def is_night(self) -> bool:
         """
-        Is it Night time.
+        Is it Night time. Kept by the NightSchedule's events, there is no
+        astronomy here.
 
         Returns:
-            bool: True if nighttime.
+            bool: True if nighttime, always False without a schedule.
         """
-        return NotImplemented
+        return self.night is not None and self.night.dark
 
-    def pulse_clocks(self) -> None:
+    @property
+    def min_rest(self) -> float:
+        """
+        Shortest rest between pulses, pulse_interval stretched while the
+        CPU is hot.
         """
-        Pulse the clocks using the Pulse class.
+        if self.thermal is None:
+            return self.pulse_interval
+        return self.pulse_interval / self.thermal.rate_factor
 
-        Raises:
-            PulseError: When count goes beyond the max limit
-                        (self.slow.one + 1) * (self.slow.two + 1).
+    @property
+    def defer_work(self) -> bool:
+        """Should work that can wait be put off, the CPU is too hot."""
+        return self.thermal is not None and self.thermal.deferring
+
+    def max_rate(self, clock: Clock) -> float:
+        """
+        Fastest a clock can be pulsed, in pulses per second.
+        """
+        period = clock.pulse_width + max(clock.sleep_time, self.min_rest)
+        return 1 / period if period > 0 else float("inf")
 
-        Todo:
-            Work on exception handling.
+    def plan_catch_up(self, second: float = 0.0) -> list[CatchUpPlan]:
         """
-        count = 0
-        max_count = (self.slow.one + 1) * (self.slow.two + 1)
+        Plan each face against self.time and set Clock.slow to the plan.
+
+        A face that is behind is either advanced, with extra pulses for the
+        minutes that pass while it catches up, or held until the time comes
+        back round to it. Whichever gets the face in sync sooner is used,
+        except at the end of daylight saving when the faces are held.
+
+        Args:
+            second: float: Seconds already past the current minute.
+
+        Returns:
+            list[CatchUpPlan]: One plan per face, in order.
+        """
+        plans: list[CatchUpPlan] = []
+        for name, clock in self.clock.items():
+            plan = plan_catch_up(
+                name,
+                clock.time_on_clock,
+                self.time.clock_time,
+                self.max_rate(clock),
+                second,
+            )
+            if self.dst is not None:
+                plan = self.dst.adjust(
+                    plan,
+                    clock.time_on_clock,
+                    self.time.clock_time,
+                    self.time.minute_edge,
+                )
+            clock.slow = plan.slow
+            if self.metrics is not None:
+                self.metrics.slow.labels(clock.label).set(plan.slow)
+            plans.append(plan)
+        return plans
+
+    def tick(self) -> list[CatchUpPlan]:
+        """
+        Read the time and sync every face, once a minute.
+
+        Returns:
+            list[CatchUpPlan]: The plans that were carried out.
+        """
+        self.read_buttons()
+        self.time()
+        return self.sync(self.time.second)
+
+    def read_buttons(self) -> int:
+        """
+        Handle every button event waiting, see town_clock.ui.buttons.
+
+        Returns:
+            int: Events handled.
+        """
+        if self.buttons is None:
+            return 0
+        handled = 0
+        while True:
+            try:
+                event = self.buttons.get_nowait()
+            except queue.Empty:
+                return handled
+            self.button(event)
+            handled += 1
+
+    def button(self, event: ButtonEvent) -> None:
+        """
+        A face's button sets it back a minute for each press, long press
+        and repeat, for when the hands are behind where the tower thinks.
+        The face is pulsed up to the time in the same tick.
+        """
+        clock = self.clock.get(event.name)
+        if clock is None:
+            logger.debug(f"No face for button {event.name}")
+            return
+        clock.time_on_clock = (clock.time_on_clock - 1) % 720
+        logger.info(
+            f"{clock.label} set back to {clock.time_on_clock} by "
+            f"{event.kind.value}"
+        )
+
+    def sync(self, second: float = 0.0) -> list[CatchUpPlan]:
+        """
+        Plan the catch-up for every face and pulse the faces that advance.
+
+        Args:
+            second: float: Seconds already past the current minute.
+
+        Returns:
+            list[CatchUpPlan]: The plans that were carried out.
+        """
+        plans = self.plan_catch_up(second)
+        if not self.slow.all_zero():
+            self.pulse_clocks()
+        return plans
+
+    def pulse_clocks(self) -> dict[FaceName, tuple[int, int]]:
+        """
+        Pulse the slow clocks together using the PulseEngine.
+
+        All faces are pulsed in the same timing slots, each with its own
+        pulse width and rest, so catching up takes max(slow) pulses rather
+        than sum(slow). Failures are logged as a ClockGroupError.
+
+        Returns:
+            dict[FaceName, tuple[int, int]]: Pulses (done, total) per face.
+        """
+        engine = self.catch_up_engine()
+        start = self.time_source.monotonic()
         try:
-            while (clock_pulses := self.slow) != [0, 0]:
-                if (clock_pulses.one > 0) and (clock_pulses.two > 0):
-                    self.clock[ONE].pulse()
-                    self.clock[TWO].pulse()
-
-                elif clock_pulses.two == 0:
-                    self.clock[ONE].pulse(clock_pulses.one)
-
-                elif clock_pulses.one == 0:
-                    self.clock[TWO].pulse(clock_pulses.two)
-
-                sleep(self.pulse_interval)
-                count += 1
-                if count > max_count:
-                    raise PulseError(
-                        f"Pulse count exceeded limit: {count}, {clock_pulses}"
-                    )
+            engine.run(self.slow)
         except Exception as err:
             logger.exception(err)
+        finally:
+            self.end_catch_up(start)
+        return engine.progress
+
+    def catch_up_engine(self) -> PulseEngine:
+        """
+        A PulseEngine for the faces, wired to the store, journal and
+        metrics. Run it, or start and step it from a scheduler, then call
+        end_catch_up.
+        """
+        recording = self.store or self.journal or self.metrics
+        if self.thermal is not None and self.thermal.throttling:
+            logger.warning(
+                f"CPU {self.thermal.temperature:.1f}C, "
+                f"resting {self.min_rest:.2f}s between pulses"
+            )
+        return PulseEngine(
+            list(self.clock.values()),
+            min_rest=self.min_rest,
+            on_pulse=self._on_pulse if recording else None,
+            time_source=self.time_source,
+            backend=self.gpio,
+        )
+
+    def end_catch_up(self, start: float) -> None:
+        """
+        Record how long the catch-up took and flush the store and journal.
+
+        Args:
+            start: float: time_source.monotonic() when it started.
+        """
+        if self.metrics is not None:
+            self.metrics.catch_up.observe(self.time_source.monotonic() - start)
+        if self.store is not None:
+            self.store.sync()
+        if self.journal is not None:
+            self.journal.flush()
+
+    def _on_pulse(self, clock: Clock, pulsed: bool) -> None:
+        """PulseEngine hook, records the pulse and where the hands are."""
+        if self.metrics is not None:
+            self.metrics.pulses.labels(
+                clock.label, "ok" if pulsed else "failed"
+            ).inc()
+        if self.store is None and self.journal is None:
+            return
+        face = self.faces.index(clock.name)
+        timestamp = int(self.time_source.time())
+        if self.journal is not None:
+            self.journal.append(
+                face, Outcome.OK if pulsed else Outcome.FAILED, timestamp
+            )
+        if pulsed and self.store is not None:
+            self.store.record(face, clock.time_on_clock, timestamp)
 
     def run(self):
         while self.running:
@@ -116,8 +319,20 @@ class ClockTower:
 
     def check_if_night(self) -> None:
         """
-        Todo:
-            change from int to dict of the time of day list.
+        Switch the LED on at night and off by day.
         """
-        if self.time.is_night():
-            raise NotImplementedError
+        if self.is_night:
+            self.led.turn_on()
+        else:
+            self.led.turn_off()
+
+    def light_change(self, change: LightChange) -> None:
+        """
+        Carry out a dusk or dawn from the NightSchedule.
+        """
+        if self.night is None:
+            return
+        was_night = self.is_night
+        if self.night.apply(change) != was_night:
+            logger.info(f"{'Dusk' if change.dark else 'Dawn'} at {change.at}")
+        self.check_if_night()
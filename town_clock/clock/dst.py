@@ -0,0 +1,146 @@
+"""
+dst.py
+
+Daylight saving changes for the clock faces.
+
+When daylight saving ends the time goes back an hour and every face is
+suddenly an hour fast. Left to the catch-up planner the faces are pulsed
+eleven hours round the dial, quicker than waiting but 660 pulses of wear
+per face. The DstScheduler reads the coming changes from the OffsetTable
+ahead of time and stops the faces for the hour instead. When daylight
+saving starts the faces are an hour slow and are pulsed forward at their
+fastest safe rate, from the tick on the change itself.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import pendulum
+from loguru import logger
+
+from town_clock.clock.offset_table import OffsetTable
+from town_clock.clock.planner import MINUTES_ON_DIAL, Action, CatchUpPlan
+
+LOOKAHEAD = 7 * 86400
+"""Seconds ahead that changes are read."""
+
+
+@dataclass(frozen=True, slots=True)
+class DstChange:
+    """
+    One change of UTC offset.
+
+    Parameters:
+        at (int): Epoch seconds of the change.
+        shift (int): Seconds the local time jumps, positive when daylight
+                     saving starts.
+    """
+
+    at: int
+    shift: int
+
+    @property
+    def minutes(self) -> int:
+        """Minutes the faces are out by after the change."""
+        return abs(self.shift) // 60
+
+    @property
+    def action(self) -> Action:
+        """ADVANCE when the time goes forward, HOLD when it goes back."""
+        return Action.ADVANCE if self.shift > 0 else Action.HOLD
+
+    @property
+    def end(self) -> int:
+        """Epoch seconds when the faces are back in step."""
+        return self.at + abs(self.shift)
+
+
+@dataclass(slots=True)
+class DstScheduler:
+    """
+    Finds daylight saving changes ahead of time and adjusts the catch-up
+    plans around them.
+
+    Parameters:
+        offsets (OffsetTable): UTC offsets of the clock's timezone.
+        lookahead (int): Seconds ahead to read changes. Default is a week.
+        changes (list[DstChange]): Changes read so far, oldest first.
+    """
+
+    offsets: OffsetTable
+    lookahead: int = field(default=LOOKAHEAD)
+    changes: list[DstChange] = field(default_factory=list)
+    _read_until: int = field(default=0, init=False, repr=False)
+
+    def read_ahead(self, now: int) -> list[DstChange]:
+        """
+        Read the changes up to now + lookahead.
+
+        Returns:
+            list[DstChange]: The changes found by this call.
+        """
+        end = now + self.lookahead
+        if end <= self._read_until:
+            return []
+        start = max(self._read_until, now - self.lookahead)
+        new: list[DstChange] = []
+        for at, offset in self.offsets.transitions(start, end):
+            shift = offset - self.offsets.offset(at - 1)
+            if shift:
+                new.append(DstChange(at, shift))
+        for change in new:
+            logger.info(
+                "Daylight saving change at "
+                f"{pendulum.from_timestamp(change.at, tz=self.offsets.zone)}: "
+                f"{change.action.value} {change.minutes} minutes"
+            )
+        self.changes += new
+        self._read_until = end
+        # Nothing older than the last change is needed again.
+        self.changes = [c for c in self.changes if c.end >= now]
+        return new
+
+    def next_change(self, now: int) -> DstChange | None:
+        """The first change at or after now."""
+        self.read_ahead(now)
+        return next((c for c in self.changes if c.at >= now), None)
+
+    def active(self, now: int) -> DstChange | None:
+        """The change being caught up at now, None outside a change."""
+        self.read_ahead(now)
+        for change in self.changes:
+            if change.at <= now < change.end:
+                return change
+        return None
+
+    def adjust(
+        self, plan: CatchUpPlan, position: int, clock_time: int, now: int
+    ) -> CatchUpPlan:
+        """
+        Hold a face through a fall back instead of going round the dial.
+
+        A face that is fast by no more than the change is held until the
+        local time comes back to it. Every other plan is unchanged, a
+        spring forward is already pulsed at the fastest rate by the
+        planner.
+
+        Args:
+            plan: CatchUpPlan: From plan_catch_up.
+            position: int: Clock.time_on_clock.
+            clock_time: int: Time.clock_time.
+            now: int: Epoch seconds of the tick.
+
+        Returns:
+            CatchUpPlan
+        """
+        change = self.active(now)
+        if change is None or change.action is not Action.HOLD:
+            return plan
+        fast = (position - clock_time) % MINUTES_ON_DIAL
+        if plan.action is not Action.ADVANCE or not 0 < fast <= change.minutes:
+            return plan
+        return CatchUpPlan(
+            plan.face, Action.HOLD, hold=fast, duration=fast * 60.0
+        )
@@ -0,0 +1,447 @@
+"""
+gpio.py
+
+GPIO backends for the relays.
+
+GpioChardev talks to the Linux GPIO character device (uAPI v2). Every
+pin the tower uses is requested as one multi-line handle, so any number
+of lines are switched with a single GPIO_V2_LINE_SET_VALUES ioctl. Inside
+``backend.batch()`` the relay writes are collected and sent together when
+the block ends, which is how the PulseEngine switches every face due in a
+slot at the same instant.
+
+FakeGpioBackend keeps the line states in memory with a timestamped
+history, for tests and for the dev and test modes.
+
+GpioEdges requests input lines with edge detection. The kernel timestamps
+each edge on CLOCK_MONOTONIC and queues it on the request fd, which is
+readable while edges wait, so the event loop can wait on it with
+add_reader rather than polling the lines. FakeGpioEdges queues edges
+behind a pipe, so it works with add_reader too.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import ctypes
+import fcntl
+import os
+import struct
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Mapping, Protocol, Sequence
+
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+
+GPIO_V2_LINES_MAX = 64
+GPIO_MAX_NAME_SIZE = 32
+GPIO_V2_LINE_NUM_ATTRS_MAX = 10
+
+GPIO_V2_LINE_FLAG_INPUT = 1 << 2
+GPIO_V2_LINE_FLAG_OUTPUT = 1 << 3
+GPIO_V2_LINE_FLAG_EDGE_RISING = 1 << 4
+GPIO_V2_LINE_FLAG_EDGE_FALLING = 1 << 5
+GPIO_V2_LINE_FLAG_BIAS_PULL_UP = 1 << 8
+
+GPIO_V2_LINE_ATTR_ID_FLAGS = 1
+GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES = 2
+GPIO_V2_LINE_ATTR_ID_DEBOUNCE = 3
+
+GPIO_V2_LINE_EVENT_RISING_EDGE = 1
+GPIO_V2_LINE_EVENT_FALLING_EDGE = 2
+LINE_EVENT = struct.Struct("<QIIII24x")
+"""struct gpio_v2_line_event: timestamp_ns, id, offset, seqno, line_seqno."""
+
+
+class GpioV2LineAttribute(ctypes.Structure):
+    """struct gpio_v2_line_attribute, the union is read as values."""
+
+    _fields_ = [
+        ("id", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32),
+        ("values", ctypes.c_uint64),
+    ]
+
+
+class GpioV2LineConfigAttribute(ctypes.Structure):
+    """struct gpio_v2_line_config_attribute"""
+
+    _fields_ = [
+        ("attr", GpioV2LineAttribute),
+        ("mask", ctypes.c_uint64),
+    ]
+
+
+class GpioV2LineConfig(ctypes.Structure):
+    """struct gpio_v2_line_config"""
+
+    _fields_ = [
+        ("flags", ctypes.c_uint64),
+        ("num_attrs", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32 * 5),
+        ("attrs", GpioV2LineConfigAttribute * GPIO_V2_LINE_NUM_ATTRS_MAX),
+    ]
+
+
+class GpioV2LineRequest(ctypes.Structure):
+    """struct gpio_v2_line_request"""
+
+    _fields_ = [
+        ("offsets", ctypes.c_uint32 * GPIO_V2_LINES_MAX),
+        ("consumer", ctypes.c_char * GPIO_MAX_NAME_SIZE),
+        ("config", GpioV2LineConfig),
+        ("num_lines", ctypes.c_uint32),
+        ("event_buffer_size", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32 * 5),
+        ("fd", ctypes.c_int32),
+    ]
+
+
+class GpioV2LineValues(ctypes.Structure):
+    """struct gpio_v2_line_values"""
+
+    _fields_ = [
+        ("bits", ctypes.c_uint64),
+        ("mask", ctypes.c_uint64),
+    ]
+
+
+def _iowr(kind: int, number: int, size: int) -> int:
+    return (3 << 30) | (size << 16) | (kind << 8) | number
+
+
+GPIO_V2_GET_LINE_IOCTL = _iowr(0xB4, 0x07, ctypes.sizeof(GpioV2LineRequest))
+GPIO_V2_LINE_GET_VALUES_IOCTL = _iowr(
+    0xB4, 0x0E, ctypes.sizeof(GpioV2LineValues)
+)
+GPIO_V2_LINE_SET_VALUES_IOCTL = _iowr(
+    0xB4, 0x0F, ctypes.sizeof(GpioV2LineValues)
+)
+
+
+class GpioBackend(Protocol):
+    """GPIO Backend Protocol"""
+
+    def set_lines(self, values: Mapping[int, bool]) -> None:
+        """Set several pins, by BCM number, at once."""
+        ...
+
+    def get_line(self, pin: int) -> bool:
+        """Last value set on a pin."""
+        ...
+
+    def batch(self):
+        """Context manager, set_lines calls inside it are sent together."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _Batching(ABC):
+    """Collects set_lines calls inside batch() into one write."""
+
+    def __init__(self) -> None:
+        self._pending: dict[int, bool] | None = None
+
+    @abstractmethod
+    def _write(self, values: Mapping[int, bool]) -> None:
+        """Set the lines in one write."""
+
+    def set_lines(self, values: Mapping[int, bool]) -> None:
+        if self._pending is not None:
+            self._pending.update(values)
+        else:
+            self._write(values)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        if self._pending is not None:
+            # Already batching, the outer block sends everything.
+            yield
+            return
+        self._pending = {}
+        try:
+            yield
+            pending = self._pending
+        finally:
+            self._pending = None
+        if pending:
+            self._write(pending)
+
+
+def _request_lines(
+    pins: Sequence[int],
+    chip: Path,
+    consumer: str,
+    flags: int,
+    event_buffer_size: int = 0,
+) -> int:
+    """Request lines as one handle, outputs start low. Returns its fd."""
+    request = GpioV2LineRequest()
+    for idx, pin in enumerate(pins):
+        request.offsets[idx] = pin
+    request.consumer = consumer.encode()[: GPIO_MAX_NAME_SIZE - 1]
+    request.num_lines = len(pins)
+    request.event_buffer_size = event_buffer_size
+    request.config.flags = flags
+    if flags & GPIO_V2_LINE_FLAG_OUTPUT:
+        # Every line starts low.
+        request.config.num_attrs = 1
+        request.config.attrs[0].attr.id = GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES
+        request.config.attrs[0].attr.values = 0
+        request.config.attrs[0].mask = (1 << len(pins)) - 1
+
+    chip_fd = os.open(chip, os.O_RDWR | os.O_CLOEXEC)
+    try:
+        fcntl.ioctl(chip_fd, GPIO_V2_GET_LINE_IOCTL, request)
+    finally:
+        os.close(chip_fd)
+    return request.fd
+
+
+def _check_pins(pins: Sequence[int]) -> None:
+    if not 0 < len(pins) <= GPIO_V2_LINES_MAX:
+        raise ValueError(f"Between 1 and {GPIO_V2_LINES_MAX} pins")
+    if len(set(pins)) != len(pins):
+        raise ValueError(f"Pins must be unique: {list(pins)}")
+
+
+class GpioChardev(_Batching):
+    """
+    GPIO lines through /dev/gpiochipN.
+
+    Parameters:
+        pins (Sequence[int]): Every pin to request, as outputs.
+        chip (Path | str): The character device. Default /dev/gpiochip0.
+        consumer (str): Label shown by gpioinfo. Default "town_clock".
+    """
+
+    def __init__(
+        self,
+        pins: Sequence[int],
+        chip: Path | str = "/dev/gpiochip0",
+        consumer: str = "town_clock",
+    ) -> None:
+        super().__init__()
+        _check_pins(pins)
+        self.pins: list[int] = list(pins)
+        self.chip = Path(chip)
+        self._index = {pin: idx for idx, pin in enumerate(self.pins)}
+        self._bits: int = 0
+
+        self._fd: int | None = _request_lines(
+            self.pins, self.chip, consumer, GPIO_V2_LINE_FLAG_OUTPUT
+        )
+        self._values = GpioV2LineValues()
+
+    def _write(self, values: Mapping[int, bool]) -> None:
+        if self._fd is None:
+            raise ValueError("GPIO lines are closed")
+        mask = 0
+        bits = self._bits
+        for pin, value in values.items():
+            bit = 1 << self._index[pin]
+            mask |= bit
+            bits = bits | bit if value else bits & ~bit
+        self._values.bits = bits
+        self._values.mask = mask
+        fcntl.ioctl(self._fd, GPIO_V2_LINE_SET_VALUES_IOCTL, self._values)
+        self._bits = bits
+
+    def get_line(self, pin: int) -> bool:
+        return bool(self._bits >> self._index[pin] & 1)
+
+    def close(self) -> None:
+        """Release the lines."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FakeGpioBackend(_Batching):
+    """
+    In memory GPIO lines.
+
+    Parameters:
+        pins (Sequence[int]): The pins that may be set.
+        time_source (TimeSource): Timestamps the history, monotonic.
+        history (int): Most changes kept. Default is 10000.
+    """
+
+    def __init__(
+        self,
+        pins: Sequence[int],
+        time_source: TimeSource = SYSTEM_TIME,
+        history: int = 10_000,
+    ) -> None:
+        super().__init__()
+        self.pins: list[int] = list(pins)
+        self.time_source = time_source
+        self.lines: dict[int, bool] = {pin: False for pin in self.pins}
+        self.history: deque[tuple[float, int, bool]] = deque(maxlen=history)
+        self.writes: int = 0
+
+    def _write(self, values: Mapping[int, bool]) -> None:
+        now = self.time_source.monotonic()
+        for pin, value in values.items():
+            if pin not in self.lines:
+                raise KeyError(f"Pin {pin} was not requested")
+        for pin, value in values.items():
+            self.lines[pin] = value
+            self.history.append((now, pin, value))
+        self.writes += 1
+
+    def get_line(self, pin: int) -> bool:
+        return self.lines[pin]
+
+    def close(self) -> None:
+        ...
+
+
+@dataclass(frozen=True, slots=True)
+class Edge:
+    """
+    A level change on an input line.
+
+    Parameters:
+        pin (int): BCM number.
+        rising (bool): True when the line went high.
+        timestamp (float): CLOCK_MONOTONIC seconds, the same clock as
+                           time.monotonic() and the asyncio loop.
+    """
+
+    pin: int
+    rising: bool
+    timestamp: float
+
+
+class EdgeSource(Protocol):
+    """Edge Source Protocol"""
+
+    def fileno(self) -> int:
+        """Readable while edges are waiting."""
+        ...
+
+    def read_edges(self) -> list[Edge]:
+        """Every edge waiting, oldest first, without blocking."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class GpioEdges:
+    """
+    Edge events from input lines through /dev/gpiochipN.
+
+    Parameters:
+        pins (Sequence[int]): Every pin to watch.
+        chip (Path | str): The character device. Default /dev/gpiochip0.
+        consumer (str): Label shown by gpioinfo. Default "town_clock".
+        pull_up (bool): Bias the lines high, for buttons to ground.
+                        Default is True.
+        buffer (int): Edges the kernel queues before dropping. Default 64.
+    """
+
+    def __init__(
+        self,
+        pins: Sequence[int],
+        chip: Path | str = "/dev/gpiochip0",
+        consumer: str = "town_clock",
+        pull_up: bool = True,
+        buffer: int = 64,
+    ) -> None:
+        _check_pins(pins)
+        self.pins: list[int] = list(pins)
+        self.chip = Path(chip)
+        flags = (
+            GPIO_V2_LINE_FLAG_INPUT
+            | GPIO_V2_LINE_FLAG_EDGE_RISING
+            | GPIO_V2_LINE_FLAG_EDGE_FALLING
+        )
+        if pull_up:
+            flags |= GPIO_V2_LINE_FLAG_BIAS_PULL_UP
+        self._fd: int | None = _request_lines(
+            self.pins, self.chip, consumer, flags, buffer
+        )
+        os.set_blocking(self._fd, False)
+        self._size = LINE_EVENT.size * buffer
+
+    def fileno(self) -> int:
+        if self._fd is None:
+            raise ValueError("GPIO lines are closed")
+        return self._fd
+
+    def read_edges(self) -> list[Edge]:
+        try:
+            data = os.read(self.fileno(), self._size)
+        except BlockingIOError:
+            return []
+        return [
+            Edge(
+                offset,
+                kind == GPIO_V2_LINE_EVENT_RISING_EDGE,
+                timestamp_ns / 1e9,
+            )
+            for timestamp_ns, kind, offset, _, _ in LINE_EVENT.iter_unpack(
+                data
+            )
+        ]
+
+    def close(self) -> None:
+        """Release the lines."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FakeGpioEdges:
+    """
+    In memory input lines, edges are queued behind a pipe.
+
+    Parameters:
+        pins (Sequence[int]): The pins that may change.
+        time_source (TimeSource): Timestamps edges, monotonic.
+    """
+
+    def __init__(
+        self, pins: Sequence[int], time_source: TimeSource = SYSTEM_TIME
+    ) -> None:
+        self.pins: list[int] = list(pins)
+        self.time_source = time_source
+        self._edges: deque[Edge] = deque()
+        self._read, self._write = os.pipe()
+        os.set_blocking(self._read, False)
+
+    def set_line(
+        self, pin: int, high: bool, timestamp: float | None = None
+    ) -> None:
+        """Change a line, like a button being pressed or let go."""
+        if pin not in self.pins:
+            raise KeyError(f"Pin {pin} was not requested")
+        if timestamp is None:
+            timestamp = self.time_source.monotonic()
+        self._edges.append(Edge(pin, high, timestamp))
+        os.write(self._write, b"\0")
+
+    def fileno(self) -> int:
+        return self._read
+
+    def read_edges(self) -> list[Edge]:
+        try:
+            os.read(self._read, 4096)
+        except BlockingIOError:
+            pass
+        edges = list(self._edges)
+        self._edges.clear()
+        return edges
+
+    def close(self) -> None:
+        if self._read >= 0:
+            os.close(self._read)
+            os.close(self._write)
+            self._read = self._write = -1
@@ -0,0 +1,193 @@
+"""
+night.py
+
+When the tower lights go on and off, compiled ahead of time.
+
+Working out the sun's position every tick is far too slow on a Pi. A
+NightSchedule compiles the dusk and dawn instants for a day at a time,
+from the SunTable when it covers the day or else from skyfield for the
+tower's position, into a sorted list of LightChange events. Whoever runs
+the tower schedules an LED switch for each event. Between events
+ClockTower.is_night is a plain attribute read.
+
+Once less than a day is compiled ahead, the next day is compiled on a
+short lived background thread, so the astronomy never runs at an event.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+from loguru import logger
+
+from town_clock.util.sun_table import DAY, SunTable, compute_transitions
+
+DAY_SECONDS = 86_400
+
+Compute = Callable[
+    [float, float, float, datetime, datetime],
+    tuple[list[int], list[int], int],
+]
+
+
+@dataclass(frozen=True, slots=True)
+class LightChange:
+    """
+    Dusk or dawn.
+
+    Parameters:
+        at (int): Epoch seconds.
+        dark (bool): True at dusk, when the lights go on.
+    """
+
+    at: int
+    dark: bool
+
+
+class NightSchedule:
+    """
+    Dusk and dawn for one tower, compiled a day at a time.
+
+    Parameters:
+        position (dict[str, float]): latitude, longitude and altitude, as
+                                     in ClockTower.position.
+        sun_table (SunTable | None): Used for every day it covers.
+        threshold (int): Twilight states below this are night. Default is
+                         DAY, night runs from sunset to sunrise.
+        compute (Compute): Astronomy for days the table does not cover.
+                           Default is skyfield.
+    """
+
+    def __init__(
+        self,
+        position: dict[str, float],
+        sun_table: SunTable | None = None,
+        threshold: int = DAY,
+        compute: Compute = compute_transitions,
+    ) -> None:
+        self.position = position
+        self.sun_table = sun_table
+        self.threshold = threshold
+        self.compute = compute
+        self.dark: bool = False
+        self.changes: list[LightChange] = []
+        self._times: list[int] = []
+        self.start: float = 0.0
+        self.end: float = 0.0
+        self._lock = threading.Lock()
+        self._prefetch: threading.Thread | None = None
+
+    def compile(
+        self, start: float, end: float
+    ) -> tuple[bool, list[LightChange]]:
+        """
+        Work out the night between two times.
+
+        Returns:
+            tuple[bool, list[LightChange]]: Whether it is night at start,
+                                            and every change after it.
+        """
+        table = self.sun_table
+        if table is not None and table.covers(start, end):
+            initial = table.state_at(start)
+            found: Iterable[tuple[int, int]] = table.transitions(start, end)
+        else:
+            times, states, initial = self.compute(
+                self.position["latitude"],
+                self.position["longitude"],
+                self.position["altitude"],
+                datetime.fromtimestamp(start, timezone.utc),
+                datetime.fromtimestamp(end, timezone.utc),
+            )
+            found = zip(times, states)
+        dark = initial < self.threshold
+        changes: list[LightChange] = []
+        state = dark
+        for at, entered in found:
+            now_dark = entered < self.threshold
+            if now_dark != state and start <= at < end:
+                changes.append(LightChange(int(at), now_dark))
+                state = now_dark
+        return dark, changes
+
+    def load(self, now: float, days: int = 2) -> bool:
+        """
+        Compile from now for some days and set dark for now.
+
+        Returns:
+            bool: Whether it is night now.
+        """
+        end = now + days * DAY_SECONDS
+        dark, changes = self.compile(now, end)
+        with self._lock:
+            self.dark = dark
+            self.changes = changes
+            self._times = [change.at for change in changes]
+            self.start, self.end = now, end
+        return dark
+
+    def extend(self) -> None:
+        """Compile one more day onto the end."""
+        start = self.end
+        _, changes = self.compile(start, start + DAY_SECONDS)
+        with self._lock:
+            if self.end != start:
+                return
+            self.changes.extend(changes)
+            self._times.extend(change.at for change in changes)
+            self.end = start + DAY_SECONDS
+        logger.debug(f"Night schedule compiled to {self.end:.0f}")
+
+    def prefetch(self) -> threading.Thread:
+        """Extend on a background thread, unless one is running."""
+        if self._prefetch is None or not self._prefetch.is_alive():
+            self._prefetch = threading.Thread(
+                target=self._extend_logged, name="night", daemon=True
+            )
+            self._prefetch.start()
+        return self._prefetch
+
+    def _extend_logged(self) -> None:
+        try:
+            self.extend()
+        except Exception as err:
+            logger.exception(f"Night schedule prefetch failed: {err}")
+
+    def next_change(self, now: float) -> LightChange:
+        """
+        The first change after now. When nothing changes before the end of
+        what is compiled, a change to the same state at the end is
+        returned, so the caller checks back then. It is always after now.
+        """
+        if self.end <= now:
+            self.load(now)
+        with self._lock:
+            idx = bisect_right(self._times, now)
+            if idx < len(self.changes):
+                change = self.changes[idx]
+            else:
+                dark = self.changes[-1].dark if self.changes else self.dark
+                # Rounded up and after now, a past change would be
+                # scheduled at once and fetched again and again.
+                at = max(math.ceil(self.end), math.floor(now) + 1)
+                change = LightChange(at, dark)
+            ahead = self.end - now
+        if ahead < DAY_SECONDS:
+            self.prefetch()
+        return change
+
+    def apply(self, change: LightChange) -> bool:
+        """
+        Record that a change has happened.
+
+        Returns:
+            bool: Whether it is night now.
+        """
+        self.dark = change.dark
+        return self.dark
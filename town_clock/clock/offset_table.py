@@ -0,0 +1,159 @@
+"""
+offset_table.py
+
+UTC offset transitions for a timezone.
+
+Turning epoch seconds into local time through pendulum costs several
+objects per call. The offset only changes a couple of times a year, so
+the transitions are found once, by probing pendulum itself, and each
+lookup after that is a bisect over two lists of ints. Using pendulum's own
+tz data keeps the results identical to pendulum.from_timestamp.
+
+The table covers a year either side of the first lookup and grows as
+needed.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterator, Optional
+
+import pendulum
+from pendulum.tz import local_timezone
+from pendulum.tz import timezone as load_timezone
+from pendulum.tz.timezone import Timezone
+
+PROBE_STEP = 6 * 3600
+"""Seconds between probes, transitions closer together are missed."""
+SPAN = 366 * 86400
+"""Seconds added each time the table grows."""
+
+
+class OffsetTable:
+    """
+    UTC offsets of one timezone.
+
+    Parameters:
+        timezone (Timezone | str): The zone.
+        step (int): Seconds between probes. Default is PROBE_STEP.
+        span (int): Seconds added when the table grows. Default is SPAN.
+    """
+
+    def __init__(
+        self,
+        timezone: Timezone | str,
+        step: int = PROBE_STEP,
+        span: int = SPAN,
+    ) -> None:
+        self.zone: Timezone = (
+            load_timezone(timezone) if isinstance(timezone, str) else timezone
+        )
+        self.step = step
+        self.span = span
+        self._times: list[int] = []
+        self._offsets: list[int] = []
+        self._initial: int = 0
+        self._start: int = 0
+        self._end: int = -1
+
+    @property
+    def name(self) -> str:
+        return self.zone.name
+
+    def _probe(self, timestamp: int) -> int:
+        return pendulum.from_timestamp(timestamp, tz=self.zone).offset
+
+    def _scan(self, low: int, high: int) -> tuple[int, list[tuple[int, int]]]:
+        """
+        Offset at low and the transitions in (low, high].
+        """
+        first = previous = self._probe(low)
+        last_time = low
+        found: list[tuple[int, int]] = []
+        for probe_time in [*range(low + self.step, high, self.step), high]:
+            current = self._probe(probe_time)
+            while current != previous:
+                # First second in (last_time, probe_time] with a new offset.
+                before, after = last_time, probe_time
+                while after - before > 1:
+                    middle = (before + after) // 2
+                    if self._probe(middle) == previous:
+                        before = middle
+                    else:
+                        after = middle
+                previous = self._probe(after)
+                last_time = after
+                found.append((after, previous))
+            last_time = probe_time
+        return first, found
+
+    def _extend(self, timestamp: int) -> None:
+        if self._end < self._start:
+            low, high = timestamp - self.span, timestamp + self.span
+            self._initial, found = self._scan(low, high)
+            self._times = [t for t, _ in found]
+            self._offsets = [o for _, o in found]
+            self._start, self._end = low, high
+            return
+        if timestamp > self._end:
+            high = max(timestamp, self._end + self.span)
+            _, found = self._scan(self._end, high)
+            self._times += [t for t, _ in found]
+            self._offsets += [o for _, o in found]
+            self._end = high
+        if timestamp < self._start:
+            low = min(timestamp, self._start - self.span)
+            self._initial, found = self._scan(low, self._start)
+            self._times[:0] = [t for t, _ in found]
+            self._offsets[:0] = [o for _, o in found]
+            self._start = low
+
+    def offset(self, timestamp: int) -> int:
+        """
+        UTC offset in seconds at a whole epoch second.
+        """
+        if not self._start <= timestamp <= self._end:
+            self._extend(timestamp)
+        idx = bisect_right(self._times, timestamp)
+        return self._offsets[idx - 1] if idx else self._initial
+
+    def transitions(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """
+        Yields (epoch seconds, new offset) for each change in [start, end).
+        """
+        if not self._start <= start <= self._end:
+            self._extend(start)
+        if not self._start <= end <= self._end:
+            self._extend(end)
+        idx = bisect_right(self._times, start - 1)
+        while idx < len(self._times) and self._times[idx] < end:
+            yield self._times[idx], self._offsets[idx]
+            idx += 1
+
+
+def split_timestamp(timestamp: float) -> tuple[int, int]:
+    """
+    Whole seconds and microseconds, rounded the same way as
+    datetime.fromtimestamp.
+    """
+    whole = int(timestamp // 1)
+    micro = round((timestamp - whole) * 1_000_000)
+    if micro >= 1_000_000:
+        whole, micro = whole + 1, micro - 1_000_000
+    return whole, micro
+
+
+_TABLES: dict[str, OffsetTable] = {}
+
+
+def offset_table(timezone: Optional[Timezone | str]) -> OffsetTable:
+    """
+    Shared OffsetTable for a zone, None is the local timezone.
+    """
+    if timezone is None:
+        timezone = local_timezone()
+    name = timezone if isinstance(timezone, str) else timezone.name
+    if (table := _TABLES.get(name)) is None:
+        table = _TABLES[name] = OffsetTable(timezone)
+    return table
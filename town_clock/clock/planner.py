@@ -0,0 +1,142 @@
+"""
+planner.py
+
+Catch-up planner.
+
+Works out the quickest way to bring a clock face back to the current
+time. A slow face can either be advanced, pulsing as fast as the
+movement allows while the real time keeps moving, or held until the real
+time comes back round to it.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from enum import Enum
+
+from town_clock.util import FaceName
+
+MINUTES_ON_DIAL = 720
+
+
+class Action(Enum):
+    """
+    What a face should do to get back in sync.
+    NONE = 'none'
+    HOLD = 'hold'
+    ADVANCE = 'advance'
+    """
+
+    NONE = "none"
+    HOLD = "hold"
+    ADVANCE = "advance"
+
+
+@dataclass(frozen=True, slots=True)
+class CatchUpPlan:
+    """
+    Plan for one face.
+
+    Parameters:
+        face (FaceName): The face this plan is for.
+        action (Action): Hold, advance or nothing.
+        pulses (int): Pulses to send when advancing, else 0.
+        hold (int): Minutes to stop the face when holding, else 0.
+        duration (float): Seconds until the face is in sync.
+    """
+
+    face: FaceName
+    action: Action
+    pulses: int = 0
+    hold: int = 0
+    duration: float = 0.0
+
+    @property
+    def slow(self) -> int:
+        """The plan in Clock.slow form, negative is a hold."""
+        return self.pulses if self.action is Action.ADVANCE else -self.hold
+
+
+def pulses_to_catch_up(slow: int, period: float, second: float = 0.0) -> int:
+    """
+    Pulses needed to catch a moving target.
+
+    While the face is pulsing the real time keeps moving, so a face that
+    is `slow` minutes behind needs extra pulses for every minute that
+    passes during the catch-up.
+
+    Args:
+        slow: int: Minutes the face is behind.
+        period: float: Seconds per pulse, pulse width plus rest.
+        second: float: Seconds already past the current minute.
+
+    Raises:
+        ValueError: When the face cannot pulse faster than time moves.
+
+    Returns:
+        int: Smallest number of pulses that lands on the current minute.
+    """
+    if period >= 60:
+        raise ValueError(f"Pulse period {period}s can never catch up")
+
+    def lands(pulses: int) -> bool:
+        return pulses >= slow + int((second + pulses * period) // 60)
+
+    # Without rounding down the minutes this many pulses always land.
+    low, high = slow, math.ceil((slow + second / 60) / (1 - period / 60))
+    while low < high:
+        mid = (low + high) // 2
+        if lands(mid):
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def plan_catch_up(
+    face: FaceName,
+    position: int,
+    clock_time: int,
+    max_rate: float,
+    second: float = 0.0,
+    wear: float = 1.0,
+) -> CatchUpPlan:
+    """
+    Choose between holding and advancing a face, whichever syncs first
+    once the wear of each pulse is counted.
+
+    Ties go to holding, it costs no wear on the movement.
+
+    Args:
+        face: FaceName: The face being planned.
+        position: int: Clock.time_on_clock, minutes past 12 (0-719).
+        clock_time: int: Time.clock_time, minutes past 12 (0-719).
+        max_rate: float: Fastest the movement can pulse, pulses per second.
+        second: float: Seconds already past the current minute.
+        wear: float: Seconds of extra sync time worth accepting to save one
+                     pulse. Default is 1.0, 0 picks purely on time.
+
+    Returns:
+        CatchUpPlan
+    """
+    slow = (clock_time - position) % MINUTES_ON_DIAL
+    if slow == 0:
+        return CatchUpPlan(face, Action.NONE)
+
+    hold = MINUTES_ON_DIAL - slow
+    hold_duration = hold * 60 - second
+
+    period = 1 / max_rate if max_rate > 0 else math.inf
+    advance_duration = math.inf
+    pulses = 0
+    if period < 60:
+        pulses = pulses_to_catch_up(slow, period, second)
+        advance_duration = pulses * period
+
+    if advance_duration + pulses * wear < hold_duration:
+        return CatchUpPlan(
+            face, Action.ADVANCE, pulses=pulses, duration=advance_duration
+        )
+    return CatchUpPlan(face, Action.HOLD, hold=hold, duration=hold_duration)
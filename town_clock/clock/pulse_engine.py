@@ -0,0 +1,210 @@
+"""
+pulse_engine.py
+
+Pulses every clock face in the same timing slots.
+
+Each face has its own pulse width (relay on time) and rest time. All
+faces that are due in a slot are switched together, so catching up takes
+as long as the slowest face rather than the sum of all of them.
+
+run() sleeps through the slots itself. A scheduler driving several engines
+calls start() and then step() whenever due() comes round.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import heapq
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Sequence
+
+from loguru import logger
+
+from town_clock.clock import timing
+from town_clock.clock.clock import Clock
+from town_clock.clock.gpio import GpioBackend
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util import FaceName
+from town_clock.util.clock_exceptions import ClockGroupError, PulseError
+
+OFF = 0
+ON = 1
+
+
+@dataclass(slots=True)
+class PulseEngine:
+    """
+    Pulses several clocks concurrently.
+
+    Parameters:
+        clocks (Sequence[Clock]): The clocks to pulse.
+        min_rest (float): Shortest rest between pulses on one face,
+                          a face rests for max(clock.sleep_time, min_rest).
+        on_pulse (Callable[[Clock, bool], None] | None): Called after every
+            pulse with the clock and whether the pulse succeeded.
+        progress (dict[FaceName, tuple[int, int]]): Pulses (done, total)
+                                                    for each face.
+        time_source (TimeSource): Clock used to time the slots.
+                                  Default is SYSTEM_TIME.
+        backend (GpioBackend | None): When set, every relay switched in a
+                                      slot is written in one batch.
+    """
+
+    clocks: Sequence[Clock]
+    min_rest: float = field(default=0.0)
+    on_pulse: Callable[[Clock, bool], None] | None = field(default=None)
+    progress: dict[FaceName, tuple[int, int]] = field(default_factory=dict)
+    time_source: TimeSource = field(default=SYSTEM_TIME, repr=False)
+    backend: GpioBackend | None = field(default=None, repr=False)
+    _events: list[tuple[float, int, int]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _remaining: list[int] = field(default_factory=list, init=False, repr=False)
+    _errors: list[Exception] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def run(self, pulses: Iterable[int]) -> dict[FaceName, tuple[int, int]]:
+        """
+        Pulse each clock the given number of times.
+
+        Args:
+            pulses: Iterable[int]: Pulses for each clock, in order.
+
+        Raises:
+            ClockGroupError: When one or more faces failed. The other faces
+                             still receive all of their pulses.
+
+        Returns:
+            dict[FaceName, tuple[int, int]]: Pulses (done, total) per face.
+        """
+        self.start(pulses)
+        source = self.time_source
+        while (deadline := self.due()) is not None:
+            self.step(source.sleep_until(deadline))
+        return self.finish()
+
+    def start(self, pulses: Iterable[int]) -> None:
+        """
+        Queue the pulses without sending any, for callers that run the
+        slots from their own scheduler with due() and step().
+
+        Args:
+            pulses: Iterable[int]: Pulses for each clock, in order.
+        """
+        remaining = [max(0, int(n)) for n in pulses]
+        if len(remaining) != len(self.clocks):
+            raise ValueError(
+                f"Expected {len(self.clocks)} pulse counts, "
+                f"got {len(remaining)}"
+            )
+        self.progress = {
+            clock.name: (0, n) for clock, n in zip(self.clocks, remaining)
+        }
+        self._remaining = remaining
+        self._errors = []
+        start = self.time_source.monotonic()
+        self._events = [
+            (start, ON, idx) for idx, n in enumerate(remaining) if n > 0
+        ]
+        heapq.heapify(self._events)
+
+    def due(self) -> float | None:
+        """Monotonic deadline of the next slot, None when finished."""
+        return self._events[0][0] if self._events else None
+
+    def step(self, late: float = 0.0) -> None:
+        """
+        Switch everything in the next slot, once its deadline has passed.
+
+        Args:
+            late: float: Seconds the caller woke after the deadline.
+        """
+        events = self._events
+        deadline = events[0][0]
+        # A late wake up must not shorten the pulse or the rest.
+        now = max(deadline, self.time_source.monotonic())
+        # Everything due now shares the slot. Offs sort before ons.
+        slot: list[tuple[float, int, int]] = []
+        while events and events[0][0] <= deadline:
+            slot.append(heapq.heappop(events))
+        timing.record(
+            "pulse_width" if slot[0][1] == OFF else "pulse_start", late
+        )
+        for action, idx in self._switch(slot, self._errors):
+            clock = self.clocks[idx]
+            if action == ON:
+                heapq.heappush(events, (now + clock.pulse_width, OFF, idx))
+                continue
+            clock.advance()
+            self._remaining[idx] -= 1
+            done, total = self.progress[clock.name]
+            self.progress[clock.name] = (done + 1, total)
+            if self.on_pulse is not None:
+                self.on_pulse(clock, True)
+            if self._remaining[idx] > 0:
+                rest = max(clock.sleep_time, self.min_rest)
+                heapq.heappush(events, (now + rest, ON, idx))
+
+    def finish(self) -> dict[FaceName, tuple[int, int]]:
+        """
+        Log the totals once due() is None.
+
+        Raises:
+            ClockGroupError: When one or more faces failed.
+
+        Returns:
+            dict[FaceName, tuple[int, int]]: Pulses (done, total) per face.
+        """
+        for clock in self.clocks:
+            done, total = self.progress[clock.name]
+            if total:
+                logger.info(f"Clock {clock.label} pulsed {done}/{total}")
+        if self._errors:
+            raise ClockGroupError("Failed to pulse clocks", self._errors)
+        return self.progress
+
+    def _switch(
+        self, slot: list[tuple[float, int, int]], errors: list[Exception]
+    ) -> list[tuple[int, int]]:
+        """
+        Switch the relays due in a slot, as one write when there is a
+        backend.
+
+        Returns:
+            list[tuple[int, int]]: (action, idx) of the relays switched.
+        """
+        switched: list[tuple[int, int]] = []
+        batch = self.backend.batch() if self.backend else nullcontext()
+        try:
+            with batch:
+                for _, action, idx in slot:
+                    relay = self.clocks[idx].relay
+                    try:
+                        if action == ON:
+                            relay.turn_on()
+                        else:
+                            relay.turn_off()
+                    except Exception as err:
+                        errors.append(self._fail(self.clocks[idx], err))
+                        continue
+                    switched.append((action, idx))
+        except Exception as err:
+            # The batched write failed, nothing in the slot moved.
+            for _, idx in switched:
+                errors.append(self._fail(self.clocks[idx], err))
+            return []
+        return switched
+
+    def _fail(self, clock: Clock, err: Exception) -> PulseError:
+        """Leave the relay off and stop pulsing that face."""
+        try:
+            clock.relay.turn_off()
+        except Exception:
+            ...
+        if self.on_pulse is not None:
+            self.on_pulse(clock, False)
+        error = PulseError(False, f"Failed to pulse: {clock.label}")
+        error.__cause__ = err
+        return error
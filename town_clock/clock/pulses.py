@@ -5,47 +5,89 @@ Author: Zack Hankin
 Started: 20/02/2023
 """
 from __future__ import annotations
-from typing import Sequence
 
+from array import array
+from operator import sub
+from typing import Iterable, Iterator, Sequence
 
-class GreaterThanZero:
-    """Class descriptor that ensures the value is greater zero."""
 
-    __slots__ = ["name"]
+class Pulses:
+    """
+    Object to control the Pulse amount.
 
-    def __init__(self) -> None:
-        self.name: str = ""
+    A vector with one slot per clock face, backed by an array of C longs.
+    Values are never below zero, negative values are clamped to zero.
+    """
 
-    def __set_name__(self, owner, name):
-        self.name = f"_{name}"
+    __slots__ = ["_values"]
 
-    def __get__(self, instance, owner=None) -> int:
-        ret_value: int = getattr(instance, self.name)
-        if isinstance(ret_value, int | float):
-            return max(0, ret_value)
-        elif ret_value is None:
-            return 0
-        else:
-            return NotImplemented
+    def __init__(self, *values: int) -> None:
+        self._values: array[int] = array("l", values)
+        self.clamp()
 
-    def __set__(self, instance, value) -> None:
-        if value is None:
-            value = 0
-        value = max(value, 0)
-        setattr(instance, self.name, value)
+    @classmethod
+    def zeros(cls, faces: int) -> Pulses:
+        """Pulses of zero for the given number of faces."""
+        pulses = cls()
+        pulses._values = array("l", [0]) * faces
+        return pulses
 
+    def load(self, values: Iterable[int]) -> Pulses:
+        """
+        Replace the values in place, resizing if the face count changed.
 
-class Pulses:
-    """Object to control the Pulse amount"""
+        Returns:
+            self
+        """
+        self._values[:] = array("l", values)
+        return self.clamp()
+
+    def clamp(self) -> Pulses:
+        """
+        Clamp every value to zero or above.
+
+        Returns:
+            self
+        """
+        if self._values and min(self._values) < 0:
+            self._values = array(
+                "l", (value if value > 0 else 0 for value in self._values)
+            )
+        return self
+
+    def all_zero(self) -> bool:
+        """Do none of the faces need pulsing?"""
+        return not any(self._values)
+
+    def __sub__(self, other: Pulses | Sequence[int] | int) -> Pulses:
+        """
+        Subtract per face, clamping at zero.
+
+        Args:
+            other (Pulses | Sequence[int] | int): Pulses, a Sequence the same
+                                                  length or an int for every
+                                                  face.
+        """
+        result = Pulses()
+        if isinstance(other, int):
+            result._values = array("l", (v - other for v in self._values))
+        elif len(other) == len(self):
+            result._values = array("l", map(sub, self._values, other))
+        else:
+            return NotImplemented
+        return result.clamp()
+
+    def __len__(self) -> int:
+        return len(self._values)
 
-    __slots__ = ["_one", "_two"]
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._values)
 
-    one = GreaterThanZero()
-    two = GreaterThanZero()
+    def __getitem__(self, idx: int) -> int:
+        return self._values[idx]
 
-    def __init__(self, one: int = 0, two: int = 0) -> None:
-        self.one = one
-        self.two = two
+    def __setitem__(self, idx: int, value: int | None) -> None:
+        self._values[idx] = max(value or 0, 0)
 
     def __eq__(self, o: object) -> bool:
         """
@@ -58,11 +100,11 @@ class Pulses:
             bool: True if equal.
         """
         if isinstance(o, Pulses):
-            return self == o
+            return self._values == o._values
         elif isinstance(o, Sequence):
-            return (self.one == o[0]) and (self.two == o[1])
+            return self._values.tolist() == list(o)
         else:
             return NotImplemented
 
     def __repr__(self) -> str:
-        return f"Pulses({self.one}, {self.two})"
+        return f"Pulses({', '.join(map(str, self._values))})"
@@ -4,9 +4,11 @@ relay.py
 todo: better error handling
 """
 from __future__ import annotations
-import time
 
-from town_clock.util import Mode, CLOCK
+from town_clock.clock import timing
+from town_clock.clock.gpio import GpioBackend
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util import Mode, FaceName
 from town_clock.util.clock_exceptions import PulseError
 
 
@@ -17,45 +19,73 @@ class Relay:
         remember to order of pulses. Alternating between common and clock pin.
     """
 
-    def __init__(self, pin: int, name: str, mode: Mode = Mode.TEST) -> None:
+    def __init__(
+        self,
+        pin: int,
+        name: str,
+        mode: Mode = Mode.TEST,
+        backend: GpioBackend | None = None,
+    ) -> None:
         self.is_on: bool = False
         self.mode = mode
         self.pin = pin
         self.name = name
+        self.backend = backend
 
-    def turn_on(self) -> None:
+    def turn_on(self) -> Relay:
+        if self.backend is not None:
+            self.backend.set_lines({self.pin: True})
         self.is_on = True
+        return self
 
-    def turn_off(self) -> None:
+    def turn_off(self) -> Relay:
+        if self.backend is not None:
+            self.backend.set_lines({self.pin: False})
         self.is_on = False
+        return self
 
 
 class ClockRelay(Relay):
     """Clock Relay Class"""
 
-    def __init__(self, common_pin: int, clock: CLOCK, *args, **kwargs) -> None:
+    def __init__(
+        self,
+        common_pin: int,
+        clock: FaceName,
+        *args,
+        time_source: TimeSource = SYSTEM_TIME,
+        **kwargs,
+    ) -> None:
         """
         Init Clock Relay
 
         args:
             common_pin: int
-            clock: CLOCK
+            clock: FaceName
             pin: int
             name: str
             mode: Mode = Mode.TEST
+            backend: GpioBackend | None = None
+            time_source: TimeSource = SYSTEM_TIME
         """
         self.common_pin = common_pin
-        self.clock: CLOCK = clock
+        self.clock: FaceName = clock
+        self.time_source = time_source
         super().__init__(*args, **kwargs)
 
-    def pulse(self) -> bool:
+    def pulse(self, width: float = 0.1) -> bool:
         """
         Pulse the relay.
+
+        Args:
+            width: float: Seconds the relay is held on. Default is 0.1.
         """
         try:
+            start = self.time_source.monotonic()
             self.turn_on()
-            time.sleep(0.1)
+            late = self.time_source.sleep_until(start + width)
             self.turn_off()
+            timing.record("pulse_width", late)
             return True
         except Exception:
             raise PulseError(False, f"Failed to pulse: {self.name}")
@@ -0,0 +1,100 @@
+"""
+time_source.py
+
+Where the clock gets the time from and how it waits.
+
+Everything that reads the time or sleeps takes a TimeSource. The daemon
+uses SYSTEM_TIME. VirtualTime never really waits, a sleep moves its clocks
+forward instantly, so months of ticks, DST changes and outages run in
+seconds and always give the same pulses.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import time
+from typing import Protocol
+
+from town_clock.clock import timing
+
+
+class TimeSource(Protocol):
+    """Time Source Protocol"""
+
+    def time(self) -> float:
+        """Wall clock, seconds since epoch."""
+        ...
+
+    def monotonic(self) -> float:
+        """Monotonic clock, seconds."""
+        ...
+
+    def sleep(self, seconds: float) -> None:
+        """Wait for seconds."""
+        ...
+
+    def sleep_until(self, deadline: float) -> float:
+        """Wait until monotonic() reaches deadline, returns seconds late."""
+        ...
+
+
+class SystemTime:
+    """The real clocks."""
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def sleep_until(self, deadline: float) -> float:
+        return timing.sleep_until(deadline)
+
+
+SYSTEM_TIME = SystemTime()
+
+
+class VirtualTime:
+    """
+    Simulated clocks that jump forward instead of waiting.
+
+    Parameters:
+        start (float): Wall clock to start at, seconds since epoch.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._wall: float = start
+        self._monotonic: float = 0.0
+        self.slept: float = 0.0
+
+    def time(self) -> float:
+        return self._wall
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(max(0.0, seconds))
+        self.slept += max(0.0, seconds)
+
+    def sleep_until(self, deadline: float) -> float:
+        self.sleep(deadline - self._monotonic)
+        return 0.0
+
+    def advance(self, seconds: float) -> None:
+        """Move both clocks forward, like time passing."""
+        if seconds < 0:
+            raise ValueError("Time can only move forward")
+        self._wall += seconds
+        self._monotonic += seconds
+
+    def advance_to(self, wall: float) -> None:
+        """Let time pass until the wall clock reads wall."""
+        self.advance(max(0.0, wall - self._wall))
+
+    def set_time(self, wall: float) -> None:
+        """Step only the wall clock, like NTP or `date -s`."""
+        self._wall = wall
@@ -0,0 +1,232 @@
+"""
+timing.py
+
+Precise waits for pulse widths and minute edges, and how well they did.
+
+time.sleep() wakes whenever the scheduler gets round to it, often a
+millisecond or more late on a busy Pi, and relative sleeps add that error
+to every step. Here every wait is to an absolute monotonic deadline: the
+thread sleeps with clock_nanosleep(TIMER_ABSTIME) until just before the
+deadline, then spins on time.monotonic_ns() for the last stretch. Where
+clock_nanosleep is not available time.sleep() is used for the coarse part.
+
+Every wait can be recorded in a JitterHistogram of achieved minus target
+time. The histograms are kept by name in HISTOGRAMS, read them at runtime
+with histogram() or dump them all with report().
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+SPIN_NS = 200_000
+"""Nanoseconds before a deadline that sleeping stops and spinning starts."""
+
+CLOCK_MONOTONIC = 1
+TIMER_ABSTIME = 1
+
+BUCKETS_US = (
+    1,
+    2,
+    5,
+    10,
+    20,
+    50,
+    100,
+    200,
+    500,
+    1_000,
+    2_000,
+    5_000,
+    10_000,
+    20_000,
+    50_000,
+    100_000,
+    math.inf,
+)
+"""Upper bounds of the histogram buckets, microseconds of error."""
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+def _load_clock_nanosleep() -> Callable[..., int] | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.clock_nanosleep
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.POINTER(_Timespec),
+        ctypes.POINTER(_Timespec),
+    ]
+    func.restype = ctypes.c_int
+    return func
+
+
+_clock_nanosleep = _load_clock_nanosleep()
+
+
+def _sleep_to(deadline_ns: int) -> None:
+    """Sleep, without spinning, until about deadline_ns."""
+    if _clock_nanosleep is not None:
+        target = _Timespec(*divmod(deadline_ns, 1_000_000_000))
+        while (
+            _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, target, None)
+            == errno.EINTR
+        ):
+            ...
+        return
+    remaining = deadline_ns - time.monotonic_ns()
+    if remaining > 0:
+        time.sleep(remaining / 1e9)
+
+
+def sleep_until_ns(deadline_ns: int, spin_ns: int = SPIN_NS) -> int:
+    """
+    Wait until time.monotonic_ns() reaches deadline_ns.
+
+    Args:
+        deadline_ns: int: Absolute monotonic deadline.
+        spin_ns: int: How long before the deadline to start spinning.
+
+    Returns:
+        int: Nanoseconds late, never negative.
+    """
+    if deadline_ns - spin_ns > time.monotonic_ns():
+        _sleep_to(deadline_ns - spin_ns)
+    while (now := time.monotonic_ns()) < deadline_ns:
+        ...
+    return now - deadline_ns
+
+
+def sleep_until(deadline: float, spin_ns: int = SPIN_NS) -> float:
+    """
+    sleep_until_ns with time.monotonic() seconds.
+
+    Returns:
+        float: Seconds late.
+    """
+    return sleep_until_ns(int(deadline * 1e9), spin_ns) / 1e9
+
+
+def sleep_until_wall(edge: float, spin_ns: int = SPIN_NS) -> float:
+    """
+    Wait until time.time() reaches edge, through the monotonic clock.
+
+    Returns:
+        float: Seconds between edge and time.time() on waking, negative
+               if the wall clock was stepped back while waiting.
+    """
+    sleep_until(time.monotonic() + (edge - time.time()), spin_ns)
+    return time.time() - edge
+
+
+class JitterHistogram:
+    """
+    Counts of timing errors in log spaced buckets.
+
+    Parameters:
+        name (str): What is being timed.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts: list[int] = [0] * len(BUCKETS_US)
+        self.count: int = 0
+        self.early: int = 0
+        self.total_ns: int = 0
+        self.min_ns: int | None = None
+        self.max_ns: int | None = None
+        self._lock = threading.Lock()
+
+    def record(self, error_ns: int) -> None:
+        """
+        Add one wait, error_ns is achieved minus target, negative when
+        early. Buckets count the size of the error.
+        """
+        bucket = bisect_left(BUCKETS_US, abs(error_ns) / 1_000)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.early += error_ns < 0
+            self.total_ns += error_ns
+            if self.min_ns is None or error_ns < self.min_ns:
+                self.min_ns = error_ns
+            if self.max_ns is None or error_ns > self.max_ns:
+                self.max_ns = error_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding that fraction of the errors,
+        microseconds.
+        """
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_US, self.counts):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return math.inf
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "count": self.count,
+            "early": self.early,
+            "mean_ns": self.mean_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "buckets_us": dict(zip((str(b) for b in BUCKETS_US), self.counts)),
+        }
+
+    def __str__(self) -> str:
+        if not self.count:
+            return f"{self.name}: no samples"
+        return (
+            f"{self.name}: n={self.count} mean={self.mean_ns / 1e3:.1f}us "
+            f"max={(self.max_ns or 0) / 1e3:.1f}us "
+            f"p50<={self.percentile(0.5)}us p99<={self.percentile(0.99)}us"
+        )
+
+
+HISTOGRAMS: dict[str, JitterHistogram] = {}
+
+
+def histogram(name: str) -> JitterHistogram:
+    """The named histogram, created on first use."""
+    if (found := HISTOGRAMS.get(name)) is None:
+        found = HISTOGRAMS.setdefault(name, JitterHistogram(name))
+    return found
+
+
+def record(name: str, error: float) -> None:
+    """Add an error in seconds to the named histogram."""
+    histogram(name).record(int(error * 1e9))
+
+
+def report() -> str:
+    """Every histogram, one line each."""
+    return "\n".join(str(h) for _, h in sorted(HISTOGRAMS.items()))
@@ -0,0 +1,612 @@
+"""
+config.py
+
+Typed, validated config with a snapshot cache for a fast boot.
+
+config.toml is read and checked once, the derived values are worked out
+(coordinates as numbers, absolute paths, the timezone of the location) and
+the result is written next to it as a JSON snapshot. Later boots use the
+snapshot while the TOML is unchanged, so neither tomli nor TimezoneFinder
+is imported. The snapshot is keyed on the TOML's mtime and size, and when
+those change on its sha256, so touching the file does not force a rebuild.
+When the timezone came from the sun table, the table's mtime and size are
+part of the key too.
+
+The timezone is ``Clock_Location.timezone`` if given, else the one in the
+sun table, else looked up from the coordinates with TimezoneFinder.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from loguru import logger
+
+from town_clock.util.clock_exceptions import ConfigError
+from town_clock.util.thermal import DEFAULT_PATH
+from town_clock.util.utils import Mode, convert_position_string_to_number
+
+CONFIG_FILE = Path(__file__, "../../config/config.toml").resolve()
+SNAPSHOT_VERSION = 4
+
+
+@dataclass(frozen=True, slots=True)
+class LocationConfig:
+    """
+    Where the tower is.
+
+    Parameters:
+        latitude (float): Degrees, north positive.
+        longitude (float): Degrees, east positive.
+        altitude (float): Metres.
+        timezone (str): IANA name of the local timezone.
+        sun_table (Path | None): Precomputed sunrise and sunset table.
+        timezone_found (bool): The timezone was not configured, it was
+                               found from the sun table or coordinates.
+    """
+
+    latitude: float
+    longitude: float
+    altitude: float
+    timezone: str
+    sun_table: Path | None = None
+    timezone_found: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class PinConfig:
+    """
+    GPIO lines, BCM numbers.
+
+    Parameters:
+        clock_pins (tuple[int, ...]): One per face.
+        led_pin (int):
+        common_pin (int):
+        chip (str): GPIO character device.
+    """
+
+    clock_pins: tuple[int, ...]
+    led_pin: int
+    common_pin: int
+    chip: str = "/dev/gpiochip0"
+
+
+@dataclass(frozen=True, slots=True)
+class ThermalConfig:
+    """
+    ThermalMonitor settings, see town_clock.util.thermal.
+    """
+
+    path: Path = DEFAULT_PATH
+    interval: float = 5.0
+    throttle_at: float = 70.0
+    defer_at: float = 75.0
+
+
+@dataclass(frozen=True, slots=True)
+class ButtonConfig:
+    """
+    Buttons, see town_clock.ui.buttons.
+
+    Parameters:
+        pins (tuple[tuple[str, int], ...]): Face name and pin of each.
+        debounce (float): Seconds.
+        long_press (float): Seconds.
+        repeat (float): Seconds.
+    """
+
+    pins: tuple[tuple[str, int], ...] = ()
+    debounce: float = 0.02
+    long_press: float = 1.0
+    repeat: float = 0.25
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Everything the daemon needs to start.
+
+    Parameters:
+        location (LocationConfig):
+        pins (PinConfig):
+        mode (Mode):
+        face_names (tuple[str, ...]): One per clock pin.
+        log_folder (Path):
+        pulse_journal (Path | None):
+        state_file (Path | None): PositionStore journal.
+        restart_file (Path | None): Warm restart handoff.
+        metrics_address (str | None): Where to serve metrics.
+        thermal (ThermalConfig):
+        buttons (ButtonConfig):
+    """
+
+    location: LocationConfig
+    pins: PinConfig
+    mode: Mode
+    face_names: tuple[str, ...]
+    log_folder: Path
+    pulse_journal: Path | None = None
+    state_file: Path | None = None
+    restart_file: Path | None = None
+    metrics_address: str | None = None
+    thermal: ThermalConfig = field(default_factory=ThermalConfig)
+    buttons: ButtonConfig = field(default_factory=ButtonConfig)
+
+    @property
+    def face_pins(self) -> dict[str, int]:
+        """Clock pin of each face, by name."""
+        return dict(zip(self.face_names, self.pins.clock_pins))
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON safe form, read back with Config.from_dict."""
+        location = self.location
+        return {
+            "location": {
+                "latitude": location.latitude,
+                "longitude": location.longitude,
+                "altitude": location.altitude,
+                "timezone": location.timezone,
+                "sun_table": _str_or_none(location.sun_table),
+                "timezone_found": location.timezone_found,
+            },
+            "pins": {
+                "clock_pins": list(self.pins.clock_pins),
+                "led_pin": self.pins.led_pin,
+                "common_pin": self.pins.common_pin,
+                "chip": self.pins.chip,
+            },
+            "mode": self.mode.value,
+            "face_names": list(self.face_names),
+            "log_folder": str(self.log_folder),
+            "pulse_journal": _str_or_none(self.pulse_journal),
+            "state_file": _str_or_none(self.state_file),
+            "restart_file": _str_or_none(self.restart_file),
+            "metrics_address": self.metrics_address,
+            "thermal": {
+                "path": str(self.thermal.path),
+                "interval": self.thermal.interval,
+                "throttle_at": self.thermal.throttle_at,
+                "defer_at": self.thermal.defer_at,
+            },
+            "buttons": {
+                "pins": [list(pin) for pin in self.buttons.pins],
+                "debounce": self.buttons.debounce,
+                "long_press": self.buttons.long_press,
+                "repeat": self.buttons.repeat,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Config:
+        location = data["location"]
+        pins = data["pins"]
+        return cls(
+            location=LocationConfig(
+                latitude=location["latitude"],
+                longitude=location["longitude"],
+                altitude=location["altitude"],
+                timezone=location["timezone"],
+                sun_table=_path_or_none(location["sun_table"]),
+                timezone_found=location["timezone_found"],
+            ),
+            pins=PinConfig(
+                clock_pins=tuple(pins["clock_pins"]),
+                led_pin=pins["led_pin"],
+                common_pin=pins["common_pin"],
+                chip=pins["chip"],
+            ),
+            mode=Mode(data["mode"]),
+            face_names=tuple(data["face_names"]),
+            log_folder=Path(data["log_folder"]),
+            pulse_journal=_path_or_none(data["pulse_journal"]),
+            state_file=_path_or_none(data["state_file"]),
+            restart_file=_path_or_none(data["restart_file"]),
+            metrics_address=data["metrics_address"],
+            thermal=ThermalConfig(
+                path=Path(data["thermal"]["path"]),
+                interval=data["thermal"]["interval"],
+                throttle_at=data["thermal"]["throttle_at"],
+                defer_at=data["thermal"]["defer_at"],
+            ),
+            buttons=ButtonConfig(
+                pins=tuple(
+                    (name, pin) for name, pin in data["buttons"]["pins"]
+                ),
+                debounce=data["buttons"]["debounce"],
+                long_press=data["buttons"]["long_press"],
+                repeat=data["buttons"]["repeat"],
+            ),
+        )
+
+
+def _str_or_none(path: Path | None) -> str | None:
+    return None if path is None else str(path)
+
+
+def _path_or_none(path: str | None) -> Path | None:
+    return None if path is None else Path(path)
+
+
+class _Checker:
+    """Collects every problem so they are reported together."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.data = data
+        self.errors: list[str] = []
+
+    def section(self, name: str, required: bool = True) -> dict[str, Any]:
+        section = self.data.get(name)
+        if section is None:
+            if required:
+                self.errors.append(f"[{name}] is missing")
+            return {}
+        if not isinstance(section, dict):
+            self.errors.append(f"[{name}] must be a table")
+            return {}
+        return section
+
+    def value(
+        self,
+        section: dict[str, Any],
+        where: str,
+        key: str,
+        kind: type | tuple[type, ...],
+        default: Any = ...,
+    ) -> Any:
+        if key not in section:
+            if default is ...:
+                self.errors.append(f"{where}.{key} is missing")
+            return None if default is ... else default
+        value = section[key]
+        kinds = kind if isinstance(kind, tuple) else (kind,)
+        if isinstance(value, bool) or not isinstance(value, kinds):
+            names = " or ".join(k.__name__ for k in kinds)
+            self.errors.append(f"{where}.{key} must be {names}, not {value!r}")
+            return None if default is ... else default
+        return value
+
+    def check(self, ok: bool, message: str) -> None:
+        if not ok:
+            self.errors.append(message)
+
+
+def _coordinate(
+    checker: _Checker, location: dict[str, Any], key: str, limit: float
+) -> float:
+    raw = checker.value(location, "Clock_Location", key, (str, int, float))
+    if raw is None:
+        return 0.0
+    try:
+        value = convert_position_string_to_number(raw)
+    except (TypeError, ValueError):
+        checker.errors.append(f"Clock_Location.{key} is not valid: {raw!r}")
+        return 0.0
+    checker.check(
+        -limit <= value <= limit,
+        f"Clock_Location.{key} must be within +-{limit}, not {value}",
+    )
+    return value
+
+
+def _resolve_path(base: Path, value: str | None) -> Path | None:
+    return None if value is None else (base / value).resolve()
+
+
+def resolve_timezone(
+    latitude: float, longitude: float, sun_table: Path | None
+) -> str:
+    """
+    Timezone of the location, from the sun table when there is one.
+    Imports TimezoneFinder only when it has to.
+    """
+    if sun_table is not None and sun_table.exists():
+        from town_clock.util.sun_table import SunTable
+
+        with SunTable(sun_table) as table:
+            return table.timezone
+    from town_clock.util.location_sunrise_sunset import timezone_finder
+
+    return timezone_finder(latitude, longitude).zone
+
+
+def parse_config(
+    data: dict[str, Any],
+    base: Path,
+    find_timezone: Callable[
+        [float, float, Path | None], str
+    ] = resolve_timezone,
+) -> Config:
+    """
+    Validate parsed TOML and work out the derived values.
+
+    Args:
+        data: dict[str, Any]: The TOML document.
+        base: Path: Relative paths are relative to this folder.
+        find_timezone: Callable: Used when no timezone is configured.
+
+    Returns:
+        Config
+
+    Raises:
+        ConfigError: Listing every problem found.
+    """
+    checker = _Checker(data)
+
+    location = checker.section("Clock_Location")
+    latitude = _coordinate(checker, location, "latitude", 90)
+    longitude = _coordinate(checker, location, "longitude", 180)
+    altitude = checker.value(
+        location, "Clock_Location", "altitude", (int, float)
+    )
+    sun_table = _resolve_path(
+        base,
+        checker.value(location, "Clock_Location", "sun_table", str, None),
+    )
+    timezone = checker.value(location, "Clock_Location", "timezone", str, None)
+
+    pins = checker.section("Clock_Pins")
+    clock_pins = checker.value(pins, "Clock_Pins", "clock_pins", list) or []
+    led_pin = checker.value(pins, "Clock_Pins", "led_pin", int)
+    common_pin = checker.value(pins, "Clock_Pins", "common_pin", int)
+    chip = checker.value(pins, "Clock_Pins", "chip", str, "/dev/gpiochip0")
+    checker.check(bool(clock_pins), "Clock_Pins.clock_pins is empty")
+    checker.check(
+        all(
+            isinstance(pin, int) and not isinstance(pin, bool)
+            for pin in clock_pins
+        ),
+        "Clock_Pins.clock_pins must all be int",
+    )
+    every_pin = [*clock_pins, led_pin, common_pin]
+    checker.check(
+        len(set(every_pin)) == len(every_pin),
+        f"Clock_Pins are used more than once: {every_pin}",
+    )
+
+    faces = checker.section("Clock_Faces", required=False)
+    names = checker.value(faces, "Clock_Faces", "names", list, None)
+    if names is None:
+        names = [str(idx) for idx in range(1, len(clock_pins) + 1)]
+    checker.check(
+        len(names) == len(clock_pins),
+        f"{len(clock_pins)} clock pins but {len(names)} face names",
+    )
+    checker.check(len(set(names)) == len(names), f"Face names repeat: {names}")
+
+    mode_section = checker.section("Clock_Mode")
+    mode_name = checker.value(mode_section, "Clock_Mode", "mode", str)
+    mode = Mode.DEV
+    if mode_name is not None:
+        try:
+            mode = Mode(mode_name)
+        except ValueError:
+            checker.errors.append(
+                f"Clock_Mode.mode must be one of "
+                f"{[m.value for m in Mode]}, not {mode_name!r}"
+            )
+
+    logging = checker.section("Clock_Logging")
+    folder = checker.value(logging, "Clock_Logging", "folder", str)
+    journal = checker.value(
+        logging, "Clock_Logging", "pulse_journal", str, None
+    )
+    state = checker.section("Clock_State", required=False)
+    state_file = checker.value(state, "Clock_State", "file", str, None)
+    restart_file = checker.value(state, "Clock_State", "restart", str, None)
+    metrics = checker.section("Clock_Metrics", required=False)
+    address = checker.value(metrics, "Clock_Metrics", "address", str, None)
+
+    thermal = checker.section("Clock_Thermal", required=False)
+    defaults = ThermalConfig()
+    thermal_path = checker.value(
+        thermal, "Clock_Thermal", "path", str, str(defaults.path)
+    )
+    limits = {
+        key: float(
+            checker.value(
+                thermal,
+                "Clock_Thermal",
+                key,
+                (int, float),
+                getattr(defaults, key),
+            )
+        )
+        for key in ("interval", "throttle_at", "defer_at")
+    }
+
+    buttons = checker.section("Clock_Buttons", required=False)
+    button_pins = checker.value(buttons, "Clock_Buttons", "pins", dict, {})
+    checker.check(
+        all(
+            isinstance(pin, int) and not isinstance(pin, bool)
+            for pin in button_pins.values()
+        ),
+        "Clock_Buttons.pins must all be int",
+    )
+    checker.check(
+        set(button_pins) <= set(map(str, names)),
+        f"Clock_Buttons.pins are not all faces: {list(button_pins)}",
+    )
+    buttons_pins = list(button_pins.values())
+    checker.check(
+        len(set(buttons_pins)) == len(buttons_pins)
+        and not set(buttons_pins) & set(every_pin),
+        f"Clock_Buttons.pins clash with other pins: {buttons_pins}",
+    )
+    button_defaults = ButtonConfig()
+    timings = {
+        key: float(
+            checker.value(
+                buttons,
+                "Clock_Buttons",
+                key,
+                (int, float),
+                getattr(button_defaults, key),
+            )
+        )
+        for key in ("debounce", "long_press", "repeat")
+    }
+    checker.check(
+        0 <= timings["debounce"] < timings["long_press"]
+        and timings["repeat"] > 0,
+        "Clock_Buttons needs 0 <= debounce < long_press and repeat > 0",
+    )
+
+    if checker.errors:
+        raise ConfigError(*checker.errors)
+
+    timezone_found = timezone is None
+    if timezone is None:
+        timezone = find_timezone(latitude, longitude, sun_table)
+    else:
+        from pendulum.tz import timezone as load_timezone
+
+        try:
+            load_timezone(timezone)
+        except Exception:
+            raise ConfigError(f"Clock_Location.timezone unknown: {timezone}")
+
+    return Config(
+        location=LocationConfig(
+            latitude=latitude,
+            longitude=longitude,
+            altitude=float(altitude),
+            timezone=timezone,
+            sun_table=sun_table,
+            timezone_found=timezone_found,
+        ),
+        pins=PinConfig(
+            clock_pins=tuple(clock_pins),
+            led_pin=led_pin,
+            common_pin=common_pin,
+            chip=chip,
+        ),
+        mode=mode,
+        face_names=tuple(str(name) for name in names),
+        log_folder=(base / folder).resolve(),
+        pulse_journal=_resolve_path(base, journal),
+        state_file=_resolve_path(base, state_file),
+        restart_file=_resolve_path(base, restart_file),
+        metrics_address=address,
+        thermal=ThermalConfig(path=Path(thermal_path), **limits),
+        buttons=ButtonConfig(
+            pins=tuple((str(n), p) for n, p in button_pins.items()),
+            **timings,
+        ),
+    )
+
+
+def read_config(path: Path | str = CONFIG_FILE) -> Config:
+    """
+    Parse and validate a config file, paths are relative to the folder
+    above the one it is in.
+    """
+    import tomli
+
+    path = Path(path)
+    with open(path, "rb") as file:
+        try:
+            data = tomli.load(file)
+        except tomli.TOMLDecodeError as err:
+            raise ConfigError(f"{path}: {err}")
+    return parse_config(data, path.parent.parent)
+
+
+def snapshot_path(path: Path | str) -> Path:
+    """Where the snapshot of a config file is kept."""
+    path = Path(path)
+    return path.with_name(f".{path.stem}.snapshot.json")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_config(
+    path: Path | str = CONFIG_FILE, snapshot: Path | None = None
+) -> Config:
+    """
+    The config, from the snapshot when the file has not changed.
+
+    Args:
+        path: Path | str: config.toml.
+        snapshot: Path | None: Default is beside path, see snapshot_path.
+
+    Returns:
+        Config
+    """
+    path = Path(path).resolve()
+    snapshot = snapshot or snapshot_path(path)
+    stat = os.stat(path)
+    key = {
+        "version": SNAPSHOT_VERSION,
+        "source": str(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+    saved: dict[str, Any] = {}
+    try:
+        saved = json.loads(snapshot.read_bytes())
+    except (OSError, ValueError):
+        ...
+    cached: Config | None = None
+    try:
+        if saved["key"]["version"] == SNAPSHOT_VERSION:
+            cached = Config.from_dict(saved["config"])
+    except (KeyError, TypeError, ValueError) as err:
+        if saved.get("key") == key:
+            logger.warning(f"Config snapshot unreadable: {err}")
+    if cached is not None and saved.get("sun_table") != _sun_table_key(cached):
+        # The timezone came from a sun table that has since changed.
+        cached = None
+    if cached is not None and saved.get("key") == key:
+        return cached
+
+    # Touched but maybe not changed, compare the contents.
+    digest = _digest(path.read_bytes())
+    config = cached if saved.get("sha256") == digest else None
+    if config is None:
+        logger.info(f"Reading {path}")
+        config = read_config(path)
+    _write_snapshot(
+        snapshot,
+        {
+            "key": key,
+            "sha256": digest,
+            "sun_table": _sun_table_key(config),
+            "config": config.as_dict(),
+        },
+    )
+    return config
+
+
+def _sun_table_key(config: Config) -> dict[str, Any] | None:
+    """What of the sun table the config depends on, None if nothing."""
+    location = config.location
+    if not location.timezone_found or location.sun_table is None:
+        return None
+    try:
+        stat = os.stat(location.sun_table)
+    except OSError:
+        # resolve_timezone used the coordinates, until the table appears.
+        return {"path": str(location.sun_table)}
+    return {
+        "path": str(location.sun_table),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _write_snapshot(snapshot: Path, content: dict[str, Any]) -> None:
+    temp = snapshot.with_name(snapshot.name + ".tmp")
+    try:
+        temp.write_text(json.dumps(content, indent=1))
+        os.replace(temp, snapshot)
+    except OSError as err:
+        logger.warning(f"Cannot write config snapshot {snapshot}: {err}")
@@ -1,41 +1,91 @@
 """
-Todo:
-    Add asyncio.
+Controller
+
+Builds the clock tower from the config and runs it on an asyncio event
+loop that wakes once per minute.
 """
 from __future__ import annotations
+import asyncio
+import math
 import os
 import sys
 import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+import pendulum
+from loguru import logger
+
+from town_clock.clock import Clock, ClockRelay, ClockTower, LEDRelay, Time
+from town_clock.clock import timing
+from town_clock.clock.anchored_time import AnchoredTime, TimeJump
+from town_clock.clock.dst import DstScheduler
+from town_clock.clock.gpio import (
+    EdgeSource,
+    FakeGpioBackend,
+    FakeGpioEdges,
+    GpioBackend,
+    GpioChardev,
+    GpioEdges,
+)
+from town_clock.clock.night import LightChange, NightSchedule
+from town_clock.ui.buttons import ButtonDecoder, ButtonInput
+from town_clock.util import FaceName, Mode, SunTable
+from town_clock.util.clock_exceptions import NoValidTimeFromFileError
+from town_clock.util.clock_logging import SINKS, flush_logs
+from town_clock.util.metrics import TowerMetrics, serve_metrics
+from town_clock.util.position_store import PositionStore
+from town_clock.util.pulse_journal import PulseJournal
+from town_clock.util.thermal import ThermalMonitor
+from town_clock.util.warm_restart import Handoff, reexec
+
+if TYPE_CHECKING:
+    from town_clock.config import ButtonConfig, Config
+
+EDGE_SPIN = 0.005
+"""Seconds before a minute edge that the event loop hands over to timing."""
 
-from town_clock.util import Mode
+MAX_LOOP_LAG = 1.0
+"""Seconds late a minute tick can start before the Pi is unhealthy."""
+
+MIN_FREE_BYTES = 16 * 1024 * 1024
+"""Free space the state folder needs for the Pi to be healthy."""
 
 
 class Controller:
     """
-    Class to control everything.
+    Class to control everything, for one tower. To run several towers in
+    one process use town_clock.host.TowerHost.
     """
 
-    __singleton: Controller | None = None
-
-    def __new__(cls, *args, **kwargs):
-        """
-        Ensures that only one instance of Controller exists.
-        """
-        if cls.__singleton is None:
-            cls.__singleton = super().__new__(cls)
-        return cls.__singleton
-
     def __init__(
         self,
-        clock_pins: tuple[int, int],
+        clock_pins: Sequence[int],
         led_pin: int,
         common_pin: int,
         lat: float,
         long: float,
         alt: float,
         mode: Mode = Mode.DEV,
+        sun_table: Path | None = None,
+        face_names: Sequence[str] | None = None,
+        state_file: Path | None = None,
+        pulse_journal: Path | None = None,
+        gpio_chip: Path | str = "/dev/gpiochip0",
+        metrics_address: str | None = None,
+        thermal: ThermalMonitor | None = None,
+        timezone: str | None = None,
+        restart_file: Path | None = None,
+        buttons: ButtonConfig | None = None,
     ) -> None:
-        self.pins = {
+        if face_names is None:
+            face_names = [str(idx) for idx in range(1, len(clock_pins) + 1)]
+        if len(face_names) != len(clock_pins):
+            raise ValueError(
+                f"{len(clock_pins)} clock pins but {len(face_names)} names"
+            )
+        self.face_names: list[str] = list(face_names)
+        self.pins: dict[str, Any] = {
             "common_pin": common_pin,
             "clock_pins": clock_pins,
             "led_pin": led_pin,
@@ -46,25 +96,319 @@ class Controller:
             "longitude": long,
             "altitude": alt,
         }
+        self.sun_table: SunTable | None = None
+        if sun_table is not None and sun_table.exists():
+            self.sun_table = SunTable(sun_table)
+        elif sun_table is not None:
+            logger.warning(f"Sun table not found: {sun_table}")
+        if timezone is None and self.sun_table is not None:
+            timezone = self.sun_table.timezone
+        self.timezone: str = timezone or str(Time.timezone)
+        self.thermal: ThermalMonitor = thermal or ThermalMonitor()
+        self.store: PositionStore | None = None
+        if state_file is not None:
+            self.store = PositionStore(
+                state_file,
+                faces=len(clock_pins),
+                defer_compaction=lambda: self.tower.defer_work,
+            )
+        self.journal: PulseJournal | None = None
+        if pulse_journal is not None:
+            self.journal = PulseJournal(pulse_journal)
+            self.journal.seal_missing()
+        self.gpio: GpioBackend = self.open_gpio(gpio_chip)
+        self.buttons: ButtonInput | None = None
+        if buttons is not None and buttons.pins:
+            self.buttons = self.open_buttons(buttons, gpio_chip)
+        self.metrics_address = metrics_address
+        self.metrics: TowerMetrics = TowerMetrics.create()
+        self.metrics.cpu_temp.set_function(self.cpu_temp)
+        self.metrics.log_queue.set_function(
+            lambda: sum(sink.depth for sink in SINKS)
+        )
+        self.time_source = AnchoredTime(on_jump=self.on_time_jump)
+        self.metrics.time_correction.set_function(
+            lambda: self.time_source.correction
+        )
+        self.restart_file = restart_file
+        self.last_lag: float = 0.0
+        self.running: bool = False
+        self._lights: asyncio.TimerHandle | None = None
+        self.tower: ClockTower = self.build_tower()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Controller:
+        """
+        Build the Controller from a loaded config, see town_clock.config.
+        """
+        location = config.location
+        return cls(
+            clock_pins=config.pins.clock_pins,
+            led_pin=config.pins.led_pin,
+            common_pin=config.pins.common_pin,
+            lat=location.latitude,
+            long=location.longitude,
+            alt=location.altitude,
+            mode=config.mode,
+            sun_table=location.sun_table,
+            face_names=config.face_names,
+            state_file=config.state_file,
+            pulse_journal=config.pulse_journal,
+            gpio_chip=config.pins.chip,
+            metrics_address=config.metrics_address,
+            thermal=ThermalMonitor(
+                config.thermal.path,
+                interval=config.thermal.interval,
+                throttle_at=config.thermal.throttle_at,
+                defer_at=config.thermal.defer_at,
+            ),
+            timezone=location.timezone,
+            restart_file=config.restart_file,
+            buttons=config.buttons,
+        )
+
+    def on_time_jump(self, jump: TimeJump) -> None:
+        """Count a change of the system clock, see AnchoredTime."""
+        self.metrics.time_jumps.labels(jump.kind.value).inc()
+
+    def cpu_temp(self) -> float:
+        """Smoothed CPU temperature, NaN before the first reading."""
+        temperature = self.thermal.temperature
+        return math.nan if temperature is None else temperature
+
+    def open_gpio(self, chip: Path | str) -> GpioBackend:
+        """
+        Request every pin as one set of lines. Only active mode drives the
+        real GPIO, the other modes use FakeGpioBackend.
+        """
+        pins = [
+            *self.pins["clock_pins"],
+            self.pins["common_pin"],
+            self.pins["led_pin"],
+        ]
+        if self.mode is Mode.ACTIVE:
+            return GpioChardev(pins, chip=chip)
+        return FakeGpioBackend(pins, history=1000)
+
+    def open_buttons(
+        self, config: ButtonConfig, chip: Path | str
+    ) -> ButtonInput:
+        """
+        Watch the button pins for edges. Only active mode uses the real
+        GPIO, the other modes use FakeGpioEdges.
+        """
+        pins = [pin for _, pin in config.pins]
+        source: EdgeSource
+        if self.mode is Mode.ACTIVE:
+            source = GpioEdges(pins, chip=chip)
+        else:
+            source = FakeGpioEdges(pins)
+        decoder = ButtonDecoder(
+            {pin: name for name, pin in config.pins},
+            debounce=config.debounce,
+            long_press=config.long_press,
+            repeat=config.repeat,
+        )
+        return ButtonInput(source, decoder)
+
+    def build_tower(self) -> ClockTower:
+        """
+        Build the ClockTower from the pins and position, one Clock for
+        each entry in clock_pins. The hands start where the store last saw
+        them, or at the current time if it has no record.
+
+        Returns:
+            ClockTower
+        """
+        tm = Time(
+            pendulum.from_timestamp(self.time_source.time(), self.timezone),
+            timezone=self.timezone,
+            store=self.store,
+            time_source=self.time_source,
+        )
+        positions: list[int | None] = [None] * len(self.face_names)
+        if self.store is not None:
+            try:
+                positions = self.store.recover().positions
+            except NoValidTimeFromFileError:
+                logger.warning("No saved clock positions, using now.")
+        clocks: dict[FaceName, Clock] = {}
+        for name, pin, position in zip(
+            self.face_names, self.pins["clock_pins"], positions
+        ):
+            relay = ClockRelay(
+                self.pins["common_pin"],
+                name,
+                pin=pin,
+                name=f"Clock {name}",
+                mode=self.mode,
+                backend=self.gpio,
+            )
+            clocks[name] = Clock(
+                name,
+                relay,
+                time_on_clock=tm.clock_time if position is None else position,
+                time_source=self.time_source,
+            )
+        return ClockTower(
+            running=False,
+            time=tm,
+            mode=self.mode,
+            led=LEDRelay(
+                pin=self.pins["led_pin"],
+                name="LED",
+                mode=self.mode,
+                backend=self.gpio,
+            ),
+            clock=clocks,
+            position=self.position,
+            store=self.store,
+            journal=self.journal,
+            dst=DstScheduler(tm.offsets),
+            gpio=self.gpio,
+            metrics=self.metrics,
+            thermal=self.thermal,
+            night=(
+                NightSchedule(self.position, self.sun_table)
+                if self.sun_table is not None
+                else None
+            ),
+            buttons=None if self.buttons is None else self.buttons.events,
+        )
 
     def run(self) -> None:
         """
         Run the clock computer.
         """
         try:
-            while True:
-                # ic('Controller.run')
-                # ic(self.__dict__)
-                raise KeyboardInterrupt
+            asyncio.run(self.main())
         except KeyboardInterrupt:
             self.destroy()
 
+    async def main(self, ticks: int | None = None) -> None:
+        """
+        Event loop. Sleeps until each minute edge then runs the minute tasks.
+
+        Args:
+            ticks: int | None: Stop after this many minutes, None runs
+                               until self.running is False.
+        """
+        self.running = self.tower.running = True
+        loop = asyncio.get_running_loop()
+        server = None
+        self.thermal.start()
+        await self.resume()
+        await self.led_task()
+        if self.buttons is not None:
+            self.buttons.start(loop)
+        if self.metrics_address is not None:
+            server = await serve_metrics(
+                self.metrics.registry, self.metrics_address
+            )
+        try:
+            await self._loop(loop, ticks)
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            if self._lights is not None:
+                self._lights.cancel()
+            if self.buttons is not None:
+                self.buttons.stop()
+            self.thermal.stop()
+            self.tower.running = False
+
+    async def _loop(
+        self, loop: asyncio.AbstractEventLoop, ticks: int | None
+    ) -> None:
+        source = self.time_source
+        while self.running and ticks != 0:
+            edge, deadline = next_minute_edge(source.time(), loop.time())
+            await asyncio.sleep(max(0.0, deadline - loop.time() - EDGE_SPIN))
+            # The loop timer is coarse, finish the wait precisely.
+            while (early := edge - source.time()) > EDGE_SPIN:
+                await asyncio.sleep(early - EDGE_SPIN)
+            timing.sleep_until(source.monotonic() + (edge - source.time()))
+            late = source.time() - edge
+            timing.record("minute_edge", late)
+            self.last_lag = max(0.0, late)
+            self.metrics.loop_lag.observe(self.last_lag)
+            await self.tick()
+            if ticks is not None:
+                ticks -= 1
+
+    async def tick(self) -> None:
+        """
+        Minute tasks, once per minute. A restart waits until the faces are
+        pulsed. The LED is switched by its own events, see led_task.
+        """
+        await self.pulse_task()
+        await self.restart_task()
+
+    async def pulse_task(self) -> None:
+        """
+        Update the time then hold or advance each face to match it.
+        """
+        await asyncio.to_thread(self.tower.tick)
+
+    async def led_task(self) -> None:
+        """
+        Set the LED for now, then switch it at each dusk and dawn from the
+        tower's NightSchedule. The days are compiled off the event loop.
+        """
+        night = self.tower.night
+        if night is None:
+            return
+        await asyncio.to_thread(night.load, self.time_source.time())
+        self.tower.check_if_night()
+        self._schedule_light(asyncio.get_running_loop())
+
+    def _schedule_light(self, loop: asyncio.AbstractEventLoop) -> None:
+        assert self.tower.night is not None
+        now = self.time_source.time()
+        change = self.tower.night.next_change(now)
+        self._lights = loop.call_later(
+            max(0.0, change.at - now), self._light, loop, change
+        )
+
+    def _light(
+        self, loop: asyncio.AbstractEventLoop, change: LightChange
+    ) -> None:
+        try:
+            self.tower.light_change(change)
+        except Exception as err:
+            logger.exception(err)
+        self._schedule_light(loop)
+
+    async def restart_task(self) -> None:
+        """
+        Nightly restart, only when active.
+        """
+        if self.mode is Mode.ACTIVE:
+            self.restart(time.localtime(self.time_source.time()))
+
+    def shutdown(self) -> None:
+        """
+        Release the GPIO and flush everything to disk.
+        """
+        self.thermal.stop()
+        if self.store is not None:
+            self.store.close()
+        if self.journal is not None:
+            self.journal.close()
+        self.gpio.close()
+        if self.buttons is not None:
+            self.buttons.source.close()
+        logger.info(f"Timing:\n{timing.report()}")
+        flush_logs()
+
     def destroy(self, restart: bool = False) -> None:
         """
         Method to control destruction.
 
         """
 
+        self.shutdown()
         print("\nbye....")
         sys.exit(0)
 
@@ -74,24 +418,115 @@ class Controller:
         force: bool = False,
     ) -> None:
         """
-        Restart Computer at 2am every day.
+        Restart at 2am every day, in place unless the health check fails,
+        then the computer is rebooted.
         """
         if (local_time.tm_hour == 2 and local_time.tm_min == 0) or force:
-            self.destroy(restart=True)
+            if problems := self.health_check():
+                logger.error(f"Unhealthy, rebooting: {problems}")
+                self.reboot()
+            else:
+                self.warm_restart("nightly")
+
+    def health_check(self) -> list[str]:
+        """
+        Problems a new process would not fix.
+
+        Returns:
+            list[str]: Empty when healthy.
+        """
+        problems: list[str] = []
+        common = self.pins["common_pin"]
+        try:
+            self.gpio.set_lines({common: self.gpio.get_line(common)})
+        except (OSError, ValueError) as err:
+            problems.append(f"GPIO: {err}")
+        if self.store is not None:
+            try:
+                stat = os.statvfs(self.store.path.parent)
+                free = stat.f_bavail * stat.f_frsize
+                if free < MIN_FREE_BYTES:
+                    problems.append(f"State folder has {free} bytes free")
+                if not os.access(self.store.path.parent, os.W_OK):
+                    problems.append("State folder is read only")
+            except OSError as err:
+                problems.append(f"State folder: {err}")
+        if self.last_lag > MAX_LOOP_LAG:
+            problems.append(f"Minute tick started {self.last_lag:.3f}s late")
+        return problems
+
+    def warm_restart(self, reason: str) -> None:
+        """
+        Hand over to a fresh process through the handoff file, which has
+        the face positions whether or not there is a store. Reboots if
+        exec fails.
+        """
+        handoff = Handoff(
+            reason,
+            positions={
+                clock.label: clock.time_on_clock
+                for clock in self.tower.clock.values()
+            },
+            pending={
+                clock.label: clock.slow for clock in self.tower.clock.values()
+            },
+        )
+        logger.info(f"Warm restart: {reason}")
+        self.shutdown()
+        if self.restart_file is not None:
+            handoff.save(self.restart_file)
+        try:
+            reexec()
+        except OSError as err:
+            logger.exception(f"Warm restart failed: {err}")
             os.system("sudo init 6")
 
+    def reboot(self) -> None:
+        """
+        Reboot the computer.
+        """
+        self.shutdown()
+        os.system("sudo init 6")
+
+    async def resume(self) -> Handoff | None:
+        """
+        Pick up after a warm restart: put the faces back where the old
+        process left them, log how long it took and bring the faces up to
+        date straight away.
+        """
+        if self.restart_file is None:
+            return None
+        handoff = Handoff.take(self.restart_file)
+        if handoff is None:
+            return None
+        latency = handoff.latency()
+        if latency is not None:
+            self.metrics.restart.set(latency)
+        logger.info(
+            f"Resumed after {handoff.reason} restart in "
+            f"{'unknown' if latency is None else f'{latency:.3f}s'}, "
+            f"pending {handoff.pending}"
+        )
+        for clock in self.tower.clock.values():
+            if clock.label in handoff.positions:
+                clock.time_on_clock = handoff.positions[clock.label]
+            if clock.label in handoff.pending:
+                clock.slow = handoff.pending[clock.label]
+        await self.pulse_task()
+        return handoff
 
-def get_cpu_temp() -> float:
+
+def next_minute_edge(wall: float, monotonic: float) -> tuple[float, float]:
     """
-    Returns the cpu temp when called.
+    Works out the next minute edge.
 
-    Todo:
-        Fix to work with windows.
+    Args:
+        wall: float: Seconds since epoch, time.time().
+        monotonic: float: The monotonic clock read at the same moment.
 
     Returns:
-        float
+        tuple[float, float]: The edge in epoch seconds and the matching
+                             deadline on the monotonic clock.
     """
-
-    with open("/sys/class/thermal/thermal_zone0/temp") as file:
-        cpu = file.read()
-    return float(cpu) / 1000
+    edge = (wall // 60 + 1) * 60
+    return edge, monotonic + (edge - wall)
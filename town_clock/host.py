@@ -0,0 +1,297 @@
+"""
+host.py
+
+Many clock towers in one process, driven by one scheduler.
+
+A shop board can drive a dozen towers. Rather than a loop or thread per
+tower, every timed event goes into one heap: the shared minute edge, each
+tower's pulse slots and each tower's LED switch times. Adding or firing an
+event is O(log n) in the events queued, and the whole host runs in the
+thread that calls TowerHost.run().
+
+At each minute edge every tower that is not already catching up reads the
+time and plans. A tower that needs pulses gets a PulseEngine which is
+stepped from the heap, so one tower catching up never holds up another.
+LEDs switch at each dusk and dawn from the tower's NightSchedule rather
+than being polled.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable
+
+from loguru import logger
+
+from town_clock.clock import ClockTower, timing
+from town_clock.clock.night import LightChange, NightSchedule
+from town_clock.clock.pulse_engine import PulseEngine
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+from town_clock.util.sun_table import SunTable
+
+
+class Timer:
+    """
+    A callback queued on a Scheduler.
+
+    Parameters:
+        deadline (float): Monotonic seconds.
+        callback (Callable[[float], None]): Called with the seconds late.
+    """
+
+    __slots__ = ["deadline", "callback", "cancelled"]
+
+    def __init__(
+        self, deadline: float, callback: Callable[[float], None]
+    ) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        """Skip it when it comes due, it stays in the heap until then."""
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Timed callbacks in one heap, run in the calling thread.
+
+    Parameters:
+        time_source (TimeSource): Default is SYSTEM_TIME.
+    """
+
+    def __init__(self, time_source: TimeSource = SYSTEM_TIME) -> None:
+        self.time_source = time_source
+        self._heap: list[tuple[float, int, Timer]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def call_at(
+        self, deadline: float, callback: Callable[[float], None]
+    ) -> Timer:
+        """Run callback once time_source.monotonic() reaches deadline."""
+        timer = Timer(deadline, callback)
+        heapq.heappush(self._heap, (deadline, next(self._order), timer))
+        return timer
+
+    def call_at_wall(
+        self, wall: float, callback: Callable[[float], None]
+    ) -> Timer:
+        """Run callback at an epoch time, through the monotonic clock."""
+        source = self.time_source
+        return self.call_at(
+            source.monotonic() + (wall - source.time()), callback
+        )
+
+    def next_deadline(self) -> float | None:
+        """Deadline of the earliest live timer, None when empty."""
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_once(self) -> bool:
+        """
+        Wait for the earliest deadline and run everything due by then.
+
+        Returns:
+            bool: False if there was nothing to run.
+        """
+        deadline = self.next_deadline()
+        if deadline is None:
+            return False
+        late = self.time_source.sleep_until(deadline)
+        heap = self._heap
+        while heap and heap[0][0] <= deadline:
+            timer = heapq.heappop(heap)[2]
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback(late)
+            except Exception as err:
+                logger.exception(err)
+        return True
+
+    def run(
+        self,
+        until: float | None = None,
+        stop: Callable[[], bool] | None = None,
+    ) -> None:
+        """
+        Run timers until the heap is empty.
+
+        Args:
+            until: float | None: Monotonic time to stop at, waiting until
+                                 then if the heap runs out first.
+            stop: Callable[[], bool] | None: Checked between deadlines.
+        """
+        while stop is None or not stop():
+            deadline = self.next_deadline()
+            if deadline is None or (until is not None and deadline > until):
+                break
+            self.run_once()
+        if until is not None and (stop is None or not stop()):
+            self.time_source.sleep_until(until)
+
+
+@dataclass(slots=True)
+class HostedTower:
+    """
+    A tower and what the host is doing with it.
+
+    Parameters:
+        name (str): Unique within the host.
+        tower (ClockTower):
+        engine (PulseEngine | None): The catch-up in progress.
+        started (float): Monotonic start of that catch-up.
+        led_timer (Timer | None): The next LED switch.
+    """
+
+    name: str
+    tower: ClockTower
+    engine: PulseEngine | None = field(default=None, repr=False)
+    started: float = field(default=0.0, repr=False)
+    led_timer: Timer | None = field(default=None, repr=False)
+
+
+class TowerHost:
+    """
+    Runs any number of ClockTowers from one Scheduler.
+
+    Every tower must use the host's time source.
+
+    Parameters:
+        time_source (TimeSource): Default is SYSTEM_TIME.
+    """
+
+    def __init__(self, time_source: TimeSource = SYSTEM_TIME) -> None:
+        self.time_source = time_source
+        self.scheduler = Scheduler(time_source)
+        self.towers: dict[str, HostedTower] = {}
+        self._minute: Timer | None = None
+        self.running: bool = False
+
+    def add(
+        self, name: str, tower: ClockTower, sun_table: SunTable | None = None
+    ) -> HostedTower:
+        """
+        Host a tower from the next minute edge. The LED follows the
+        tower's NightSchedule, made from sun_table if it has none.
+
+        Raises:
+            ValueError: The name is taken or the tower keeps its own time.
+        """
+        if name in self.towers:
+            raise ValueError(f"Tower {name} is already hosted")
+        if tower.time_source is not self.time_source:
+            raise ValueError(f"Tower {name} must use the host's time source")
+        hosted = HostedTower(name, tower)
+        self.towers[name] = hosted
+        tower.running = True
+        if tower.night is None and sun_table is not None:
+            tower.night = NightSchedule(tower.position, sun_table)
+        if tower.night is not None:
+            tower.night.load(self.time_source.time())
+            tower.check_if_night()
+            self._schedule_light(hosted)
+        if self._minute is None:
+            self._schedule_minute()
+        return hosted
+
+    def remove(self, name: str) -> HostedTower:
+        """
+        Stop hosting a tower. A catch-up in progress still finishes, so no
+        relay is left on.
+        """
+        hosted = self.towers.pop(name)
+        hosted.tower.running = False
+        if hosted.led_timer is not None:
+            hosted.led_timer.cancel()
+        if not self.towers and self._minute is not None:
+            self._minute.cancel()
+            self._minute = None
+        return hosted
+
+    def run(self, until: float | None = None) -> None:
+        """
+        Run every tower until stop() or, if given, until the monotonic
+        time until.
+        """
+        self.running = True
+        try:
+            self.scheduler.run(until, stop=lambda: not self.running)
+        finally:
+            self.running = False
+
+    def stop(self) -> None:
+        self.running = False
+
+    def _schedule_minute(self) -> None:
+        edge = (self.time_source.time() // 60 + 1) * 60
+        self._minute = self.scheduler.call_at_wall(edge, self._on_minute)
+
+    def _on_minute(self, late: float) -> None:
+        timing.record("minute_edge", late)
+        self._schedule_minute()
+        for hosted in list(self.towers.values()):
+            if hosted.engine is not None:
+                # Still catching up, it plans again once it is done.
+                continue
+            try:
+                self._tick(hosted)
+            except Exception as err:
+                logger.exception(f"Tower {hosted.name}: {err}")
+
+    def _tick(self, hosted: HostedTower) -> None:
+        tower = hosted.tower
+        tower.read_buttons()
+        tower.time()
+        tower.plan_catch_up(tower.time.second)
+        if tower.slow.all_zero():
+            return
+        engine = tower.catch_up_engine()
+        engine.start(tower.slow)
+        hosted.engine = engine
+        hosted.started = self.time_source.monotonic()
+        self._next_step(hosted)
+
+    def _next_step(self, hosted: HostedTower) -> None:
+        assert hosted.engine is not None
+        due = hosted.engine.due()
+        if due is not None:
+            self.scheduler.call_at(due, lambda late: self._step(hosted, late))
+            return
+        try:
+            hosted.engine.finish()
+        except Exception as err:
+            logger.exception(f"Tower {hosted.name}: {err}")
+        finally:
+            hosted.tower.end_catch_up(hosted.started)
+            hosted.engine = None
+
+    def _step(self, hosted: HostedTower, late: float) -> None:
+        assert hosted.engine is not None
+        try:
+            hosted.engine.step(late)
+        finally:
+            self._next_step(hosted)
+
+    def _schedule_light(self, hosted: HostedTower) -> None:
+        assert hosted.tower.night is not None
+        change = hosted.tower.night.next_change(self.time_source.time())
+        hosted.led_timer = self.scheduler.call_at_wall(
+            change.at, lambda late: self._light(hosted, change)
+        )
+
+    def _light(self, hosted: HostedTower, change: LightChange) -> None:
+        try:
+            hosted.tower.light_change(change)
+        except Exception as err:
+            logger.exception(f"Tower {hosted.name} LED: {err}")
+        self._schedule_light(hosted)
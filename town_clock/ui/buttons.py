@@ -1,9 +1,224 @@
 """
-Buttons
+buttons.py
 
+Buttons, from GPIO edge events.
+
+Nothing polls the buttons. The lines are requested with edge detection,
+see town_clock.clock.gpio.GpioEdges, and ButtonInput waits on the request
+fd with the event loop's add_reader, so an idle button costs nothing. The
+kernel timestamps every edge, and ButtonDecoder debounces on those
+timestamps rather than by sleeping: the first edge of a burst is taken at
+once, edges within debounce of it are bounce, and the level the line
+settles on is checked once the burst is over.
+
+A release before long_press is a PRESS. Holding for long_press gives a
+LONG_PRESS, then a REPEAT every repeat until let go. The only timer is
+for a button being held. Events go on a thread safe queue that the
+ClockTower reads each tick.
 
 Author: Zack Hankin
 
 Started: 27/02/2023
 """
 from __future__ import annotations
+
+import asyncio
+import math
+import queue
+from dataclasses import dataclass
+from enum import Enum
+from typing import Mapping
+
+from loguru import logger
+
+from town_clock.clock.gpio import Edge, EdgeSource
+
+
+class ButtonKind(Enum):
+    """
+    What a button did.
+    PRESS = 'press'
+    LONG_PRESS = 'long_press'
+    REPEAT = 'repeat'
+    """
+
+    PRESS = "press"
+    LONG_PRESS = "long_press"
+    REPEAT = "repeat"
+
+
+@dataclass(frozen=True, slots=True)
+class ButtonEvent:
+    """
+    Parameters:
+        name (str): The button.
+        kind (ButtonKind):
+        at (float): CLOCK_MONOTONIC seconds.
+    """
+
+    name: str
+    kind: ButtonKind
+    at: float
+
+
+@dataclass(slots=True)
+class _Button:
+    name: str
+    pressed: bool = False
+    level: bool = False
+    changed: float = -math.inf
+    settle_at: float | None = None
+    hold_at: float | None = None
+    held: bool = False
+
+
+class ButtonDecoder:
+    """
+    Turns edges into button events.
+
+    Parameters:
+        buttons (Mapping[int, str]): Button name by pin.
+        debounce (float): Seconds of bounce after an edge. Default is 0.02.
+        long_press (float): Seconds held for a LONG_PRESS. Default is 1.
+        repeat (float): Seconds between REPEATs. Default is 0.25.
+        active_low (bool): A press pulls the line low. Default is True.
+    """
+
+    def __init__(
+        self,
+        buttons: Mapping[int, str],
+        debounce: float = 0.02,
+        long_press: float = 1.0,
+        repeat: float = 0.25,
+        active_low: bool = True,
+    ) -> None:
+        if not 0 <= debounce < long_press or repeat <= 0:
+            raise ValueError("Need 0 <= debounce < long_press and repeat > 0")
+        self.debounce = debounce
+        self.long_press = long_press
+        self.repeat = repeat
+        self.active_low = active_low
+        self._buttons = {pin: _Button(name) for pin, name in buttons.items()}
+
+    def edge(self, edge: Edge) -> list[ButtonEvent]:
+        """Events from an edge, and from any timer due before it."""
+        events = self.poll(edge.timestamp)
+        button = self._buttons.get(edge.pin)
+        if button is None:
+            return events
+        button.level = edge.rising != self.active_low
+        if edge.timestamp - button.changed < self.debounce:
+            # Bounce, look at the level again once it has settled.
+            button.settle_at = button.changed + self.debounce
+        elif button.level != button.pressed:
+            self._change(button, edge.timestamp, events)
+        return events
+
+    def poll(self, now: float) -> list[ButtonEvent]:
+        """Events from timers due by now."""
+        events: list[ButtonEvent] = []
+        for button in self._buttons.values():
+            if button.settle_at is not None and button.settle_at <= now:
+                at, button.settle_at = button.settle_at, None
+                if button.level != button.pressed:
+                    self._change(button, at, events)
+            if button.hold_at is not None and button.hold_at <= now:
+                kind = (
+                    ButtonKind.REPEAT if button.held else ButtonKind.LONG_PRESS
+                )
+                events.append(ButtonEvent(button.name, kind, button.hold_at))
+                button.held = True
+                # A late timer gives one event, not a burst of them.
+                following = button.hold_at + self.repeat
+                button.hold_at = (
+                    following if following > now else now + self.repeat
+                )
+        return events
+
+    def next_deadline(self) -> float | None:
+        """When poll next has something to do, None while idle."""
+        deadlines = [
+            deadline
+            for button in self._buttons.values()
+            for deadline in (button.settle_at, button.hold_at)
+            if deadline is not None
+        ]
+        return min(deadlines, default=None)
+
+    def _change(
+        self, button: _Button, at: float, events: list[ButtonEvent]
+    ) -> None:
+        button.pressed = button.level
+        button.changed = at
+        if button.pressed:
+            button.held = False
+            button.hold_at = at + self.long_press
+            return
+        if not button.held:
+            events.append(ButtonEvent(button.name, ButtonKind.PRESS, at))
+        button.hold_at = None
+
+
+class ButtonInput:
+    """
+    Reads edges on the event loop and queues the button events.
+
+    Parameters:
+        source (EdgeSource): Where the edges come from.
+        decoder (ButtonDecoder):
+        events (queue.SimpleQueue[ButtonEvent] | None): Where the events
+                                                        go, default is a
+                                                        new queue.
+    """
+
+    def __init__(
+        self,
+        source: EdgeSource,
+        decoder: ButtonDecoder,
+        events: queue.SimpleQueue[ButtonEvent] | None = None,
+    ) -> None:
+        self.source = source
+        self.decoder = decoder
+        self.events: queue.SimpleQueue[ButtonEvent] = (
+            events if events is not None else queue.SimpleQueue()
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Start waiting for edges, on the running loop by default."""
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop.add_reader(self.source.fileno(), self._readable)
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        self._loop.remove_reader(self.source.fileno())
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._loop = None
+
+    def _readable(self) -> None:
+        events: list[ButtonEvent] = []
+        for edge in self.source.read_edges():
+            events.extend(self.decoder.edge(edge))
+        self._deliver(events)
+
+    def _on_timer(self) -> None:
+        assert self._loop is not None
+        self._timer = None
+        self._deliver(self.decoder.poll(self._loop.time()))
+
+    def _deliver(self, events: list[ButtonEvent]) -> None:
+        for event in events:
+            logger.debug(f"Button {event.name} {event.kind.value}")
+            self.events.put(event)
+        if self._loop is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        deadline = self.decoder.next_deadline()
+        if deadline is not None:
+            self._timer = self._loop.call_at(deadline, self._on_timer)
@@ -1,7 +1,270 @@
 """
-Module for controlling the LCD Screen.
+lcd_screen.py
+
+HD44780 character LCD on a PCF8574 I2C backpack, driven from a
+framebuffer.
+
+Every byte sent to the LCD is four bytes on the bus, two nibbles each
+strobed with EN. Repainting a 16x2 screen every tick is 136 bus bytes. The
+screen here keeps what is on the glass and what should be. flush() sends
+only the changed cells, moving the cursor only where a run of changes
+starts, and sends a whole flush as one I2C write. Flushes are capped at
+max_rate a second, so changes in between are coalesced into the next one.
+
+At 100 kHz and up each bus byte takes longer than the 37 us the LCD needs
+per operation, so no waits are needed between cells.
+
+FakeI2CBus counts transactions and bytes, for tests and benchmarks.
 
 Author: Zack Hankin
 Started: 27/01/2023
 """
 from __future__ import annotations
+
+import fcntl
+import os
+from collections import deque
+from pathlib import Path
+from typing import Protocol
+
+from town_clock.clock.time_source import SYSTEM_TIME, TimeSource
+
+I2C_SLAVE = 0x0703
+MAX_TRANSFER = 8192
+"""Largest write i2c-dev accepts."""
+
+# PCF8574 pins on the common backpacks.
+RS = 0x01
+EN = 0x04
+BACKLIGHT = 0x08
+
+CLEAR = 0x01
+ENTRY_MODE = 0x06
+"""Cursor moves right after each character, no shift."""
+DISPLAY_ON = 0x0C
+"""Display on, cursor and blink off."""
+FUNCTION_SET = 0x28
+"""4 bit bus, two line addressing, 5x8 font."""
+SET_DDRAM = 0x80
+
+
+class I2CBus(Protocol):
+    """I2C Bus Protocol"""
+
+    def write(self, address: int, data: bytes) -> None:
+        """Send data to a device in one transaction."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class I2CDev:
+    """
+    An I2C bus through /dev/i2c-N.
+
+    Parameters:
+        bus (int): Bus number. Default is 1, the Pi's header pins.
+    """
+
+    def __init__(self, bus: int = 1) -> None:
+        self.path = Path(f"/dev/i2c-{bus}")
+        self._fd: int | None = os.open(self.path, os.O_RDWR | os.O_CLOEXEC)
+        self._address: int | None = None
+
+    def write(self, address: int, data: bytes) -> None:
+        if self._fd is None:
+            raise ValueError("I2C bus is closed")
+        if address != self._address:
+            fcntl.ioctl(self._fd, I2C_SLAVE, address)
+            self._address = address
+        os.write(self._fd, data)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FakeI2CBus:
+    """
+    In memory I2C bus.
+
+    Parameters:
+        history (int): Most transactions kept. Default is 1000.
+    """
+
+    def __init__(self, history: int = 1000) -> None:
+        self.transactions: int = 0
+        self.bytes_written: int = 0
+        self.history: deque[tuple[int, bytes]] = deque(maxlen=history)
+
+    def write(self, address: int, data: bytes) -> None:
+        self.transactions += 1
+        self.bytes_written += len(data)
+        self.history.append((address, bytes(data)))
+
+    def close(self) -> None:
+        ...
+
+
+class LCDScreen:
+    """
+    A framebuffer for an HD44780 LCD.
+
+    Parameters:
+        bus (I2CBus): Where the backpack is.
+        address (int): The backpack's address. Default is 0x27.
+        rows (int): Default is 2.
+        columns (int): Default is 16.
+        max_rate (float): Most flushes a second. Default is 4.
+        time_source (TimeSource): Paces init and flushes.
+                                  Default is SYSTEM_TIME.
+    """
+
+    def __init__(
+        self,
+        bus: I2CBus,
+        address: int = 0x27,
+        rows: int = 2,
+        columns: int = 16,
+        max_rate: float = 4.0,
+        time_source: TimeSource = SYSTEM_TIME,
+    ) -> None:
+        if not 1 <= rows <= 4 or not 1 <= columns <= 40 or rows * columns > 80:
+            raise ValueError(f"No HD44780 is {columns}x{rows}")
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+        self.bus = bus
+        self.address = address
+        self.rows = rows
+        self.columns = columns
+        self.min_interval = 1 / max_rate
+        self.time_source = time_source
+        self.backlight: bool = True
+        self.frame: list[bytearray] = [
+            bytearray(b" " * columns) for _ in range(rows)
+        ]
+        # What the glass shows, None until init().
+        self._shown: list[bytearray] | None = None
+        self._cursor: int | None = None
+        self._last_flush: float = -self.min_interval
+        # Rows 2 and 3 carry on from rows 0 and 1 in DDRAM.
+        self._offsets = (0x00, 0x40, columns, 0x40 + columns)
+
+    def _strobe(self, out: bytearray, nibble: int, mode: int) -> None:
+        bits = nibble | mode | (BACKLIGHT if self.backlight else 0)
+        out += bytes((bits | EN, bits))
+
+    def _byte(self, out: bytearray, value: int, mode: int = 0) -> None:
+        self._strobe(out, value & 0xF0, mode)
+        self._strobe(out, (value << 4) & 0xF0, mode)
+
+    def _send(self, data: bytearray) -> None:
+        view = memoryview(data)
+        for start in range(0, len(data), MAX_TRANSFER):
+            self.bus.write(self.address, bytes(view[start:][:MAX_TRANSFER]))
+
+    def init(self) -> LCDScreen:
+        """
+        Reset the LCD into 4 bit mode and clear it. Waits about 50 ms.
+        """
+        sleep = self.time_source.sleep
+        sleep(0.04)
+        # Three 8 bit function sets from any state, then 4 bit.
+        for nibble, wait in ((0x30, 0.0045), (0x30, 0.0002), (0x30, 0.0002)):
+            out = bytearray()
+            self._strobe(out, nibble, 0)
+            self._send(out)
+            sleep(wait)
+        out = bytearray()
+        self._strobe(out, 0x20, 0)
+        for command in (FUNCTION_SET, DISPLAY_ON, ENTRY_MODE, CLEAR):
+            self._byte(out, command)
+        self._send(out)
+        sleep(0.002)
+        self._shown = [bytearray(b" " * self.columns) for _ in self.frame]
+        self._cursor = 0
+        return self
+
+    def write(self, row: int, column: int, text: str) -> LCDScreen:
+        """
+        Put text in the framebuffer, cut off at the end of the row.
+        Characters the LCD has no glyph for show as '?'.
+        """
+        if not 0 <= row < self.rows or not 0 <= column < self.columns:
+            raise IndexError(f"({row}, {column}) is off the screen")
+        end = min(self.columns, column + len(text))
+        data = text.encode("ascii", "replace")[: end - column]
+        self.frame[row][column:end] = data
+        return self
+
+    def set_line(self, row: int, text: str) -> LCDScreen:
+        """Replace a whole row, padded with spaces."""
+        return self.write(row, 0, text[: self.columns].ljust(self.columns))
+
+    def clear(self) -> LCDScreen:
+        """Blank the framebuffer, the LCD is not sent a clear."""
+        for row in self.frame:
+            row[:] = b" " * self.columns
+        return self
+
+    @property
+    def dirty(self) -> bool:
+        """Does the LCD differ from the framebuffer?"""
+        return self._shown != self.frame
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Send the changed cells in one I2C write. Within min_interval of the
+        last flush nothing is sent unless forced, the changes wait.
+
+        Returns:
+            int: Cells sent.
+        """
+        now = self.time_source.monotonic()
+        if not force and now - self._last_flush < self.min_interval:
+            return 0
+        if self._shown is None:
+            self.init()
+        assert self._shown is not None
+        out = bytearray()
+        cells = 0
+        for row, (want, shown) in enumerate(zip(self.frame, self._shown)):
+            base = self._offsets[row]
+            column = 0
+            while column < self.columns:
+                if want[column] == shown[column]:
+                    column += 1
+                    continue
+                if self._cursor != base + column:
+                    self._byte(out, SET_DDRAM | (base + column))
+                # Rewriting one unchanged cell costs the same as a cursor
+                # move, so runs are only split at two or more.
+                end = column + 1
+                while end < self.columns and (
+                    want[end] != shown[end]
+                    or (
+                        end + 1 < self.columns
+                        and want[end + 1] != shown[end + 1]
+                    )
+                ):
+                    end += 1
+                for cell in range(column, end):
+                    self._byte(out, want[cell], RS)
+                cells += end - column
+                shown[column:end] = want[column:end]
+                self._cursor = base + end
+                column = end
+        if out:
+            self._send(out)
+        self._last_flush = now
+        return cells
+
+    def set_backlight(self, on: bool) -> None:
+        """Switch the backlight, it is one bit on every bus byte."""
+        self.backlight = on
+        self._send(bytearray((BACKLIGHT if on else 0,)))
+
+    def close(self) -> None:
+        self.bus.close()
@@ -3,24 +3,49 @@ Utility package for town-clock
 
 All modules can use these utility functions and classes.
 
+The small enums and helpers in utils are imported eagerly. The sun table
+and the skyfield based sunrise code are imported on first access, they pull
+in numpy, skyfield, pytz and timezonefinder.
+
 Author: Zack Hankin
 Started: 27/01/2023
 """
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
+from .lazy import lazy_exports
 from .utils import (
     CLOCK,
     convert_position_string_to_number,
+    FaceName,
     Log_Level,
     Mode,
 )
 
-from .location_sunrise_sunset import timezone_finder, find_sunrise_sunset_times
+if TYPE_CHECKING:
+    from .location_sunrise_sunset import (
+        timezone_finder,
+        find_sunrise_sunset_times,
+    )
+    from .sun_table import SunTable
 
 __all__: list[str] = [
     "timezone_finder",
     "find_sunrise_sunset_times",
+    "SunTable",
     "Log_Level",
     "Mode",
     "CLOCK",
+    "FaceName",
     "convert_position_string_to_number",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "timezone_finder": ".location_sunrise_sunset",
+        "find_sunrise_sunset_times": ".location_sunrise_sunset",
+        "SunTable": ".sun_table",
+    },
+)
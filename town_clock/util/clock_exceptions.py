@@ -47,3 +47,7 @@ class PulseError(BaseClockException):
 
 class NoValidTimeFromFileError(BaseClockException):
     ...
+
+
+class ConfigError(BaseClockException):
+    """config.toml is missing something or has a bad value."""
@@ -1,48 +1,181 @@
 """
-Todo: Check out loguru
+clock_logging.py
+
+Logging set up for the town clock.
+
+The log files are written through ring buffered sinks. A log call only
+appends the message to memory, a background worker writes the batch to
+the SD card when enough has built up, after a time limit, or at
+shutdown. This keeps file I/O out of the pulse timing path. The buffer
+has a fixed memory cap; when it is full the oldest messages are dropped
+and counted.
 """
 from __future__ import annotations
 
+import atexit
+import logging
 import os
 import sys
+import threading
+from collections import deque
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
 from loguru import logger
 
-logger.remove(0)
+try:
+    logger.remove(0)
+except ValueError:
+    ...
 loglevel = os.getenv("Town_Clock_Log_Level", default="INFO")
 logger.add(sink=sys.stdout, level=loglevel, colorize=True)
 logger.level(name="Pulse", no=45, color="<blue><bold>")
 
-pulse_handler = TimedRotatingFileHandler(
-    filename=Path(__file__ + "../resources/pule.log"),
-    when="W0",
-    interval=1,
-    backupCount=14,
-    encoding=None,
-    delay=False,
-    utc=False,
-    atTime=None,
-    errors=None,
-)
-
-logger.add(
-    pulse_handler,
-    level="INFO",
-    colorize=False,
-    # filter=...,
-    serialize=False,
-)
-
-everything_handler = TimedRotatingFileHandler(
-    filename=Path(__file__ + "../resources/clock.log"),
-    when="W0",
-    interval=1,
-    backupCount=14,
-    encoding=None,
-    delay=False,
-    utc=False,
-    atTime=None,
-    errors=None,
-)
+SINKS: list[BufferedSink] = []
+
+
+class BufferedSink:
+    """
+    Loguru sink that batches messages into a logging handler.
+
+    Parameters:
+        handler (logging.Handler): Where batches are written, usually a
+                                   TimedRotatingFileHandler.
+        max_bytes (int): Memory cap for buffered messages. Default 256 KiB.
+        flush_bytes (int): Buffered size that wakes the worker early.
+                           Default 16 KiB.
+        flush_interval (float): Most seconds a message waits in memory.
+                                Default is 5.0.
+    """
+
+    def __init__(
+        self,
+        handler: logging.Handler,
+        max_bytes: int = 256 * 1024,
+        flush_bytes: int = 16 * 1024,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.handler = handler
+        self.max_bytes = max_bytes
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.dropped: int = 0
+        self.size: int = 0
+        self._unreported: int = 0
+        self._buffer: deque[str] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting to be written."""
+        return len(self._buffer)
+
+    def write(self, message: str) -> None:
+        """Called by loguru for each message, only touches memory."""
+        with self._lock:
+            self._buffer.append(message)
+            self.size += len(message)
+            while self.size > self.max_bytes and self._buffer:
+                self.size -= len(self._buffer.popleft())
+                self.dropped += 1
+                self._unreported += 1
+            full = self.size >= self.flush_bytes
+        if full:
+            self._wake.set()
+
+    def drain(self) -> int:
+        """
+        Write everything buffered as one batch.
+
+        Returns:
+            int: Number of messages written.
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, deque()
+            self.size = 0
+            dropped, self._unreported = self._unreported, 0
+        if dropped:
+            batch.appendleft(f"... {dropped} log messages dropped ...\n")
+        if not batch:
+            return 0
+        record = logging.LogRecord(
+            "town_clock", logging.INFO, "", 0, "".join(batch), None, None
+        )
+        self.handler.handle(record)
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.drain()
+
+    def stop(self) -> None:
+        """Called by loguru when the sink is removed, writes what is left."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._worker.join()
+        self.drain()
+        self.handler.close()
+
+
+def _file_handler(path: Path) -> TimedRotatingFileHandler:
+    handler = TimedRotatingFileHandler(
+        filename=path,
+        when="W0",
+        interval=1,
+        backupCount=14,
+        encoding="utf-8",
+        delay=True,
+    )
+    # Batches already end in a newline.
+    handler.terminator = ""
+    return handler
+
+
+def setup_logging(folder: Path, level: str = loglevel) -> list[BufferedSink]:
+    """
+    Add the buffered file sinks.
+
+    Args:
+        folder: Path: Folder for clock.log and pulse.log.
+        level: str: Lowest level for clock.log.
+
+    Returns:
+        list[BufferedSink]: The sinks, also kept in SINKS.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    pulse_sink = BufferedSink(_file_handler(folder / "pulse.log"))
+    everything_sink = BufferedSink(_file_handler(folder / "clock.log"))
+    logger.add(
+        pulse_sink,
+        level="Pulse",
+        colorize=False,
+        filter=lambda record: record["level"].name == "Pulse",
+        serialize=False,
+    )
+    logger.add(
+        everything_sink,
+        level=level,
+        colorize=False,
+        serialize=False,
+    )
+    SINKS.extend((pulse_sink, everything_sink))
+    return [pulse_sink, everything_sink]
+
+
+def flush_logs() -> None:
+    """Write every buffered message now."""
+    for sink in SINKS:
+        sink.drain()
+
+
+atexit.register(flush_logs)
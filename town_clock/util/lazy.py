@@ -0,0 +1,50 @@
+"""
+lazy.py
+
+Module level ``__getattr__`` for packages that re-export names from
+submodules without importing them up front.
+
+A cold start on a Pi Zero spends seconds importing numpy, skyfield and
+timezonefinder. With lazy exports ``import town_clock`` costs next to
+nothing, each name is imported when it is first read and then cached in
+the package so later reads are plain attribute lookups.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Any, Callable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Make __getattr__ and __dir__ for a package.
+
+    Args:
+        package: str: The package's __name__.
+        exports: dict[str, str]: Name to the module it is imported from,
+                                 relative names are relative to package.
+
+    Returns:
+        tuple: (__getattr__, __dir__) to assign in the package.
+    """
+
+    def __getattr__(name: str) -> Any:
+        try:
+            module_name = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            ) from None
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
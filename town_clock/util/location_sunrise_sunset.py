@@ -1,15 +1,21 @@
 """
 Calculates sun position.
 """
+from __future__ import annotations
+
 import time
 from datetime import timedelta, datetime
 
-from typing import Any
+from typing import Any, TYPE_CHECKING
+from loguru import logger
 from pytz import timezone
 from skyfield import almanac
 from skyfield.api import wgs84, load, Loader
 from timezonefinder import TimezoneFinder
 
+if TYPE_CHECKING:
+    from town_clock.util.sun_table import SunTable
+
 
 def timezone_finder(latitude: float, longitude: float):
     tf = TimezoneFinder()
@@ -18,14 +24,49 @@ def timezone_finder(latitude: float, longitude: float):
 
 
 def find_sunrise_sunset_times(
-    latitude: float, longitude: float, altitude: float
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    table: SunTable | None = None,
 ) -> dict[int, float]:
+    """
+    Sunset and sunrise times from midnight today until midday tomorrow.
+
+    Args:
+        latitude: float: Latitude in degrees.
+        longitude: float: Longitude in degrees.
+        altitude: float: Altitude in metres.
+        table: SunTable | None: Precomputed table for this location. When it
+                                is for this site and covers today it is
+                                used instead of skyfield.
+
+    Returns:
+        dict[int, float]: Epoch seconds, numbered from 1.
+    """
+    if table is not None and not table.is_for(latitude, longitude):
+        logger.warning(
+            f"Sun table is for {table.latitude}, {table.longitude}, not "
+            f"{latitude}, {longitude}. Using skyfield."
+        )
+        table = None
     # Setting up Times
-    zone = timezone_finder(latitude, longitude)
+    zone = timezone(table.timezone) if table is not None else None
+    if zone is None:
+        zone = timezone_finder(latitude, longitude)
     now = zone.localize(datetime.now())
     midnight: Any = now.replace(hour=0, minute=0, second=0, microsecond=0)
     midday: Any = now.replace(hour=12, minute=0, second=0, microsecond=0)
     next_midday: Any = midday + timedelta(days=1)
+
+    if table is not None:
+        start, end = midnight.timestamp(), next_midday.timestamp()
+        if table.covers(start, end):
+            from_table: dict[int, float] = {}
+            for t, e in table.transitions(start, end):
+                if e in [3, 4]:
+                    from_table[len(from_table) + 1] = float(t)
+            return from_table
+
     ts = load.timescale()
     t0 = ts.from_datetime(midnight)
     t1 = ts.from_datetime(next_midday)
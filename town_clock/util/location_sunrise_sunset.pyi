@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from town_clock.util.sun_table import SunTable
+
 class TimezoneFinder:
     def timezone_at(self, *, lng: float, lat: float) -> str: ...
 
@@ -7,10 +9,14 @@ def timezone_finder(
     latitude: float, longitude: float
 ) -> _UTCclass | StaticTzInfo | DstTzInfo: ...
 def find_sunrise_sunset_times(
-    latitude: float, longitude: float, altitude: float
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    table: SunTable | None = ...,
 ) -> dict[int, float]: ...
 
 class TzInfo:
+    zone: str
     def localize(self, dt: datetime) -> datetime: ...
     def replace(self, hour, minute, second, microsecond) -> datetime: ...
 
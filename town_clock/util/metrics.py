@@ -0,0 +1,438 @@
+"""
+metrics.py
+
+Counters, gauges and histograms for the running tower, served in the
+Prometheus text format.
+
+Updating a metric is an attribute add on a cached child, cheap enough for
+every pulse. Values that cost something to read, like the CPU temperature
+or the process RSS, are gauges with a function that only runs when the
+metrics are scraped.
+
+Serve them over HTTP or a Unix socket with ``serve_metrics``::
+
+    curl http://127.0.0.1:9123/metrics
+    curl --unix-socket /run/town_clock/metrics.sock http://x/metrics
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterator, Sequence, TypeVar
+
+from loguru import logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HEADER_END = (b"\r\n", b"\n", b"")
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+Child = TypeVar("Child")
+
+
+class Metric(ABC, Generic[Child]):
+    """
+    Base for a metric family, one child per set of label values.
+
+    Parameters:
+        name (str): Metric name.
+        help (str): One line description.
+        labels (Sequence[str]): Label names, default none.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names: tuple[str, ...] = tuple(labels)
+        self._children: dict[tuple[str, ...], Child] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self) -> Child:
+        """A child with nothing recorded."""
+
+    def labels(self, *values: str) -> Child:
+        """The child for these label values, made on first use."""
+        if (child := self._children.get(values)) is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"{self.name} has labels {self.label_names}, "
+                    f"got {values}"
+                )
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yields (suffix, labels, value) for every child."""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.help)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _Value:
+    __slots__ = ["value"]
+
+    def __init__(self) -> None:
+        self.value: float = 0.0
+
+
+class CounterChild(_Value):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        self.value += amount
+
+
+class Counter(Metric[CounterChild]):
+    """Count that only goes up."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            yield "_total", labels, child.value
+
+
+class GaugeChild(_Value):
+    __slots__ = ["function"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from function when scraped."""
+        self.function = function
+
+    def read(self) -> float:
+        if self.function is None:
+            return self.value
+        try:
+            return float(self.function())
+        except Exception as err:
+            logger.debug(f"Gauge read failed: {err}")
+            return math.nan
+
+
+class Gauge(Metric[GaugeChild]):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.labels().set_function(function)
+
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            yield "", labels, child.read()
+
+
+class HistogramChild:
+    __slots__ = ["bounds", "counts", "sum", "count"]
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts: list[int] = [0] * (len(bounds) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric[HistogramChild]):
+    """
+    Distribution of observed values.
+
+    Parameters:
+        buckets (Sequence[float]): Upper bounds, +Inf is added.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        names = (*self.label_names, "le")
+        for values, child in list(self._children.items()):
+            seen = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                seen += count
+                labels = _format_labels(names, (*values, _format_value(bound)))
+                yield "_bucket", labels, seen
+            labels = _format_labels(self.label_names, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, child.count
+
+
+class Registry:
+    """Every metric the daemon serves."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, help: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        metric = Counter(name, help, labels)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, help, labels)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Everything, in the Prometheus text format."""
+        return "".join(metric.render() for metric in self.metrics.values())
+
+
+def process_rss() -> float:
+    """
+    Resident set size of this process in bytes, NaN without /proc.
+    getrusage only has the peak, which is not what the gauge shows.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            pages = int(file.read().split()[1])
+        return float(pages * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        return math.nan
+
+
+@dataclass(slots=True)
+class TowerMetrics:
+    """
+    The metrics kept for a tower.
+
+    Parameters:
+        registry (Registry): Where they are registered.
+        pulses (Counter): Pulses by face and outcome.
+        slow (Gauge): Clock.slow by face after each plan.
+        catch_up (Histogram): Seconds spent pulsing faces to the time.
+        loop_lag (Histogram): Seconds the minute tick started late.
+        log_queue (Gauge): Log messages waiting to be written.
+        cpu_temp (Gauge): CPU temperature in Celsius.
+        rss (Gauge): Resident memory in bytes.
+        restart (Gauge): Seconds the last warm restart took.
+        time_jumps (Counter): System clock changes by kind.
+        time_correction (Gauge): Seconds of clock change still to slew.
+    """
+
+    registry: Registry
+    pulses: Counter
+    slow: Gauge
+    catch_up: Histogram
+    loop_lag: Histogram
+    log_queue: Gauge
+    cpu_temp: Gauge
+    rss: Gauge
+    restart: Gauge
+    time_jumps: Counter
+    time_correction: Gauge
+
+    @classmethod
+    def create(cls, registry: Registry | None = None) -> TowerMetrics:
+        registry = registry or Registry()
+        metrics = cls(
+            registry=registry,
+            pulses=registry.counter(
+                "town_clock_pulses",
+                "Pulses sent to each face.",
+                ("face", "outcome"),
+            ),
+            slow=registry.gauge(
+                "town_clock_slow_minutes",
+                "Minutes each face is slow, negative while held.",
+                ("face",),
+            ),
+            catch_up=registry.histogram(
+                "town_clock_catch_up_seconds",
+                "Time spent pulsing faces back to the time.",
+            ),
+            loop_lag=registry.histogram(
+                "town_clock_loop_lag_seconds",
+                "How late the minute tick started.",
+                buckets=(1e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 1),
+            ),
+            log_queue=registry.gauge(
+                "town_clock_log_queue_depth",
+                "Log messages waiting to be written.",
+            ),
+            cpu_temp=registry.gauge(
+                "town_clock_cpu_temperature_celsius", "CPU temperature."
+            ),
+            rss=registry.gauge(
+                "town_clock_resident_memory_bytes", "Resident memory."
+            ),
+            restart=registry.gauge(
+                "town_clock_restart_seconds",
+                "How long the last warm restart left the faces unattended.",
+            ),
+            time_jumps=registry.counter(
+                "town_clock_time_jumps",
+                "Changes of the system clock, slewed or stepped.",
+                ("kind",),
+            ),
+            time_correction=registry.gauge(
+                "town_clock_time_correction_seconds",
+                "System clock change not yet slewed into the faces.",
+            ),
+        )
+        metrics.rss.set_function(process_rss)
+        return metrics
+
+
+async def _handle(
+    registry: Registry,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        request = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Skip the headers.
+        while await asyncio.wait_for(reader.readline(), 5) not in HEADER_END:
+            ...
+        parts = request.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+            status, body = "200 OK", registry.render().encode()
+        else:
+            status, body = "404 Not Found", b"Not found\n"
+        header = (
+            f"HTTP/1.0 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        )
+        writer.write(header.encode() + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as err:
+        logger.debug(f"Metrics request failed: {err}")
+    finally:
+        writer.close()
+
+
+async def serve_metrics(registry: Registry, address: str) -> asyncio.Server:
+    """
+    Serve GET /metrics.
+
+    Args:
+        registry: Registry: What to serve.
+        address: str: "host:port" for TCP, or a path for a Unix socket.
+
+    Returns:
+        asyncio.Server: Close it to stop serving.
+    """
+
+    async def handle(reader, writer) -> None:
+        await _handle(registry, reader, writer)
+
+    if address.startswith(("/", "unix:")):
+        path = address.removeprefix("unix:")
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(handle, path=path)
+    else:
+        host, _, port = address.rpartition(":")
+        server = await asyncio.start_server(
+            handle, host=host or "127.0.0.1", port=int(port)
+        )
+    logger.info(f"Serving metrics on {address}")
+    return server
@@ -0,0 +1,264 @@
+"""
+position_store.py
+
+Crash safe record of where the hands are on each clock face.
+
+Everything lives in one append-only file so recovery is a single read:
+
+    header:  magic (4s), version (H), faces (H), timestamp (I),
+             faces * position (H), crc32 (I)
+    records: timestamp (I), face (H), position (H), crc32 (I)
+
+Every pulse appends one 12 byte record. Once the journal holds
+``compact_every`` records it is rewritten as a fresh header holding the
+latest positions, written to a temporary file and swapped in atomically.
+A torn or corrupt record at the end of the file, from a power cut, fails
+its checksum and is dropped. The records are fsynced at most once every
+``sync_interval`` seconds, so a catch-up burst costs one flush, not one
+per pulse. Compaction can be put off, up to twice ``compact_every``
+records, while ``defer_compaction`` returns True, for instance while the
+CPU is hot.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+from town_clock.util.clock_exceptions import NoValidTimeFromFileError
+
+MAGIC = b"TCPJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<IHH")
+CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + CRC.size
+UNKNOWN = 0xFFFF
+
+
+@dataclass(slots=True)
+class StoredState:
+    """
+    Positions read back from the store.
+
+    Parameters:
+        timestamp (int): Epoch seconds of the newest record.
+        positions (list[int | None]): Clock.time_on_clock for each face,
+                                      None if never recorded.
+    """
+
+    timestamp: int
+    positions: list[int | None] = field(default_factory=list)
+
+
+def _pack_header(state: StoredState) -> bytes:
+    body = HEADER.pack(
+        MAGIC, VERSION, len(state.positions), state.timestamp
+    ) + struct.pack(
+        f"<{len(state.positions)}H",
+        *(UNKNOWN if p is None else p for p in state.positions),
+    )
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def _pack_record(timestamp: int, face: int, position: int) -> bytes:
+    body = RECORD.pack(timestamp, face, position)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+class PositionStore:
+    """
+    Journal of clock face positions.
+
+    Parameters:
+        path (Path | str): The journal file.
+        faces (int): Number of clock faces.
+        compact_every (int): Records before the journal is compacted.
+                             Default is 4096, about 50 KB.
+        sync_interval (float): Most seconds between fsyncs. Default is 1.0,
+                               0 syncs every record.
+        defer_compaction (Callable[[], bool] | None): Compaction waits while
+                                                      this returns True.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        faces: int,
+        compact_every: int = 4096,
+        sync_interval: float = 1.0,
+        defer_compaction: Callable[[], bool] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.faces = faces
+        self.compact_every = compact_every
+        self.sync_interval = sync_interval
+        self.defer_compaction = defer_compaction
+        self.state = StoredState(0, [None] * faces)
+        self.records: int = 0
+        self._fd: int | None = None
+        self._dirty: bool = False
+        self._last_sync: float = 0.0
+        self._valid: bool = False
+
+    def recover(self) -> StoredState:
+        """
+        Read the journal back with a single read and open it for appending.
+
+        Raises:
+            NoValidTimeFromFileError: When there is no journal or its header
+                                      is corrupt. The store is still usable
+                                      and starts a fresh journal.
+
+        Returns:
+            StoredState: The latest position of each face.
+        """
+        self.close()
+        self.state = StoredState(0, [None] * self.faces)
+        self.records = 0
+        self._valid = False
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        end = self._parse(data)
+        if end is None:
+            self._rewrite()
+            raise NoValidTimeFromFileError(
+                f"No valid positions in {self.path}"
+            )
+        fd = self._open()
+        if end < len(data):
+            logger.warning(
+                f"Dropping {len(data) - end} bytes of torn journal: "
+                f"{self.path}"
+            )
+            os.ftruncate(fd, end)
+        self._valid = True
+        if not self.state.timestamp:
+            raise NoValidTimeFromFileError(f"No positions in {self.path}")
+        return self.state
+
+    def _parse(self, data: bytes) -> int | None:
+        """Load state from the journal, returns the end of the valid data."""
+        if len(data) < HEADER.size:
+            return None
+        magic, version, faces, timestamp = HEADER.unpack_from(data)
+        positions_end = HEADER.size + faces * 2
+        header_end = positions_end + CRC.size
+        if magic != MAGIC or version != VERSION or len(data) < header_end:
+            return None
+        (crc,) = CRC.unpack_from(data, positions_end)
+        if crc != zlib.crc32(data[:positions_end]):
+            return None
+        stored = struct.unpack_from(f"<{faces}H", data, HEADER.size)
+        for idx, position in enumerate(stored[: self.faces]):
+            if position != UNKNOWN:
+                self.state.positions[idx] = position
+        self.state.timestamp = timestamp
+
+        end = header_end
+        for offset in range(header_end, len(data), RECORD_SIZE):
+            crc_offset = offset + RECORD.size
+            if crc_offset + CRC.size > len(data):
+                break
+            (crc,) = CRC.unpack_from(data, crc_offset)
+            if crc != zlib.crc32(data[offset:crc_offset]):
+                break
+            timestamp, face, position = RECORD.unpack_from(data, offset)
+            if face < self.faces:
+                self.state.positions[face] = position
+            self.state.timestamp = max(self.state.timestamp, timestamp)
+            self.records += 1
+            end = offset + RECORD_SIZE
+        return end
+
+    def record(
+        self, face: int, position: int, timestamp: int | None = None
+    ) -> None:
+        """
+        Append the position of one face.
+
+        Args:
+            face: int: Index of the face.
+            position: int: Clock.time_on_clock, 0-719.
+            timestamp: int | None: Epoch seconds, default is now.
+        """
+        if not self._valid:
+            try:
+                self.recover()
+            except NoValidTimeFromFileError:
+                self._valid = True
+        if timestamp is None:
+            timestamp = int(time.time())
+        self.state.positions[face] = position
+        self.state.timestamp = timestamp
+        if self._fd is None or self._compact_due():
+            self.compact()
+            return
+        os.write(self._fd, _pack_record(timestamp, face, position))
+        self.records += 1
+        self._dirty = True
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def _compact_due(self) -> bool:
+        if self.records < self.compact_every:
+            return False
+        if self.defer_compaction is None:
+            return True
+        overdue = self.records >= 2 * self.compact_every
+        return overdue or not self.defer_compaction()
+
+    def sync(self) -> None:
+        """Flush appended records to disk."""
+        if self._dirty and self._fd is not None:
+            os.fsync(self._fd)
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Replace the journal with a header holding the latest positions."""
+        self._rewrite()
+        logger.debug(f"Compacted position journal: {self.path}")
+
+    def _rewrite(self) -> None:
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "wb") as file:
+            file.write(_pack_header(self.state))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.path)
+        if os.name == "posix":
+            # Make the rename itself durable.
+            dir_fd = os.open(self.path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self.records = 0
+        self._open()
+
+    def _open(self) -> int:
+        flags = os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self.path, flags)
+        self._last_sync = time.monotonic()
+        return self._fd
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        if self._fd is None:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,283 @@
+"""
+pulse_journal.py
+
+Binary journal of every pulse.
+
+Each pulse is a fixed width 6 byte record: epoch seconds (uint32), face
+index (uint8) and outcome (uint8). Records go into one file per UTC day,
+``pulses-YYYYMMDD.bin``. When a day is finished a sparse index,
+``pulses-YYYYMMDD.idx``, is written holding the earliest and latest time
+in each block of records, so a range query only reads the blocks that can
+match. Records are streamed a block at a time, files are never loaded
+whole.
+
+Query from the command line with::
+
+    python -m town_clock.util.pulse_journal logs/pulses \\
+        --start 2026-10-13T01:00+11:00 --end 2026-10-13T03:00+11:00 --face 1
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from enum import IntEnum
+from pathlib import Path
+from typing import BinaryIO, Iterator, Sequence
+
+RECORD = struct.Struct("<IBB")
+INDEX_ENTRY = struct.Struct("<II")
+BLOCK = 512
+"""Records per index block."""
+
+
+class Outcome(IntEnum):
+    """
+    Result of a pulse.
+    OK = 0
+    FAILED = 1
+    """
+
+    OK = 0
+    FAILED = 1
+
+
+@dataclass(frozen=True, slots=True)
+class PulseRecord:
+    """
+    One pulse.
+
+    Parameters:
+        timestamp (int): Epoch seconds.
+        face (int): Index of the face in the tower.
+        outcome (Outcome): Whether the pulse worked.
+    """
+
+    timestamp: int
+    face: int
+    outcome: Outcome
+
+    def __str__(self) -> str:
+        when = datetime.fromtimestamp(self.timestamp, timezone.utc)
+        return f"{when.isoformat()} face={self.face} {self.outcome.name}"
+
+
+def _day(timestamp: float) -> date:
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+class PulseJournal:
+    """
+    Append and query pulse records.
+
+    Parameters:
+        folder (Path | str): Where the day files are kept.
+    """
+
+    def __init__(self, folder: Path | str) -> None:
+        self.folder = Path(folder)
+        self._file: BinaryIO | None = None
+        self._day: date | None = None
+
+    def data_path(self, day: date) -> Path:
+        return self.folder / f"pulses-{day:%Y%m%d}.bin"
+
+    def index_path(self, day: date) -> Path:
+        return self.folder / f"pulses-{day:%Y%m%d}.idx"
+
+    def append(
+        self,
+        face: int,
+        outcome: Outcome = Outcome.OK,
+        timestamp: int | None = None,
+    ) -> None:
+        """
+        Add a pulse, rotating to a new file when the UTC day changes.
+
+        Records are buffered, call flush() after a batch of pulses.
+
+        Args:
+            face: int: Index of the face.
+            outcome: Outcome: Default is OK.
+            timestamp: int | None: Epoch seconds, default is now.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+        day = _day(timestamp)
+        file = self._file
+        if day != self._day or file is None:
+            file = self._rotate(day)
+        file.write(RECORD.pack(timestamp, face, outcome))
+
+    def _rotate(self, day: date) -> BinaryIO:
+        previous = self._day
+        self.close()
+        if previous is not None and previous != day:
+            self.seal(previous)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # A day that is being written to again has a stale index.
+        self.index_path(day).unlink(missing_ok=True)
+        self._file = open(self.data_path(day), "ab")
+        self._day = day
+        # Drop a torn record so the new ones stay aligned.
+        if torn := self._file.tell() % RECORD.size:
+            self._file.truncate(self._file.tell() - torn)
+        return self._file
+
+    def flush(self) -> None:
+        """Write buffered records to the day file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the current day file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def seal_missing(self, today: date | None = None) -> list[Path]:
+        """
+        Index every finished day that has no index, for example after the
+        daemon was stopped over midnight.
+
+        Returns:
+            list[Path]: The indexes written.
+        """
+        today = today or _day(time.time())
+        written: list[Path] = []
+        for data in sorted(self.folder.glob("pulses-*.bin")):
+            day = datetime.strptime(data.stem, "pulses-%Y%m%d").date()
+            if day < today and not self.index_path(day).exists():
+                if (index := self.seal(day)) is not None:
+                    written.append(index)
+        return written
+
+    def seal(self, day: date) -> Path | None:
+        """
+        Write the block index for a finished day.
+
+        Returns:
+            Path | None: The index, None if there is no data for that day.
+        """
+        data = self.data_path(day)
+        if not data.exists():
+            return None
+        entries = bytearray()
+        with open(data, "rb") as file:
+            for times in _blocks(file):
+                entries += INDEX_ENTRY.pack(min(times), max(times))
+        index = self.index_path(day)
+        tmp = index.with_suffix(".tmp")
+        tmp.write_bytes(entries)
+        tmp.replace(index)
+        return index
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        face: int | None = None,
+    ) -> Iterator[PulseRecord]:
+        """
+        Stream the pulses in [start, end).
+
+        Args:
+            start: float: Epoch seconds.
+            end: float: Epoch seconds.
+            face: int | None: Only this face, default is every face.
+
+        Yields:
+            PulseRecord: In file order, oldest first for a steady clock.
+        """
+        self.flush()
+        day, last = _day(start), _day(max(start, end - 1))
+        while day <= last:
+            data = self.data_path(day)
+            if data.exists():
+                yield from self._query_day(day, data, start, end, face)
+            day += timedelta(days=1)
+
+    def _query_day(
+        self,
+        day: date,
+        data: Path,
+        start: float,
+        end: float,
+        face: int | None,
+    ) -> Iterator[PulseRecord]:
+        index = self.index_path(day)
+        spans: list[tuple[int, int]] | None = None
+        if index.exists():
+            spans = list(INDEX_ENTRY.iter_unpack(index.read_bytes()))
+        with open(data, "rb") as file:
+            if spans is None:
+                blocks: Iterator[int] = iter(range(sys.maxsize))
+            else:
+                blocks = (
+                    idx
+                    for idx, (low, high) in enumerate(spans)
+                    if high >= start and low < end
+                )
+            for block in blocks:
+                file.seek(block * BLOCK * RECORD.size)
+                chunk = file.read(BLOCK * RECORD.size)
+                usable = len(chunk) - len(chunk) % RECORD.size
+                if not usable:
+                    break
+                for timestamp, record_face, outcome in RECORD.iter_unpack(
+                    chunk[:usable]
+                ):
+                    if start <= timestamp < end and (
+                        face is None or face == record_face
+                    ):
+                        yield PulseRecord(
+                            timestamp, record_face, Outcome(outcome)
+                        )
+
+
+def _blocks(file: BinaryIO) -> Iterator[list[int]]:
+    """Yields the timestamps of each block of records in a day file."""
+    while chunk := file.read(BLOCK * RECORD.size):
+        usable = len(chunk) - len(chunk) % RECORD.size
+        if not usable:
+            return
+        yield [record[0] for record in RECORD.iter_unpack(chunk[:usable])]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Print the pulses in a time range.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m town_clock.util.pulse_journal",
+        description="Query the pulse journal.",
+    )
+    parser.add_argument("folder", type=Path, help="Pulse journal folder.")
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        required=True,
+        help="ISO 8601 time, local time if no offset is given.",
+    )
+    parser.add_argument("--end", type=datetime.fromisoformat, required=True)
+    parser.add_argument("--face", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    journal = PulseJournal(args.folder)
+    count = 0
+    for record in journal.query(
+        args.start.timestamp(), args.end.timestamp(), args.face
+    ):
+        print(record)
+        count += 1
+    print(f"{count} pulses", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+sun_batch.py
+
+Twilight transitions for many sites in one pass.
+
+compute_transitions runs skyfield's find_discrete for one site at a time,
+which is fine for a tower and slow when provisioning a fleet. Here the
+sun's apparent declination and Greenwich hour angle are worked out once,
+on one grid of times shared by every site, and the altitude at every site
+is a (sites, times) NumPy array made from them. Transitions are found
+where the twilight state changes between grid points, then refined with a
+few false position steps that are batched over every transition at once.
+The ephemeris and timescale are loaded once per process.
+
+Parallax, under 9 arc seconds, is ignored, which moves a transition by
+well under a second. Like skyfield's dark_twilight_day, the elevation of
+the site does not change the result.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import functools
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from town_clock.config import LocationConfig
+from town_clock.util.sun_table import write_sun_table
+
+# Sun altitudes, in degrees, that begin each state. Matches skyfield's
+# almanac.dark_twilight_day.
+LEVELS = np.array([-18.0, -12.0, -6.0, -0.8333])
+
+TRANSITION_DTYPE = np.dtype(
+    [
+        ("site", np.uint32),
+        # UTC date of the transition, not the site's local date.
+        ("date", "datetime64[D]"),
+        ("time", np.int64),
+        ("state", np.uint8),
+    ]
+)
+
+SunPosition = Callable[
+    [npt.NDArray[np.float64]],
+    tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]],
+]
+
+
+@functools.cache
+def _skyfield() -> tuple[Any, Any]:
+    from skyfield.api import load
+
+    return load.timescale(), load("de421.bsp")
+
+
+def _utc(ts: Any, seconds: npt.NDArray[np.float64]) -> Any:
+    """
+    Skyfield times for epoch seconds.
+
+    Epoch seconds skip leap seconds and ts.utc counts them, so the days
+    and the seconds of the day are passed separately.
+    """
+    days, rest = np.divmod(seconds, 86400)
+    return ts.utc(1970, 1, 1 + days, 0, 0, rest)
+
+
+def skyfield_sun(
+    seconds: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    The sun's apparent position from the centre of the Earth.
+
+    Args:
+        seconds: NDArray[float64]: Epoch seconds.
+
+    Returns:
+        tuple[NDArray, NDArray]: Declination and Greenwich hour angle, in
+                                 radians.
+    """
+    ts, eph = _skyfield()
+    t = _utc(ts, seconds)
+    ra, dec, _ = (
+        eph["earth"].at(t).observe(eph["sun"]).apparent().radec(epoch="date")
+    )
+    return dec.radians, (t.gast - ra.hours) * (np.pi / 12)
+
+
+def _altitude(
+    latitude: npt.NDArray[np.float64],
+    longitude: npt.NDArray[np.float64],
+    declination: npt.NDArray[np.float64],
+    hour_angle: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Degrees, every argument in radians and broadcast together."""
+    sin_alt = np.sin(latitude) * np.sin(declination) + np.cos(
+        latitude
+    ) * np.cos(declination) * np.cos(hour_angle + longitude)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+
+def compute_transitions_batch(
+    latitudes: npt.ArrayLike,
+    longitudes: npt.ArrayLike,
+    start: datetime,
+    end: datetime,
+    step: float = 600.0,
+    refine: int = 4,
+    sun: SunPosition = skyfield_sun,
+) -> tuple[npt.NDArray[Any], npt.NDArray[np.uint8]]:
+    """
+    Compute twilight transitions for many sites.
+
+    Args:
+        latitudes: ArrayLike: Degrees, one per site.
+        longitudes: ArrayLike: Degrees east, one per site.
+        start: datetime: Timezone aware start.
+        end: datetime: Timezone aware end.
+        step: float: Grid spacing in seconds. Every state lasts longer than
+                     this outside the polar circles. Default is 10 minutes.
+        refine: int: False position steps per transition. Default is 4.
+        sun: SunPosition: Where the sun is, default is skyfield.
+
+    Returns:
+        tuple[NDArray, NDArray[uint8]]: The transitions as a TRANSITION_DTYPE
+                                        array sorted by site then time, and
+                                        the state of each site at start.
+                                        Each date is the UTC date.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    if lat.shape != lon.shape or lat.ndim != 1:
+        raise ValueError("latitudes and longitudes must be equal 1-D arrays")
+    t0, t1 = start.timestamp(), end.timestamp()
+    grid = np.append(np.arange(t0, t1, step), t1)
+
+    declination, hour_angle = sun(grid)
+    alt = _altitude(lat[:, None], lon[:, None], declination, hour_angle)
+    states = np.searchsorted(LEVELS, alt, side="right").astype(np.uint8)
+
+    site, idx = np.nonzero(states[:, 1:] != states[:, :-1])
+    entered = states[site, idx + 1]
+    level = LEVELS[np.maximum(states[site, idx], entered) - 1]
+    ta, tb = grid[idx], grid[idx + 1]
+    fa = alt[site, idx] - level
+    fb = alt[site, idx + 1] - level
+    for _ in range(refine):
+        # Illinois false position, the bracket always holds the crossing.
+        tm = ta - fa * (tb - ta) / (fb - fa)
+        declination, hour_angle = sun(tm)
+        fm = _altitude(lat[site], lon[site], declination, hour_angle) - level
+        left = np.sign(fm) == np.sign(fa)
+        ta, tb = np.where(left, tm, ta), np.where(left, tb, tm)
+        fa, fb = np.where(left, fm, fa / 2), np.where(left, fb / 2, fm)
+    times = np.rint(ta - fa * (tb - ta) / (fb - fa)).astype(np.int64)
+
+    transitions = np.empty(len(site), dtype=TRANSITION_DTYPE)
+    transitions["site"] = site
+    transitions["date"] = times.astype("datetime64[s]").astype("datetime64[D]")
+    transitions["time"] = times
+    transitions["state"] = entered
+    return transitions, states[:, 0]
+
+
+def site_transitions(
+    transitions: npt.NDArray[Any], site: int
+) -> npt.NDArray[Any]:
+    """
+    One site's rows, a view into the batch.
+
+    Args:
+        transitions: NDArray: From compute_transitions_batch.
+        site: int: Index of the site.
+    """
+    sites = transitions["site"]
+    lo, hi = np.searchsorted(sites, [site, site + 1])
+    return transitions[lo:hi]
+
+
+def generate_sun_tables(
+    directory: Path | str,
+    sites: Mapping[str, LocationConfig],
+    years: int = 5,
+    start: datetime | None = None,
+    sun: SunPosition = skyfield_sun,
+) -> dict[str, Path]:
+    """
+    Compute several years of transitions for every site and write a sun
+    table for each, named <site>.bin.
+
+    Args:
+        directory: Path | str: Where to write the tables.
+        sites: Mapping[str, LocationConfig]: Sites by name.
+        years: int: How many years to compute. Default is 5.
+        start: datetime | None: Timezone aware start, default is midnight
+                                UTC yesterday, before today began anywhere.
+        sun: SunPosition: Where the sun is, default is skyfield.
+
+    Returns:
+        dict[str, Path]: The written files by site.
+    """
+    if start is None:
+        start = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) - timedelta(days=1)
+    end = start + timedelta(days=round(365.25 * years))
+    locations = list(sites.values())
+    transitions, initial = compute_transitions_batch(
+        [location.latitude for location in locations],
+        [location.longitude for location in locations],
+        start,
+        end,
+        sun=sun,
+    )
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written: dict[str, Path] = {}
+    for index, (name, location) in enumerate(sites.items()):
+        rows = site_transitions(transitions, index)
+        written[name] = write_sun_table(
+            directory / f"{name}.bin",
+            rows["time"].tolist(),
+            rows["state"].tolist(),
+            int(initial[index]),
+            location.latitude,
+            location.longitude,
+            location.altitude,
+            location.timezone,
+        )
+    return written
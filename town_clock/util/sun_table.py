@@ -0,0 +1,380 @@
+"""
+sun_table.py
+
+Precomputed twilight transitions for a single location.
+
+The table is generated offline (it needs skyfield and the de421 ephemeris)
+and written to a compact binary file. At runtime the file is memory-mapped
+and queried with a binary search, so the daemon never loads skyfield.
+
+File layout (little-endian):
+    header:  magic (4s), version (H), initial state (B), pad (x),
+             count (I), latitude (d), longitude (d), altitude (d),
+             timezone (64s, NUL padded)
+    times:   count * uint32, epoch seconds, ascending.
+    states:  count * uint8, the twilight state entered at that time.
+
+States match skyfield's ``almanac.dark_twilight_day``.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Sequence
+
+DARK = 0
+ASTRONOMICAL = 1
+NAUTICAL = 2
+CIVIL = 3
+DAY = 4
+
+MAGIC = b"TCST"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxIddd64s")
+SITE_TOLERANCE = 0.01
+"""Degrees a table's site may be from the one asked about, about 1 km."""
+
+
+class SunTableError(Exception):
+    """The sun table file is missing, corrupt or out of range."""
+
+
+def write_sun_table(
+    path: Path | str,
+    times: Sequence[int],
+    states: Sequence[int],
+    initial_state: int,
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    timezone: str,
+) -> Path:
+    """
+    Write a sun table file.
+
+    Args:
+        path: Path | str: Destination file, replaced atomically.
+        times: Sequence[int]: Transition times in epoch seconds, ascending.
+        states: Sequence[int]: State entered at each transition.
+        initial_state: int: State before the first transition.
+        latitude: float: Latitude in degrees.
+        longitude: float: Longitude in degrees.
+        altitude: float: Altitude in metres.
+        timezone: str: IANA timezone name of the location.
+
+    Returns:
+        Path: The written file.
+    """
+    if len(times) != len(states):
+        raise ValueError("times and states must be the same length")
+    if any(b < a for a, b in zip(times, times[1:])):
+        raise ValueError("times must be ascending")
+    path = Path(path)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        initial_state,
+        len(times),
+        latitude,
+        longitude,
+        altitude,
+        timezone.encode()[:64],
+    )
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as file:
+        file.write(header)
+        file.write(struct.pack(f"<{len(times)}I", *times))
+        file.write(struct.pack(f"<{len(states)}B", *states))
+    tmp.replace(path)
+    return path
+
+
+class SunTable:
+    """
+    Read only, memory-mapped view of a sun table file.
+
+    Parameters:
+        path (Path | str): The file written by ``write_sun_table``.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            try:
+                self._map = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError as err:
+                raise SunTableError(f"Empty sun table: {self.path}") from err
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise SunTableError(f"Truncated sun table: {self.path}")
+        (
+            magic,
+            version,
+            self.initial_state,
+            count,
+            self.latitude,
+            self.longitude,
+            self.altitude,
+            timezone,
+        ) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise SunTableError(f"Not a sun table: {self.path}")
+        if len(self._map) != HEADER.size + count * 5:
+            self._map.close()
+            raise SunTableError(f"Truncated sun table: {self.path}")
+        self.timezone: str = timezone.rstrip(b"\0").decode()
+        view = memoryview(self._map)
+        start, end = HEADER.size, HEADER.size + count * 4
+        self._times: Sequence[int]
+        if sys.byteorder == "little":
+            self._times = view[start:end].cast("I")
+        else:
+            self._times = struct.unpack_from(
+                f"<{count}I", self._map, HEADER.size
+            )
+        states_end = end + count
+        self._states = view[end:states_end]
+        self._view = view
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def __enter__(self) -> SunTable:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._map.closed:
+            return
+        if isinstance(self._times, memoryview):
+            self._times.release()
+        self._states.release()
+        self._view.release()
+        self._map.close()
+
+    @property
+    def start(self) -> int:
+        """Time of the first transition, epoch seconds."""
+        return self._times[0] if len(self) else 0
+
+    @property
+    def end(self) -> int:
+        """Time of the last transition, epoch seconds."""
+        return self._times[-1] if len(self) else 0
+
+    def is_for(
+        self,
+        latitude: float,
+        longitude: float,
+        tolerance: float = SITE_TOLERANCE,
+    ) -> bool:
+        """Was the table computed for this site?"""
+        return (
+            abs(self.latitude - latitude) <= tolerance
+            and abs(self.longitude - longitude) <= tolerance
+        )
+
+    def covers(self, start: float, end: float) -> bool:
+        """Does the table hold every transition between start and end?"""
+        return bool(len(self)) and self.start <= start and end <= self.end
+
+    def state_at(self, t: float) -> int:
+        """
+        Twilight state at a time.
+
+        Args:
+            t: float: Epoch seconds.
+
+        Returns:
+            int: One of DARK, ASTRONOMICAL, NAUTICAL, CIVIL or DAY.
+        """
+        idx = bisect_right(self._times, t)
+        if idx == 0:
+            return self.initial_state
+        return self._states[idx - 1]
+
+    def is_dark_at(self, t: float, threshold: int = DAY) -> bool:
+        """
+        Is it dark at a time?
+
+        Args:
+            t: float: Epoch seconds.
+            threshold: int: States below this count as dark. Default is
+                            DAY, so dark means the sun is below the horizon.
+
+        Returns:
+            bool: True if dark.
+        """
+        return self.state_at(t) < threshold
+
+    def next_transition(self, t: float) -> tuple[int, int] | None:
+        """
+        First transition strictly after a time.
+
+        Args:
+            t: float: Epoch seconds.
+
+        Returns:
+            tuple[int, int] | None: (epoch seconds, state entered), or None
+                                    when the table has run out.
+        """
+        idx = bisect_right(self._times, t)
+        if idx == len(self):
+            return None
+        return self._times[idx], self._states[idx]
+
+    def transitions(
+        self, start: float, end: float
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Yields every (time, state) transition in [start, end).
+        """
+        idx = bisect_left(self._times, start)
+        while idx < len(self) and self._times[idx] < end:
+            yield self._times[idx], self._states[idx]
+            idx += 1
+
+
+def compute_transitions(
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    start: datetime,
+    end: datetime,
+) -> tuple[list[int], list[int], int]:
+    """
+    Compute twilight transitions with skyfield.
+
+    Args:
+        latitude: float: Latitude in degrees.
+        longitude: float: Longitude in degrees.
+        altitude: float: Altitude in metres.
+        start: datetime: Timezone aware start.
+        end: datetime: Timezone aware end.
+
+    Returns:
+        tuple[list[int], list[int], int]: times, states and the initial state.
+    """
+    from skyfield import almanac
+    from skyfield.api import load, wgs84
+
+    ts = load.timescale()
+    t0 = ts.from_datetime(start)
+    t1 = ts.from_datetime(end)
+    eph = load("de421.bsp")
+    position = wgs84.latlon(
+        latitude_degrees=latitude,
+        longitude_degrees=longitude,
+        elevation_m=altitude,
+    )
+    f = almanac.dark_twilight_day(eph, position)
+    times, events = almanac.find_discrete(t0, t1, f)
+    initial_state = int(f(t0))
+    epochs = [int(round(t.utc_datetime().timestamp())) for t in times]
+    return epochs, [int(e) for e in events], initial_state
+
+
+def generate_sun_table(
+    path: Path | str,
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    years: int = 5,
+    start: datetime | None = None,
+    timezone: str | None = None,
+) -> Path:
+    """
+    Compute several years of twilight transitions and write them to path.
+
+    Args:
+        path: Path | str: Destination file.
+        latitude: float: Latitude in degrees.
+        longitude: float: Longitude in degrees.
+        altitude: float: Altitude in metres.
+        years: int: How many years to compute. Default is 5.
+        start: datetime | None: Timezone aware start, default is the start
+                                of today in the location's timezone.
+        timezone: str | None: IANA timezone name, found from the position
+                              when not given.
+
+    Returns:
+        Path: The written file.
+    """
+    import pytz
+
+    if timezone is None:
+        from town_clock.util.location_sunrise_sunset import timezone_finder
+
+        timezone = timezone_finder(latitude, longitude).zone
+    if start is None:
+        start = (
+            pytz.timezone(timezone)
+            .localize(datetime.now())
+            .replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+    end = start + timedelta(days=round(365.25 * years))
+    times, states, initial_state = compute_transitions(
+        latitude, longitude, altitude, start, end
+    )
+    return write_sun_table(
+        path,
+        times,
+        states,
+        initial_state,
+        latitude,
+        longitude,
+        altitude,
+        timezone,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Generate a sun table for the configured [Clock_Location].
+    """
+    import tomli
+
+    from town_clock.util.utils import convert_position_string_to_number
+
+    parser = argparse.ArgumentParser(
+        prog="python -m town_clock.util.sun_table",
+        description="Generate a sun table for [Clock_Location].",
+    )
+    parser.add_argument("output", type=Path, help="File to write.")
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=Path(__file__, "../../../config/config.toml").resolve(),
+    )
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with open(args.config, "rb") as f:
+        location = tomli.load(f)["Clock_Location"]
+    path = generate_sun_table(
+        args.output,
+        latitude=convert_position_string_to_number(location["latitude"]),
+        longitude=convert_position_string_to_number(location["longitude"]),
+        altitude=location["altitude"],
+        years=args.years,
+    )
+    with SunTable(path) as table:
+        print(f"{path}: {len(table)} transitions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+thermal.py
+
+CPU temperature sampling for thermal-aware pulsing.
+
+An enclosed tower Pi gets hot during long catch-up bursts, and once the
+SoC throttles the pulse timing suffers. ThermalMonitor keeps the sysfs
+file open and reads it with pread at a fixed interval from a background
+thread, smoothing the readings with an exponential moving average. The
+tower asks it whether to slow the catch-up rate or put off work that can
+wait.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+DEFAULT_PATH = Path("/sys/class/thermal/thermal_zone0/temp")
+
+
+class ThermalMonitor:
+    """
+    Smoothed CPU temperature.
+
+    Parameters:
+        path (Path | str): File holding millidegrees Celsius.
+                           Default is thermal_zone0.
+        interval (float): Seconds between samples. Default is 5.0.
+        alpha (float): Weight of each new sample, 0-1. Default is 0.3.
+        throttle_at (float): Celsius above which catch-up is slowed.
+                             Default is 70.
+        defer_at (float): Celsius above which work that can wait is put
+                          off. Default is 75.
+        hysteresis (float): Degrees below a threshold before it clears.
+                            Default is 2.
+        throttle_factor (float): Fraction of the normal catch-up rate used
+                                 while throttling. Default is 0.5.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_PATH,
+        interval: float = 5.0,
+        alpha: float = 0.3,
+        throttle_at: float = 70.0,
+        defer_at: float = 75.0,
+        hysteresis: float = 2.0,
+        throttle_factor: float = 0.5,
+    ) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        if not 0 < throttle_factor <= 1:
+            raise ValueError("throttle_factor must be in (0, 1]")
+        self.path = Path(path)
+        self.interval = interval
+        self.alpha = alpha
+        self.throttle_at = throttle_at
+        self.defer_at = defer_at
+        self.hysteresis = hysteresis
+        self.throttle_factor = throttle_factor
+        self.temperature: float | None = None
+        self.throttling: bool = False
+        self.deferring: bool = False
+        self._fd: int | None = None
+        self._failed: bool = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def read(self) -> float | None:
+        """
+        One raw reading in Celsius, None if the file cannot be read.
+        """
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            raw = os.pread(self._fd, 32, 0)
+            value = int(raw) / 1000
+        except (OSError, ValueError) as err:
+            if not self._failed:
+                logger.warning(f"Cannot read CPU temperature: {err}")
+                self._failed = True
+            self.close()
+            return None
+        self._failed = False
+        return value
+
+    def sample(self) -> float | None:
+        """
+        Read once and update the smoothed temperature and the states.
+
+        Returns:
+            float | None: The smoothed temperature.
+        """
+        value = self.read()
+        if value is None:
+            return self.temperature
+        if self.temperature is None:
+            self.temperature = value
+        else:
+            self.temperature += self.alpha * (value - self.temperature)
+        self.throttling = self._state(self.throttling, self.throttle_at)
+        was_deferring = self.deferring
+        self.deferring = self._state(self.deferring, self.defer_at)
+        if self.deferring != was_deferring:
+            logger.warning(
+                f"CPU {self.temperature:.1f}C, "
+                f"{'deferring' if self.deferring else 'resuming'} work"
+            )
+        return self.temperature
+
+    def _state(self, on: bool, threshold: float) -> bool:
+        assert self.temperature is not None
+        if on:
+            return self.temperature > threshold - self.hysteresis
+        return self.temperature >= threshold
+
+    @property
+    def rate_factor(self) -> float:
+        """Multiplier for the catch-up pulse rate."""
+        return self.throttle_factor if self.throttling else 1.0
+
+    def start(self) -> ThermalMonitor:
+        """Sample in a background thread every interval seconds."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="thermal", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            self.sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        """Stop sampling and close the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.close()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Literal
+from typing import Literal, TypeAlias
 
 
 class Log_Level(Enum):
@@ -51,6 +51,10 @@ class CLOCK(Enum):
         return 0, 1, 2
 
 
+FaceName: TypeAlias = CLOCK | str
+"""A clock face, either a CLOCK member or a name from the config."""
+
+
 def convert_position_string_to_number(position_str: str) -> float:
     """
     Converts a position string to a number.
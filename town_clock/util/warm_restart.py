@@ -0,0 +1,112 @@
+"""
+warm_restart.py
+
+Restart the daemon in place instead of rebooting the Pi.
+
+The nightly reboot leaves the faces unattended for a minute or more. A
+warm restart writes a small handoff file, releases the GPIO and files,
+and execs a fresh interpreter with the same command line. The new process
+boots from the config snapshot, reads the face positions back from the
+PositionStore and picks up the handoff, which says why it restarted,
+what was pending and when the old process let go. CLOCK_MONOTONIC carries
+on across exec, so the restart latency is measured to the nanosecond as
+long as the boot id still matches.
+
+Started: 18/10/2026
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import NoReturn, Sequence
+
+from loguru import logger
+
+BOOT_ID = Path("/proc/sys/kernel/random/boot_id")
+
+
+def boot_id() -> str:
+    """Identifies this boot, empty where the kernel does not say."""
+    try:
+        return BOOT_ID.read_text().strip()
+    except OSError:
+        return ""
+
+
+@dataclass(slots=True)
+class Handoff:
+    """
+    What one process tells the next across a warm restart.
+
+    Parameters:
+        reason (str): Why it restarted.
+        wall (float): time.time() when the old process let go.
+        monotonic_ns (int): time.monotonic_ns() at the same moment.
+        boot (str): boot_id() of the old process.
+        positions (dict[str, int]): Clock.time_on_clock by face.
+        pending (dict[str, int]): Clock.slow by face.
+    """
+
+    reason: str
+    wall: float = field(default_factory=time.time)
+    monotonic_ns: int = field(default_factory=time.monotonic_ns)
+    boot: str = field(default_factory=boot_id)
+    positions: dict[str, int] = field(default_factory=dict)
+    pending: dict[str, int] = field(default_factory=dict)
+
+    def save(self, path: Path) -> None:
+        """Write atomically, the new process must never see half of it."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(path.name + ".tmp")
+        with open(temp, "w") as file:
+            json.dump(asdict(self), file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, path)
+
+    @classmethod
+    def take(cls, path: Path) -> Handoff | None:
+        """
+        Read and remove the handoff, None if there is none or it is
+        unreadable.
+        """
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            logger.warning(f"Bad restart handoff {path}: {err}")
+            data = None
+        path.unlink(missing_ok=True)
+        if data is None:
+            return None
+        try:
+            return cls(**data)
+        except TypeError as err:
+            logger.warning(f"Bad restart handoff {path}: {err}")
+            return None
+
+    def latency(self) -> float | None:
+        """
+        Seconds from the old process letting go until now, None if the
+        machine rebooted in between.
+        """
+        if not self.boot or self.boot != boot_id():
+            return None
+        return (time.monotonic_ns() - self.monotonic_ns) / 1e9
+
+
+def reexec(argv: Sequence[str] | None = None) -> NoReturn:
+    """
+    Replace this process with a fresh interpreter, the same command line
+    by default. Only returns by raising OSError.
+    """
+    if argv is None:
+        argv = [sys.executable, *sys.orig_argv[1:]]
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(argv[0], list(argv))